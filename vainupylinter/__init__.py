@@ -1,4 +1,4 @@
 # Created 10.1.2019
 """Port some functionality here"""
 from __future__ import absolute_import
-from vainupylinter.custom_runner import run
+from vainupylinter.custom_runner import RunResult, lint_files, make_args, run
@@ -0,0 +1,4 @@
+"""Benchmarks of the runner on generated corpora
+
+Run with `python -m vainupylinter.benchmarks --help`.
+"""
@@ -0,0 +1,209 @@
+"""Benchmark the runner on a generated corpus
+
+Every scenario (engine, jobs, with or without custom hooks) is linted in a fresh
+process, so the numbers include importing pylint. The startup scenarios measure
+runs that should not import pylint at all: one without files and one where every
+file is found in the cache. Results are written as json and can be compared to an
+earlier result file to catch regressions:
+
+    python -m vainupylinter.benchmarks --jobs 1 4 --output new.json --compare old.json
+"""
+from __future__ import absolute_import
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import os.path as op
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+try:
+    from vainupylinter.benchmarks.corpus import generate_corpus
+except ImportError:
+    from benchmarks.corpus import generate_corpus
+
+MEASURE = op.join(op.dirname(op.abspath(__file__)), "measure.py")
+CUSTOM_PATH = "vainupylinter.benchmarks.customs"
+# Metrics compared between result files and whether larger is better
+METRICS = (
+    ("files_per_s", True),
+    ("lint_s", False),
+    ("import_s", False),
+    ("total_s", False),
+    ("first_file_s", False),
+    ("peak_rss_kb", False),
+    ("worker_peak_rss_kb", False),
+)
+
+
+def parse_args(args):
+    """Handle inputs"""
+    parser = argparse.ArgumentParser()
+    parser.description = 'Benchmark vainupylinter on a generated corpus.'
+    parser.add_argument('--files', type=int, default=100, help='Number of generated files.')
+    parser.add_argument('--lines', type=int, default=100, help='Approximate length of each file.')
+    parser.add_argument('--import-depth', dest='import_depth', type=int, default=3,
+                        help='Length of import chains between the generated modules.')
+    parser.add_argument('--density', type=float, default=0.1,
+                        help='Probability of a pylint message in each generated function.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the corpus generator.')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1],
+                        help='Numbers of jobs to measure.')
+    parser.add_argument('--engines', nargs='+', default=['run', 'warm'], choices=['run', 'warm'],
+                        help='Engines to measure.')
+    parser.add_argument('--custom', default='both', choices=['no', 'yes', 'both'],
+                        help='Measure with custom hooks, without them or both.')
+    parser.add_argument('--no-startup', dest='startup', action='store_false',
+                        help='Do not measure the startup scenarios.')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs of each scenario. The fastest is kept.')
+    parser.add_argument('--corpus-dir', dest='corpus_dir', default='',
+                        help='Keep the generated corpus in this directory. '
+                             'Default is a temporary one.')
+    parser.add_argument('-o', '--output', default='', help='File to write the results as json.')
+    parser.add_argument('--compare', default='', help='Earlier result file to compare to.')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Relative change of a metric reported as a regression.')
+    return parser.parse_args(args)
+
+
+def scenarios(engines, jobs, custom):
+    """Name and runner options of each measured combination"""
+    customs = {"no": [False], "yes": [True], "both": [False, True]}[custom]
+    for with_custom in customs:
+        for engine in engines:
+            for n_jobs in jobs:
+                options = ["--no-cache", "--engine", engine, "-j", str(n_jobs)]
+                if with_custom:
+                    options.extend(["-cp", CUSTOM_PATH])
+                name = "engine={} jobs={} custom={}".format(engine, n_jobs,
+                                                            "yes" if with_custom else "no")
+                yield name, options
+
+
+def startup_scenarios(fnames, cache_dir):
+    """Name, linted files, runner options and number of warm-up runs of each startup scenario"""
+    yield "startup files=0", [], ["--no-cache"], 0
+    yield "startup cached", fnames, ["--cache-dir", cache_dir], 1
+
+
+def measure(corpus_dir, fnames, options):
+    """Lint the corpus in a fresh process and return its measurements"""
+    root = op.dirname(op.dirname(op.dirname(op.abspath(__file__))))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = op.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    config = json.dumps({"fnames": fnames, "options": options})
+    output = subprocess.check_output([sys.executable, MEASURE, config], cwd=corpus_dir, env=env)
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def environment():
+    """Versions and machine the results were measured with"""
+    import astroid
+    import pylint
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+        "pylint": pylint.__version__,
+        "astroid": astroid.__version__,
+    }
+
+
+def benchmark(args):
+    """Generate the corpus, measure every scenario and return the results"""
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="vainupylinter-bench-")
+    try:
+        fnames = generate_corpus(corpus_dir, n_files=args.files, n_lines=args.lines,
+                                 import_depth=args.import_depth, message_density=args.density,
+                                 seed=args.seed)
+        results = {}
+        cases = [(name, fnames, options, 0)
+                 for name, options in scenarios(args.engines, args.jobs, args.custom)]
+        if args.startup:
+            cases.extend(startup_scenarios(fnames, op.join(corpus_dir, ".bench-cache")))
+        for name, files, options, warm_up in cases:
+            for _ in range(warm_up):
+                measure(corpus_dir, files, options)
+            runs = [measure(corpus_dir, files, options) for _ in range(max(args.repeat, 1))]
+            startup = name.startswith("startup")
+            key = "total_s" if startup else "lint_s"
+            results[name] = min(runs, key=lambda result, key=key: result[key])
+            if startup and results[name]["pylint_imported"]:
+                logging.warning("{} imported pylint".format(name))
+            result = results[name]
+            logging.info("{:<36} {:>8.1f} files/s {:>8.2f} s import {:>8.2f} s first file {:>10} kB"
+                         .format(name, result["files_per_s"] or 0.0, result["import_s"],
+                                 result["first_file_s"] or 0.0, result["peak_rss_kb"]))
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+    corpus = {"files": args.files, "lines": args.lines, "import_depth": args.import_depth,
+              "density": args.density, "seed": args.seed}
+    return {"environment": environment(), "corpus": corpus, "results": results}
+
+
+def compare(baseline, current, tolerance=0.1):
+    """Metrics of current results that are worse than baseline by more than tolerance
+
+    Input
+    -----
+    baseline, current : dict
+        Results of benchmark.
+    tolerance : float
+        Allowed relative change.
+
+    Output
+    ------
+    list
+        Tuples (scenario, metric, baseline value, current value, relative change).
+        A scenario that imports pylint but did not before is reported as metric
+        pylint_imported with change None.
+    """
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        if old.get("pylint_imported") is False and result.get("pylint_imported"):
+            regressions.append((name, "pylint_imported", False, True, None))
+        for metric, larger_is_better in METRICS:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / float(before)
+            if (-change if larger_is_better else change) > tolerance:
+                regressions.append((name, metric, before, after, round(change, 3)))
+    return regressions
+
+
+def main():
+    """Run the benchmark"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_args(sys.argv[1:])
+    current = benchmark(args)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(current, handle, indent=2, sort_keys=True)
+    if not args.compare:
+        return 0
+    with open(args.compare) as handle:
+        baseline = json.load(handle)
+    if baseline.get("corpus") != current["corpus"]:
+        logging.warning("Corpus differs from the baseline, results are not comparable")
+    regressions = compare(baseline, current, args.tolerance)
+    for name, metric, before, after, change in regressions:
+        percent = "" if change is None else " ({:+.0%})".format(change)
+        logging.warning("REGRESSION {}: {} {} -> {}{}".format(name, metric, before, after, percent))
+    if not regressions:
+        logging.info("No regressions over {:.0%}".format(args.tolerance))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
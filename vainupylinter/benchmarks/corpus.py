@@ -0,0 +1,89 @@
+"""Generate reproducible synthetic python corpora to lint
+
+Files are written into a package. Each module imports the previous module of its
+import chain, up to import_depth modules deep. With probability message_density a
+function gets a defect that pylint complains about.
+"""
+from __future__ import absolute_import
+import os
+import os.path as op
+import random
+
+PACKAGE = "bench_pkg"
+# Function bodies with a defect pylint reports
+DEFECTS = (
+    "    unused = {value}\n    return arg",
+    "    Bad_Name = arg + {value}\n    return Bad_Name",
+    "    if arg == None:\n        return {value}\n    return arg",
+    "    return arg + undefined_{value}",
+    "    return [item for item in range({value}) if len([arg]) > 0]",
+)
+CLEAN = (
+    "    return arg + {value}",
+    "    result = [item * {value} for item in range(arg)]\n    return sum(result)",
+    "    if arg > {value}:\n        return arg\n    return {value}",
+)
+
+
+def module_source(idx, n_lines, import_depth, message_density, rand):
+    """Source of a single module"""
+    lines = ['"""Generated module {}"""'.format(idx)]
+    if import_depth > 1 and idx % import_depth:
+        lines.append("from {} import mod_{:05d}".format(PACKAGE, idx - 1))
+        lines.append("")
+        lines.append("PREVIOUS = mod_{:05d}.CONSTANT".format(idx - 1))
+    lines.append("CONSTANT = {}".format(idx))
+    func = 0
+    while len(lines) < n_lines:
+        value = rand.randint(1, 100)
+        if rand.random() < message_density:
+            body = rand.choice(DEFECTS).format(value=value)
+            docstring = "" if rand.random() < 0.5 else '    """Function {}"""\n'.format(func)
+        else:
+            body = rand.choice(CLEAN).format(value=value)
+            docstring = '    """Function {}"""\n'.format(func)
+        lines.append("")
+        lines.append("")
+        # One entry per line, so that the file stops near n_lines
+        lines.extend("def function_{}(arg):\n{}{}".format(func, docstring, body).split("\n"))
+        func += 1
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(target_dir, n_files=100, n_lines=100, import_depth=3, message_density=0.1,
+                    seed=0):
+    """Write a corpus under target_dir
+
+    Input
+    -----
+    target_dir : str
+        Directory to write to. The package is created in it.
+    n_files : int
+        Number of modules.
+    n_lines : int
+        Approximate number of lines in each module.
+    import_depth : int
+        Length of the import chains. 1 means no imports between modules.
+    message_density : float
+        Probability of a defect in each function.
+    seed : int
+        Seed of the random generator. Same inputs give the same corpus.
+
+    Output
+    ------
+    list
+        Paths of the modules relative to target_dir.
+    """
+    rand = random.Random(seed)
+    package_dir = op.join(target_dir, PACKAGE)
+    if not op.isdir(package_dir):
+        os.makedirs(package_dir)
+    with open(op.join(package_dir, "__init__.py"), "w") as handle:
+        handle.write('"""Generated package"""\n')
+    fnames = []
+    for idx in range(n_files):
+        fname = op.join(PACKAGE, "mod_{:05d}.py".format(idx))
+        with open(op.join(target_dir, fname), "w") as handle:
+            handle.write(module_source(idx, n_lines, import_depth, message_density, rand))
+        fnames.append(fname)
+    return fnames
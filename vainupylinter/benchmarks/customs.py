@@ -0,0 +1,24 @@
+"""Custom rules and scoring used when benchmarking the custom hooks"""
+
+
+def custom_rules(stats, fname=None):
+    """Fail files with undefined variables regardless of the score"""
+    if stats["by_msg"].get("undefined-variable"):
+        return False, True
+    return True, False
+
+
+def custom_score(stats):
+    """Treat singleton comparisons as errors"""
+    singletons = stats["by_msg"].get("singleton-comparison", 0)
+    if not singletons or not stats["statement"]:
+        return stats["global_note"]
+    error = stats["error"] + singletons
+    warning = stats["warning"]
+    return 10.0 - ((float(5 * error + warning + stats["refactor"] + stats["convention"])
+                    / stats["statement"]) * 10)
+
+
+def custom_thresholding(score, threshold, fname):
+    """Use the threshold as it is"""
+    return score >= threshold
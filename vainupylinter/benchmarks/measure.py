@@ -0,0 +1,52 @@
+"""Lint files once in a fresh process and print the measurements as json
+
+Run as a script, not as a module, so that importing the runner and pylint is
+part of the measurement. pylint_imported tells if linting needed pylint at all:
+
+    python measure.py '{"fnames": [...], "options": [...]}'
+"""
+from __future__ import absolute_import
+import json
+import logging
+import sys
+import time
+
+TIMER = getattr(time, "perf_counter", time.time)
+STARTED = TIMER()
+
+
+def measure(fnames, options):
+    """Lint fnames with the runner and return the measurements"""
+    from vainupylinter.custom_runner import PylintRunner, parse_args
+    from vainupylinter.profiling import peak_rss_kb
+    imported = TIMER()
+    runner = PylintRunner(parse_args(list(fnames) + ["-k", "-v", "40"] + list(options)))
+    start = TIMER()
+    exit_code = runner.lint_files(fnames)
+    lint_s = TIMER() - start
+    records = runner.records
+    return {
+        "import_s": round(imported - STARTED, 6),
+        "first_file_s": round(records[0]["duration"], 6) if records else None,
+        "lint_s": round(lint_s, 6),
+        "total_s": round(TIMER() - STARTED, 6),
+        "files": len(records),
+        "files_per_s": round(len(records) / lint_s, 3) if lint_s else None,
+        "failed": sum(1 for record in records if not record["passed"]),
+        "exit_code": exit_code,
+        "peak_rss_kb": peak_rss_kb(),
+        "worker_peak_rss_kb": peak_rss_kb(children=True),
+        "pylint_imported": "pylint.lint" in sys.modules,
+    }
+
+
+def main():
+    """Read the configuration from the first argument and print the result"""
+    config = json.loads(sys.argv[1])
+    # Only errors, stdout is the json result
+    logging.basicConfig(level=logging.ERROR, format='%(message)s')
+    print(json.dumps(measure(config["fnames"], config["options"]), sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
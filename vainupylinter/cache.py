@@ -0,0 +1,376 @@
+"""Content addressed on-disk cache for per-file lint results
+
+An entry is keyed by the hash of the file contents together with everything else
+that affects the verdict: the rcfile, pylint and astroid versions, the custom
+module source and the runner settings. Entries contain the part of linter.stats
+that the runner uses, or all of it when custom hooks read the stats, plus the
+pylint output of the file.
+
+Every entry is a separate json file that is written to a temporary file and
+renamed in place, so several runners can share one cache directory. Reads touch
+the entry, and prune removes the least recently used entries above the size cap.
+
+The failures and lint durations of files in earlier runs are kept next to the
+entries, to order and schedule the files of the next run.
+"""
+from __future__ import absolute_import
+import errno
+import hashlib
+import json
+import os
+import os.path as op
+import tempfile
+
+import pylint
+
+try:
+    from importlib.util import find_spec
+except ImportError:
+    find_spec = None  # pylint: disable=invalid-name
+
+# os.rename does not overwrite on Windows, os.replace does not exist in python 2.7
+_replace = getattr(os, "replace", os.rename)  # pylint: disable=invalid-name
+DEFAULT_MAX_ENTRIES = 10000
+CACHE_VERSION = "1"
+# Part of linter.stats stored in the cache
+STATS_KEYS = ("global_note", "by_msg", "statement", "error", "fatal", "warning",
+              "refactor", "convention", "info")
+# Weight of the latest duration in the average of a file
+DURATION_WEIGHT = 0.5
+# Used to estimate durations before any file has a duration
+DEFAULT_SECONDS_PER_BYTE = 2e-5
+
+
+def default_cache_dir():
+    """Per-user cache directory"""
+    base = os.environ.get("XDG_CACHE_HOME") or op.join(op.expanduser("~"), ".cache")
+    return op.join(base, "vainupylinter")
+
+
+def _read_bytes(fname):
+    """File contents or empty bytes if file does not exist"""
+    if not fname or not op.isfile(fname):
+        return b""
+    with open(fname, "rb") as handle:
+        return handle.read()
+
+
+def find_pylintrc():
+    """The rcfile pylint would find, without importing pylint.config
+
+    Same lookup as pylint's find_pylintrc: pylintrc or .pylintrc in the current directory
+    and in the parents of a package, PYLINTRC, the user's home directory and /etc/pylintrc.
+    """
+    rc_names = ("pylintrc", ".pylintrc")
+    for rc_name in rc_names:
+        if op.isfile(rc_name):
+            return op.abspath(rc_name)
+    if op.isfile("__init__.py"):
+        curdir = op.abspath(os.getcwd())
+        while op.isfile(op.join(curdir, "__init__.py")):
+            curdir = op.abspath(op.join(curdir, ".."))
+            for rc_name in rc_names:
+                if op.isfile(op.join(curdir, rc_name)):
+                    return op.join(curdir, rc_name)
+    if "PYLINTRC" in os.environ and op.exists(os.environ["PYLINTRC"]):
+        if op.isfile(os.environ["PYLINTRC"]):
+            return os.environ["PYLINTRC"]
+    else:
+        user_home = op.expanduser("~")
+        if user_home not in ("~", "/root"):
+            for home_rc in (op.join(user_home, ".pylintrc"),
+                            op.join(user_home, ".config", "pylintrc")):
+                if op.isfile(home_rc):
+                    return home_rc
+    if op.isfile("/etc/pylintrc"):
+        return "/etc/pylintrc"
+    return None
+
+
+def astroid_version():
+    """Identifies the installed astroid without importing it: the source of its __pkginfo__"""
+    spec = find_spec("astroid") if find_spec is not None else None
+    if spec is None or not spec.submodule_search_locations:
+        import astroid  # pylint: disable=import-outside-toplevel
+        return getattr(astroid, "__version__", "").encode("utf-8")
+    return _read_bytes(op.join(list(spec.submodule_search_locations)[0], "__pkginfo__.py"))
+
+
+def run_context(rcfile, custom_file, thresh, allow_errors, ignore_tests):
+    """Hash everything besides the file contents that affects the result
+
+    Input
+    -----
+    rcfile : str | None
+        rcfile given to the runner. If None, the rcfile pylint would find is used.
+    custom_file : str | None
+        Source file of the custom module.
+    thresh, allow_errors, ignore_tests
+        Runner settings.
+    """
+    if not (rcfile and op.isfile(rcfile)):
+        rcfile = find_pylintrc()
+    digest = hashlib.sha256()
+    for part in (CACHE_VERSION, pylint.__version__, repr(thresh), repr(bool(allow_errors)),
+                 repr(bool(ignore_tests))):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(astroid_version() + b"\0")
+    digest.update(_read_bytes(rcfile) + b"\0")
+    digest.update(_read_bytes(custom_file))
+    return digest.hexdigest()
+
+
+def stats_subset(stats):
+    """Cacheable part of linter.stats"""
+    return {key: stats[key] for key in STATS_KEYS if key in stats}
+
+
+def _json_default(value):
+    """Sets, e.g. in the dependencies of linter.stats, are stored as sorted lists"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError("{!r} is not json serializable".format(value))
+
+
+def full_stats(stats):
+    """All of linter.stats that json can store, for custom hooks that may read any of it"""
+    stored = {}
+    for key, value in stats.items():
+        try:
+            stored[key] = json.loads(json.dumps(value, default=_json_default))
+        except (TypeError, ValueError):
+            continue
+    return stored
+
+
+def write_json(path, data):
+    """Write data as json to a temporary file and rename it in place. Returns False if writing
+    failed"""
+    directory = op.dirname(path)
+    try:
+        if not op.isdir(directory):
+            os.makedirs(directory)
+    except OSError as error:
+        # Created by another runner in between
+        if error.errno != errno.EEXIST:
+            return False
+    try:
+        handle, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except (IOError, OSError):
+        return False
+    try:
+        with os.fdopen(handle, "w") as tmp:
+            json.dump(data, tmp)
+        _replace(tmp_path, path)
+    except (IOError, OSError):
+        os.remove(tmp_path)
+        return False
+    return True
+
+
+class CachedLinter(object):
+    """Stands in for the pylint linter on a cache hit"""
+    __slots__ = ("stats",)
+
+    def __init__(self, stats):
+        self.stats = stats
+
+
+class CachedRun(object):
+    """Stands in for pylint's Run on a cache hit"""
+    __slots__ = ("linter",)
+
+    def __init__(self, stats):
+        self.linter = CachedLinter(stats)
+
+
+class ResultCache(object):
+    """Lint results stored as json files under cache_dir
+
+    Input
+    -----
+    cache_dir : str
+        Directory for the cache. Created if needed.
+    max_entries : int | DEFAULT_MAX_ENTRIES
+        Number of entries kept by prune.
+    """
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(content_digest, context):
+        """Cache key for file contents in given run context"""
+        return hashlib.sha256((context + content_digest).encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        """Location of the entry"""
+        return op.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        """Return cached entry or None"""
+        path = self.path(key)
+        try:
+            with open(path) as handle:
+                entry = json.load(handle)
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key, stats, output=None, full=False):
+        """Store stats and pylint output lines of a file. Returns False if writing failed.
+        With full every stat json can store is kept instead of STATS_KEYS"""
+        stored = full_stats(stats) if full else stats_subset(stats)
+        return write_json(self.path(key), {"stats": stored, "output": output or []})
+
+    def entries(self):
+        """List (mtime, path) of all entries"""
+        found = []
+        if not op.isdir(self.cache_dir):
+            return found
+        for subdir in os.listdir(self.cache_dir):
+            subpath = op.join(self.cache_dir, subdir)
+            if not op.isdir(subpath):
+                continue
+            for name in os.listdir(subpath):
+                if not name.endswith(".json"):
+                    continue
+                path = op.join(subpath, name)
+                try:
+                    found.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    # Removed by another runner
+                    continue
+        return found
+
+    def prune(self):
+        """Remove least recently used entries above max_entries. Returns number of removed"""
+        found = self.entries()
+        if len(found) <= self.max_entries:
+            return 0
+        found.sort()
+        removed = 0
+        for _, path in found[:len(found) - self.max_entries]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+class FileHistory(object):
+    """Entries of files from earlier runs, stored as json
+
+    Input
+    -----
+    path : str
+        Location of the json file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.changed = False
+        try:
+            with open(path) as handle:
+                self.files = json.load(handle)
+        except (IOError, OSError, ValueError):
+            self.files = {}
+
+    def save(self):
+        """Write the entries if they changed. Returns False if writing failed"""
+        if not self.changed:
+            return True
+        if not write_json(self.path, self.files):
+            return False
+        self.changed = False
+        return True
+
+
+class FailureHistory(FileHistory):
+    """How often files have failed in earlier runs, stored as json
+
+    Only files that have failed at least once are tracked.
+
+    Input
+    -----
+    path : str
+        Location of the json file.
+    """
+
+    def add(self, fname, passed):
+        """Record the outcome of a linted file"""
+        fname = op.abspath(fname)
+        entry = self.files.get(fname)
+        if entry is None:
+            if passed:
+                return
+            entry = self.files[fname] = {"runs": 0, "failures": 0, "last": False}
+        entry["runs"] += 1
+        entry["failures"] += 0 if passed else 1
+        entry["last"] = not passed
+        self.changed = True
+
+    def likelihood(self, fname):
+        """Sort key that puts files that failed last time first, then by failure rate"""
+        entry = self.files.get(op.abspath(fname))
+        if entry is None:
+            return (1, 0.0)
+        return (0 if entry["last"] else 1, -float(entry["failures"]) / max(entry["runs"], 1))
+
+    def order(self, fnames):
+        """Files most likely to fail first, otherwise in the given order"""
+        return sorted(fnames, key=self.likelihood)
+
+
+class DurationHistory(FileHistory):
+    """Lint durations of files in earlier runs, stored as json
+
+    Durations of files without history are estimated from their size.
+
+    Input
+    -----
+    path : str
+        Location of the json file.
+    """
+    def __init__(self, path):
+        super(DurationHistory, self).__init__(path)  # pylint: disable=super-with-arguments
+        self.rate = None
+
+    def add(self, fname, seconds):
+        """Record the lint duration of a file. Earlier durations are averaged in"""
+        fname = op.abspath(fname)
+        try:
+            size = os.stat(fname).st_size
+        except OSError:
+            return
+        entry = self.files.get(fname)
+        if entry:
+            seconds = DURATION_WEIGHT * seconds + (1 - DURATION_WEIGHT) * entry[0]
+        self.files[fname] = [round(seconds, 6), size]
+        self.changed = True
+        self.rate = None
+
+    def seconds_per_byte(self):
+        """Average lint time per byte of the files with history"""
+        if self.rate is None:
+            seconds = sum(entry[0] for entry in self.files.values())
+            size = sum(entry[1] for entry in self.files.values())
+            self.rate = seconds / size if seconds and size else DEFAULT_SECONDS_PER_BYTE
+        return self.rate
+
+    def estimate(self, fname):
+        """Estimated lint duration of the file in seconds"""
+        fname = op.abspath(fname)
+        try:
+            size = os.stat(fname).st_size
+        except OSError:
+            return 0.0
+        entry = self.files.get(fname)
+        if entry and entry[1]:
+            # Scale by the change in size since the duration was recorded
+            return entry[0] * size / entry[1]
+        if entry:
+            return entry[0]
+        return size * self.seconds_per_byte()
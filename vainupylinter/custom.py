@@ -0,0 +1,97 @@
+"""Custom rules module that is imported only when one of its hooks is called
+
+The hooks a custom module defines are read from its source, so the module and
+whatever it imports, often pylint itself, are not loaded by runs that lint nothing.
+A module whose names cannot be read from the source is imported right away.
+"""
+from __future__ import absolute_import
+import ast
+import importlib
+
+try:
+    from importlib.util import find_spec
+except ImportError:
+    find_spec = None  # pylint: disable=invalid-name
+
+
+def _bound_names(statements, names):
+    """Add names bound by statements at module level. False if they cannot be known"""
+    for node in statements:
+        if (isinstance(node, (ast.FunctionDef, ast.ClassDef))
+                or type(node).__name__ == "AsyncFunctionDef"):
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    return False
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, (ast.Assign, ast.AugAssign)) or type(node).__name__ == "AnnAssign":
+            targets = getattr(node, "targets", None) or [node.target]
+            for target in targets:
+                names.update(name.id for name in ast.walk(target) if isinstance(name, ast.Name))
+        else:
+            # Names bound conditionally, e.g. in if or try blocks
+            for field in ("body", "orelse", "finalbody"):
+                if not _bound_names(getattr(node, field, []), names):
+                    return False
+            for handler in getattr(node, "handlers", []):
+                if not _bound_names(handler.body, names):
+                    return False
+    return True
+
+
+def defined_names(fname):
+    """Names defined at the top level of a source file, None if not known without importing it"""
+    try:
+        with open(fname, "rb") as handle:
+            tree = ast.parse(handle.read(), fname)
+    except (IOError, OSError, SyntaxError, ValueError, TypeError):
+        return None
+    names = set()
+    if not _bound_names(tree.body, names):
+        return None
+    return names
+
+
+class CustomModule(object):
+    """Custom rules module, imported when a hook is first called
+
+    Input
+    -----
+    path : str
+        Module path, e.g. rules.custom_rules. Raises ImportError if the module
+        cannot be found.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.module = None
+        self.file = None
+        names = None
+        spec = find_spec(path) if find_spec is not None else None
+        if spec is not None and spec.origin and spec.origin.endswith(".py"):
+            self.file = spec.origin
+            names = defined_names(self.file)
+        if names is None:
+            self.load()
+            names = set(dir(self.module))
+        self.names = names
+
+    def load(self):
+        """Import the module"""
+        if self.module is None:
+            self.module = importlib.import_module(self.path)
+            self.file = getattr(self.module, "__file__", None) or self.file
+        return self.module
+
+    def hook(self, name):
+        """Function that calls hook name of the module, None if the module does not define it"""
+        if name not in self.names:
+            return None
+        if self.module is not None:
+            return getattr(self.module, name)
+
+        def call(*args, **kwargs):
+            """Import the module and call the hook"""
+            return getattr(self.load(), name)(*args, **kwargs)
+        call.__name__ = name
+        return call
@@ -5,11 +5,12 @@ Wrap pylint inside custom class to do some customised handling of the result"
 from __future__ import absolute_import, print_function
 import sys
 import argparse
+import hashlib
 import logging
-import importlib
+import itertools
+import time
 import os.path as op
 import pylint
-from pylint.lint import Run
 
 try:
     ModuleNotFoundError
@@ -17,11 +18,68 @@ except NameError:
     ModuleNotFoundError = ImportError   # pylint: disable=redefined-builtin
 
 try:
-    from vainupylinter.print_logger import PrintLogger, redirect_stdout
+    from vainupylinter.parallel import lint_isolated, lint_parallel
+    from vainupylinter.engine import ENGINES, WarmLinter
+    from vainupylinter.cache import (CachedRun, DEFAULT_MAX_ENTRIES, DurationHistory, FailureHistory, ResultCache,
+                                     default_cache_dir, run_context)
+    from vainupylinter.depgraph import ImportIndex
+    from vainupylinter.daemon import LintServer, default_socket_path, run_client
+    from vainupylinter.gitdiff import (BlobReader, GitError, LineIndex, changed_files, changed_lines,
+                                       filter_stats, staged_blobs, stdin_from)
+    from vainupylinter.custom import CustomModule
+    from vainupylinter.output import FORMATS, open_output, records_to_stdout, stdout_to
+    from vainupylinter.profiling import Profiler
+    from vainupylinter.memory import MemoryPolicy, evict_changed_modules
+    from vainupylinter.results import CATEGORIES, ResultStore, columns
+    from vainupylinter.discover import FileFinder, is_python_file
+    from vainupylinter.history import DEFAULT_KEEP, EPSILON, ScoreHistory, content_hash
+    from vainupylinter.shard import Shard, merge, parse_shard
+    from vainupylinter.watch import DEBOUNCE, Watch
+    from vainupylinter.profiles import PROFILES, ProfileRules, is_test_file, parse_path_profile
+    from vainupylinter.duplicates import MIN_LINES, duplicate_stats, find_duplicates
 except ModuleNotFoundError:
-    from print_logger import PrintLogger, redirect_stdout
+    from parallel import lint_isolated, lint_parallel
+    from engine import ENGINES, WarmLinter
+    from cache import (CachedRun, DEFAULT_MAX_ENTRIES, DurationHistory, FailureHistory, ResultCache,
+                       default_cache_dir, run_context)
+    from depgraph import ImportIndex
+    from daemon import LintServer, default_socket_path, run_client
+    from gitdiff import (BlobReader, GitError, LineIndex, changed_files, changed_lines, filter_stats,
+                         staged_blobs, stdin_from)
+    from custom import CustomModule
+    from output import FORMATS, open_output, records_to_stdout, stdout_to
+    from profiling import Profiler
+    from memory import MemoryPolicy, evict_changed_modules
+    from results import CATEGORIES, ResultStore, columns
+    from discover import FileFinder, is_python_file
+    from history import DEFAULT_KEEP, EPSILON, ScoreHistory, content_hash
+    from shard import Shard, merge, parse_shard
+    from watch import DEBOUNCE, Watch
+    from profiles import PROFILES, ProfileRules, is_test_file, parse_path_profile
+    from duplicates import MIN_LINES, duplicate_stats, find_duplicates
 
 sys.path.append(op.abspath("."))
+# Reasons of files that were not linted and have no stats
+NOT_LINTED = ("skipped", "missing", "crashed", "timed-out")
+# pylint.lint and the reporter are imported by load_pylint when the first file is linted,
+# so that runs answered from the cache, or with nothing to lint, do not pay for importing them
+Run = None  # pylint: disable=invalid-name
+CollectingReporter = None  # pylint: disable=invalid-name
+
+
+def load_pylint():
+    """Import pylint's Run and the reporter of the runner if not imported yet"""
+    global Run, CollectingReporter  # pylint: disable=global-statement,invalid-name
+    if CollectingReporter is None:
+        try:
+            from vainupylinter.reporter import CollectingReporter as reporter_class  # pylint: disable=import-outside-toplevel
+        except ModuleNotFoundError:
+            from reporter import CollectingReporter as reporter_class  # pylint: disable=import-outside-toplevel
+        CollectingReporter = reporter_class
+    if Run is None:
+        from pylint.lint import Run as run_class  # pylint: disable=import-outside-toplevel
+        Run = run_class
+    return Run, CollectingReporter
 
 def parse_args(args):
     """Handle inputs"""
@@ -31,7 +89,8 @@ def parse_args(args):
         nargs='*',
         type=str,
         dest='fnames',
-        help='The files to pylint. Pylinting is performed only to *.py files.'
+        help='The files, directories or globs to pylint. Pylinting is performed only to *.py files. '
+             'Directories are walked skipping files ignored by .gitignore or the rcfile.'
     )
     parser.add_argument(
         '-r', '--rcfile',
@@ -82,9 +141,324 @@ def parse_args(args):
         default=20,
         help="Logger verbosity. Defaults to 20 (INFO)"
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        dest='jobs',
+        default=1,
+        help="Number of processes used to lint files in parallel. 0 uses all available cores. Defaults to 1"
+    )
+    parser.add_argument(
+        '--engine',
+        type=str,
+        dest='engine',
+        default='run',
+        choices=ENGINES,
+        help="'run' creates a new pylint run for each file, 'warm' reuses one configured linter "
+             "per process. Defaults to run"
+    )
+    parser.add_argument(
+        '--max-files-per-worker',
+        type=int,
+        dest='max_files_per_worker',
+        default=0,
+        help="Restart parallel workers after linting this many files. Without jobs, astroid caches are "
+             "evicted instead. Defaults to 0 (never)"
+    )
+    parser.add_argument(
+        '--max-rss',
+        type=int,
+        dest='max_rss',
+        default=0,
+        metavar='MB',
+        help="Evict astroid caches after a file if the process uses more memory than this, waiting "
+             "longer between evictions while it stays over. Parallel workers over the limit are "
+             "replaced instead. Defaults to 0 (no limit)"
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        dest='cache_dir',
+        default=default_cache_dir(),
+        help="Directory for cached results of unchanged files. Defaults to ~/.cache/vainupylinter"
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        dest='cache_size',
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of cached results. Least recently used are removed first. "
+             "Defaults to {}".format(DEFAULT_MAX_ENTRIES)
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        default=False,
+        action='store_true',
+        help="Lint all files without using or updating the result cache"
+    )
+    parser.add_argument(
+        '-x', '--fail-fast',
+        dest='fail_fast',
+        default=False,
+        action='store_true',
+        help="Stop at the first file that fails and cancel the files being linted"
+    )
+    parser.add_argument(
+        '--failed-first',
+        dest='failed_first',
+        default=False,
+        action='store_true',
+        help="Lint first the files that failed last time, then the ones that fail most often. "
+             "Failures are remembered in the cache directory"
+    )
+    parser.add_argument(
+        '--history',
+        dest='history',
+        default=False,
+        action='store_true',
+        help="Record the score, message counts and lint time of each file in a SQLite database in the "
+             "cache directory"
+    )
+    parser.add_argument(
+        '--history-keep',
+        type=int,
+        dest='history_keep',
+        default=DEFAULT_KEEP,
+        help="Number of recorded runs kept per file. Defaults to {}".format(DEFAULT_KEEP)
+    )
+    parser.add_argument(
+        '--ratchet',
+        dest='ratchet',
+        default=False,
+        action='store_true',
+        help="A file passes if its score is not lower than its last passing score in the history. "
+             "Files without history use the threshold. Implies --history"
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        dest='shard',
+        default=None,
+        metavar='i/N',
+        help="Lint only the i:th of N shards of the files, balanced by file size. Shards are numbered from 1"
+    )
+    parser.add_argument(
+        '--artifact',
+        type=str,
+        dest='artifact',
+        default='',
+        help="Write the results as a json artifact, to be combined with 'vainupylinter merge'"
+    )
+    parser.add_argument(
+        '--file-timeout',
+        type=float,
+        dest='file_timeout',
+        default=0,
+        metavar='SECONDS',
+        help="Lint each file in a separate worker process that is killed if the file takes longer than this. "
+             "The file fails as timed out and the rest continue on a new worker. Defaults to 0 (no timeout)"
+    )
+    parser.add_argument(
+        '--duplicates',
+        dest='duplicates',
+        default=False,
+        action='store_true',
+        help="Find code duplicated between the linted files before linting them. The duplicated lines of "
+             "each file are added to its stats as duplicate_lines"
+    )
+    parser.add_argument(
+        '--duplicate-min-lines',
+        type=int,
+        dest='duplicate_min_lines',
+        default=MIN_LINES,
+        help="Shortest duplicate block in lines, not counting comments, docstrings and imports. Defaults to 4"
+    )
+    parser.add_argument(
+        '--max-duplicate-lines',
+        type=int,
+        dest='max_duplicate_lines',
+        default=-1,
+        help="Fail files with more lines duplicated in other files. Implies --duplicates. Defaults to -1 (no limit)"
+    )
+    parser.add_argument(
+        '--test-profile',
+        type=str,
+        dest='test_profile',
+        default='full',
+        choices=sorted(PROFILES),
+        help="Lint profile of test files (test_*, *tests.py): 'errors' with error and fatal messages only, "
+             "'skip' to not lint them. Defaults to full"
+    )
+    parser.add_argument(
+        '--path-profile',
+        type=parse_path_profile,
+        dest='path_profile',
+        action='append',
+        default=[],
+        metavar='PATTERN=PROFILE',
+        help="Lint files matching the comma separated glob patterns with a profile (full, errors or skip). "
+             "Patterns without a slash match the file name. Can be repeated, the first matching pattern wins"
+    )
+    parser.add_argument(
+        '--watch',
+        dest='watch',
+        default=False,
+        action='store_true',
+        help="Keep running and lint changed files, and the files importing them, again after every save"
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        dest='debounce',
+        default=DEBOUNCE,
+        help="With --watch, seconds without further changes before linting. Defaults to {}".format(DEBOUNCE)
+    )
+    parser.add_argument(
+        '--serve',
+        dest='serve',
+        default=False,
+        action='store_true',
+        help="Start a lint daemon that keeps pylint warm and lints files sent with --daemon"
+    )
+    parser.add_argument(
+        '-d', '--daemon',
+        dest='daemon',
+        default=False,
+        action='store_true',
+        help="Lint with a running daemon. Files are linted locally if no daemon is running"
+    )
+    parser.add_argument(
+        '--socket',
+        type=str,
+        dest='socket',
+        default=default_socket_path(),
+        help="Socket of the lint daemon. Defaults to ~/.cache/vainupylinter/daemon.sock"
+    )
+    parser.add_argument(
+        '-s', '--since',
+        type=str,
+        dest='since',
+        default=None,
+        metavar='ref',
+        help="Lint only files changed since the merge base of the git reference and HEAD"
+    )
+    parser.add_argument(
+        '--staged',
+        dest='staged',
+        default=False,
+        action='store_true',
+        help="Lint only files staged for commit"
+    )
+    parser.add_argument(
+        '-l', '--changed-lines',
+        dest='changed_lines',
+        default=False,
+        action='store_true',
+        help="With --since or --staged, count only messages on changed lines"
+    )
+    parser.add_argument(
+        '--staged-content',
+        dest='staged_content',
+        default=False,
+        action='store_true',
+        help="Lint the staged content of the files instead of the working tree. Implies --staged"
+    )
+    parser.add_argument(
+        '-f', '--format',
+        type=str,
+        dest='format',
+        default='text',
+        choices=FORMATS,
+        help="'jsonl' writes a json record of each file as soon as it is linted. Defaults to text"
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        dest='output',
+        default='-',
+        help="File for the jsonl records. Defaults to stdout"
+    )
+    parser.add_argument(
+        '-p', '--profile',
+        dest='profile',
+        default=False,
+        action='store_true',
+        help="Measure time and memory used for each file, pylint checker and custom hook"
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        dest='profile_top',
+        default=10,
+        help="Number of slowest files and checkers shown with --profile. Defaults to 10"
+    )
+    parser.add_argument(
+        '--profile-output',
+        type=str,
+        dest='profile_output',
+        default='',
+        help="File to write the --profile results as json"
+    )
     return parser.parse_args(args)
 
 
+def make_args(config=None, **options):
+    """Runner arguments: the command line defaults updated with config and then options
+
+    Input
+    -----
+    config : dict, argparse.Namespace | None
+        Options by their dest name in parse_args, e.g. {"thresh": 8.0, "jobs": 2}.
+    options
+        More options, as keyword arguments.
+
+    Raises TypeError for unknown options.
+    """
+    args = parse_args([])
+    values = dict(vars(config)) if isinstance(config, argparse.Namespace) else dict(config or {})
+    values.update(options)
+    unknown = sorted(set(values) - set(vars(args)))
+    if unknown:
+        raise TypeError("Unknown lint options: {}".format(", ".join(unknown)))
+    for key, value in values.items():
+        setattr(args, key, value)
+    return args
+
+
+class RunResult(object):
+    """Result of linting files, see lint_files
+
+    Attributes
+    ----------
+    exit_code : int
+        0 if all files passed, as the command line would exit.
+    records : list
+        Result record of each file, see PylintRunner.lint_file.
+    failed_files : list
+        Files that did not pass.
+    custom_failed : list
+        Files that failed custom checks.
+    log : list
+        Log records (logger name, level, message) of the run if it was collected,
+        see service.LintService and parallel.replay.
+    """
+    def __init__(self, exit_code, records, failed_files, custom_failed, log=None):
+        self.exit_code = exit_code
+        self.records = list(records)
+        self.failed_files = list(failed_files)
+        self.custom_failed = list(custom_failed)
+        self.log = list(log or [])
+
+    @property
+    def passed(self):
+        """True if all files passed"""
+        return self.exit_code == 0
+
+    def __repr__(self):
+        return "RunResult(exit_code={}, files={}, failed={})".format(self.exit_code, len(self.records),
+                                                                     len(self.failed_files) + len(self.custom_failed))
+
 
 class PylintRunner(object):
     """Class wrapper for pylint runner
@@ -103,7 +477,8 @@ class PylintRunner(object):
     ignore_tests : bool | False (Default)
         If True, test files will always pass
     keep_results : bool | False (Default)
-        Save .coverage result to allow score comparisons
+        Save .coverage result to allow score comparisons. Results of every file
+        are kept in store, a results.ResultStore, across runs.
     custom-path: str | ""
         Module path to a file that contains custom_rules and custom_scoring.
         These have to defined as follows:
@@ -117,22 +492,188 @@ class PylintRunner(object):
         custom_thresholding: function
             Input: score (float), threshold (float), filepath as str
             Output: bool
+        custom_profile: function, optional
+            Called with the profile of each file when profile is True.
+            Input: profile (dict)
+        custom_rules_batch: function, optional
+            Called once with the results of all linted files after the run.
+            Input: stats (dict of lists, see results.columns), filepaths (list)
+    verbosity : int | 20 (Default)
+        Level of the "vainupylinter" and "pylint" loggers. No handler is added.
+            Output: list of tuple[bool, bool] (passed, override), one per file
+    file_timeout : float | 0 (Default)
+        Seconds a file may take. If set, files are linted in worker processes
+        (jobs of them) and a worker is killed when its file runs out of time
+        or replaced when it dies. The file fails with reason "timed-out" or "crashed".
+    test_profile : str | "full" (Default)
+        Lint profile of test files, see profiles.PROFILES. "errors" checks only
+        for error and fatal messages and "skip" does not lint them at all.
+    path_profile : list | [] (Default)
+        Tuples (patterns, profile): files matching the glob patterns are linted
+        with the profile. The first matching rule wins, before test_profile.
+    duplicates : bool | False (Default)
+        Read all files before linting and find the blocks of code duplicated
+        between them, see duplicates.DuplicateIndex. linter.stats of each file
+        gets duplicate_lines, the number of its lines found in other files, and
+        duplicates, the blocks with the other file and its lines.
+    duplicate_min_lines : int | 4 (Default)
+        Shortest duplicate block, in lines that are not comments, docstrings or imports.
+    max_duplicate_lines : int | -1 (Default)
+        Files with more duplicate lines fail with reason "duplicate-code".
+        Implies duplicates. -1 has no limit.
+    jobs : int | 1 (Default)
+        Number of worker processes. 0 uses all available cores.
+    engine : str | "run" (Default)
+        "run" creates a new pylint Run for each file. "warm" configures one
+        linter per process and lints every file against it.
+    max_files_per_worker : int | 0 (Default)
+        Parallel workers are restarted after this many files. Linting without
+        jobs evicts astroid caches after every batch of this many files instead.
+        0 never restarts.
+    max_rss : int | 0 (Default)
+        Astroid caches are evicted after a file if the resident set size of the
+        process is over this many megabytes, see memory.MemoryPolicy. Parallel
+        workers over the limit exit after the file and are replaced. 0 has no limit.
+    cache_dir : str | "" (Default)
+        Directory of the result cache. Results of unchanged files are read from
+        the cache instead of linting. A file is unchanged if neither it nor any
+        local module it transitively imports has changed. No cache is used if empty.
+    cache_size : int | 10000 (Default)
+        Maximum number of cached results.
+    no_cache : bool | False (Default)
+        If True, cache is not used even if cache_dir is given.
+    fail_fast : bool | False (Default)
+        Stop at the first failed file. Files being linted in parallel are cancelled.
+    failed_first : bool | False (Default)
+        Lint the files most likely to fail first, based on the failure history
+        kept in cache_dir. Requires the list of files before linting starts.
+    history : bool | False (Default)
+        Record the score, message counts and duration of every linted file in
+        a SQLite database in cache_dir, see history.ScoreHistory.
+    history_keep : int | 20 (Default)
+        Number of recorded runs kept per file.
+    ratchet : bool | False (Default)
+        Instead of the threshold, a file must score at least its last passing
+        score in the history. Files without history use the threshold. Implies history.
+    shard : tuple(int, int) | None (Default)
+        (i, N) to lint only the i:th of N shards of the files, see shard.Shard.
+        Requires the list of files before linting starts.
+    artifact : str | "" (Default)
+        File to write the result artifact of the run or shard to, see merge_results.
+    since : str | None (Default)
+        Lint only the files changed since the merge base of this git reference and HEAD.
+    staged : bool | False (Default)
+        Lint only the files staged for commit.
+    changed_lines : bool | False (Default)
+        With since or staged, count only the messages on changed lines when
+        scoring and evaluating. Fatal messages are always counted.
+    staged_content : bool | False (Default)
+        Lint the content staged for commit instead of the working tree file.
+        Implies staged. The blob sha is used in the cache key instead of
+        hashing the contents, and the imports are read from the staged content
+        too. A staged file is linted even if it is gone from the working tree.
+    format : str | "text" (Default)
+        "jsonl" writes the result record of each file, see lint_file, as a
+        json line as soon as the file is done.
+    output : str | "-" (Default)
+        File for the json lines. "-" is stdout, then the prints of custom hooks
+        go to stderr.
+    profile : bool | False (Default)
+        Record wall time and peak memory of linting each file and the time spent
+        in each pylint checker and custom hook. The slowest ones are reported at the end.
+    profile_top : int | 10 (Default)
+        Number of files and checkers shown in the profile report.
+    profile_output : str | "" (Default)
+        File to write the profile as json.
 
     """
     def __init__(self, args):
+        self.args = args
         self.rcfile = args.rcfile if args.rcfile else None
         self.thresh = args.thresh
         self.allow_errors = args.allow_errors
         self.ignore_tests = args.ignore_tests
         self.keep_results = args.keep_results
+        self.jobs = getattr(args, 'jobs', 1)
+        self.since = getattr(args, 'since', None)
+        self.staged_content = getattr(args, 'staged_content', False)
+        self.staged = getattr(args, 'staged', False) or self.staged_content
+        self.blobs = None
+        self.blob_reader = BlobReader()
+        self.only_changed_lines = getattr(args, 'changed_lines', False)
+        self.changed_lines = None
+        self.warm_linter = WarmLinter(self.new_run) if getattr(args, 'engine', 'run') == 'warm' else None
+        self.memory = MemoryPolicy(getattr(args, 'max_files_per_worker', 0), getattr(args, 'max_rss', 0))
+        self.started = None
         self.failed_files = []
         self.custom_failed = []
         self.results = None
         self.fname = None
-        self.logging = logging
-        self.logging.basicConfig(level=args.verbosity,
-                                 format='%(message)s')
+        self.records = []
+        self.store = ResultStore()
+        self.reasons = []
+        self.score = None
+        self.custom_outcome = None
+        self.output_format = getattr(args, 'format', 'text')
+        self.output_path = getattr(args, 'output', '-')
+        # Handlers are left to the application, or to run on the command line
+        self.logging = logging.getLogger("vainupylinter")
+        if getattr(args, 'verbosity', None) is not None:
+            for name in ("vainupylinter", "pylint"):
+                logging.getLogger(name).setLevel(args.verbosity)
+        self.cache = None
+        self.import_index = None
+        if getattr(args, 'cache_dir', '') and not getattr(args, 'no_cache', False):
+            self.cache = ResultCache(args.cache_dir, getattr(args, 'cache_size', DEFAULT_MAX_ENTRIES))
+            # Staged content, if it is linted, is indexed from its blobs
+            self.import_index = ImportIndex(op.join(args.cache_dir, "imports.json"), self.staged_blob,
+                                            self.blob_reader.read)
+        self.cache_contexts = {}
+        self.fail_fast = getattr(args, 'fail_fast', False)
+        self.file_timeout = getattr(args, 'file_timeout', 0)
+        self.profile_rules = ProfileRules(getattr(args, 'path_profile', None) or (),
+                                          getattr(args, 'test_profile', 'full'))
+        self.lint_profile = "full"
+        self.max_duplicate_lines = getattr(args, 'max_duplicate_lines', -1)
+        self.check_duplicates = getattr(args, 'duplicates', False) or self.max_duplicate_lines >= 0
+        self.duplicate_min_lines = getattr(args, 'duplicate_min_lines', MIN_LINES)
+        # Duplicates of each file by absolute path, and the files to search if not only the linted ones
+        self.duplicates = {}
+        self.project_files = None
+        self.failed_first = getattr(args, 'failed_first', False)
+        self.history = None
+        self.durations = None
+        self.cached = False
+        if self.cache:
+            self.history = FailureHistory(op.join(args.cache_dir, "failures.json"))
+            self.durations = DurationHistory(op.join(args.cache_dir, "durations.json"))
+        elif self.failed_first:
+            self.logging.warning("Failed first needs a cache directory, files are linted in order")
+            self.failed_first = False
+        self.shard_spec = getattr(args, 'shard', None)
+        self.artifact = getattr(args, 'artifact', '')
+        self.ratchet = getattr(args, 'ratchet', False)
+        self.score_history = None
+        self.content_hash = None
+        if getattr(args, 'history', False) or self.ratchet:
+            if getattr(args, 'cache_dir', ''):
+                self.score_history = ScoreHistory(op.join(args.cache_dir, "history.sqlite3"),
+                                                  keep=getattr(args, 'history_keep', DEFAULT_KEEP))
+            else:
+                self.logging.warning("Score history needs a cache directory, history and ratchet are not used")
+                self.ratchet = False
+        self.custom_file = None
+        self.custom_profile = None
+        self.custom_rules_batch = None
         custom_rules, custom_score, custom_thresholding = self.set_custom_functions(args.custom_path)
+        self.profiler = None
+        self.profile_output = getattr(args, 'profile_output', '')
+        if getattr(args, 'profile', False):
+            self.profiler = Profiler(top=getattr(args, 'profile_top', 10), hook=self.custom_profile)
+            custom_rules = custom_rules and self.profiler.timed("hooks", "custom_rules", custom_rules)
+            custom_score = custom_score and self.profiler.timed("hooks", "custom_score", custom_score)
+            custom_thresholding = custom_thresholding and self.profiler.timed("hooks", "custom_thresholding",
+                                                                              custom_thresholding)
         self.custom_rules = custom_rules
         self.custom_score = custom_score
         self.custom_thresholding = custom_thresholding
@@ -141,39 +682,178 @@ class PylintRunner(object):
         """Use input module to import custom rules and custom scoring function"""
         if not custom_path:
             return None, None, None
-        custom_module = importlib.import_module(custom_path)
-        try:
-            custom_rules = getattr(custom_module, "custom_rules")
-        except AttributeError:
+        # The module itself is imported when a hook is first called
+        custom_module = CustomModule(custom_path)
+        self.custom_file = custom_module.file
+        self.custom_profile = custom_module.hook("custom_profile")
+        self.custom_rules_batch = custom_module.hook("custom_rules_batch")
+        custom_rules = custom_module.hook("custom_rules")
+        if custom_rules is None:
             self.logging.warning("No 'custom_rules' defined in {}".format(custom_path))
-            custom_rules = None
-        try:
-            custom_score = getattr(custom_module, "custom_score")
-        except AttributeError:
+        custom_score = custom_module.hook("custom_score")
+        if custom_score is None:
             self.logging.warning("No 'custom_score' defined in {}".format(custom_path))
-            custom_score = None
-        try:
-            custom_thresholding = getattr(custom_module, "custom_thresholding")
-        except AttributeError:
+        custom_thresholding = custom_module.hook("custom_thresholding")
+        if custom_thresholding is None:
             self.logging.warning("No 'custom_score' defined in {}".format(custom_path))
-            custom_thresholding = None
-        if not custom_rules and not custom_score and not custom_thresholding:
+        if not custom_rules and not custom_score and not custom_thresholding and not self.custom_rules_batch:
             raise ValueError("Custom module given but no custom_rules, custom_score found OR custom_thresholding!")
         return custom_rules, custom_score, custom_thresholding
 
 
+    def preload(self):
+        """Import pylint now instead of when the first file is linted"""
+        load_pylint()
+
     def clean_up(self):
         """Clean results if same instance is going to be used"""
         self.fname = None
         self.failed_files = []
         self.custom_failed = []
         self.results = None
+        self.records = []
+        self.store = ResultStore()
+        if self.profiler:
+            self.profiler.profiles = []
+
+    def new_run(self, command_arg, reporter=None):
+        """Create a new pylint run with given command line arguments and reporter"""
+        run_class = load_pylint()[0]
+        run_class = self.profiler.run_class(run_class) if self.profiler else run_class
+        if int(pylint.__version__[0]) < 2:
+            return run_class(command_arg, reporter=reporter, exit=False) # pylint: disable=unexpected-keyword-arg
+        # Use the default one
+        return run_class(command_arg, reporter=reporter, do_exit=False)   # pylint: disable=unexpected-keyword-arg
+
+    def git_changes(self):
+        """Changed files and their changed lines if since or staged is set, otherwise None"""
+        if self.changed_lines is None and (self.since or self.staged):
+            self.changed_lines = changed_lines(since=self.since, staged=self.staged)
+        return self.changed_lines
+
+    def select_files(self, fnames):
+        """Files to lint: fnames with directories and globs expanded, as a generator.
+        The list of changed files among them if since or staged is set, all changed files if fnames is empty"""
+        self.changed_lines = None
+        self.blobs = None
+        finder = FileFinder(self.rcfile)
+        changes = self.git_changes()
+        if changes is None:
+            return finder.expand(fnames)
+        return changed_files(changes, list(finder.expand(fnames)) if fnames else None)
+
+    def indexed(self, fnames):
+        """Pass fnames on, updating the import index of each file"""
+        for fname in fnames:
+            if is_python_file(fname) and self.exists(fname):
+                self.import_index.dependency_digest(fname)
+            yield fname
+
+    def exists(self, fname):
+        """True if the file is in the working tree or its staged content is linted"""
+        return op.isfile(fname) or bool(self.staged_blob(fname))
+
+    def staged_blob(self, fname):
+        """Blob sha of the staged content if staged content is linted, otherwise None"""
+        if not self.staged_content:
+            return None
+        if self.blobs is None:
+            self.blobs = staged_blobs()
+        return self.blobs.get(op.abspath(fname))
+
+    def file_lines(self, fname):
+        """Changed lines of the file if only changed lines are counted, otherwise None"""
+        if not self.only_changed_lines:
+            return None
+        changes = self.git_changes()
+        if changes is None:
+            return None
+        return changes.get(op.abspath(fname), LineIndex())
+
+    def read_source(self, fname):
+        """Content of the file as it is linted, None if it is not linted"""
+        if not is_python_file(fname):
+            return None
+        if self.profile_rules and PROFILES[self.profile_rules.profile(fname)] is None:
+            return None
+        blob = self.staged_blob(fname)
+        if blob:
+            return self.blob_reader.read(blob)
+        try:
+            with open(fname, "rb") as handle:
+                return handle.read()
+        except (IOError, OSError):
+            return None
+
+    def search_duplicates(self, fnames):
+        """Find the code duplicated between the files, or the project files if set"""
+        found = find_duplicates(self.project_files or fnames, self.read_source, self.duplicate_min_lines)
+        self.duplicates = dict((op.abspath(fname), entry) for fname, entry in found.items())
+        self.logging.info("Found duplicate code in {} files".format(len(self.duplicates)))
+
+    def add_duplicate_stats(self):
+        """Add the duplicates of the current file to its stats and log them"""
+        stats = duplicate_stats(self.duplicates.get(op.abspath(self.fname)), self.file_lines(self.fname))
+        self.results.linter.stats.update(stats)
+        for block in stats["duplicates"]:
+            self.logging.info("LINES {}-{} ARE DUPLICATED IN {} LINES {}-{}".format(
+                block["start"], block["end"], block["other"], block["other_start"], block["other_end"]))
+
+    def cache_key(self, fname):
+        """Result cache key of the file or None if cache is not in use"""
+        if not self.cache:
+            return None
+        settings = (self.rcfile, self.thresh, self.allow_errors, self.ignore_tests)
+        if settings not in self.cache_contexts:
+            self.cache_contexts[settings] = run_context(self.rcfile, self.custom_file, *settings[1:])
+        # The digest of staged content and its imports come from the blob
+        entry = self.import_index.entry(fname)
+        if entry is None:
+            return None
+        content = entry["digest"] + self.import_index.dependency_digest(fname)
+        if self.lint_profile != "full":
+            content += repr(PROFILES[self.lint_profile])
+        lines = self.file_lines(fname)
+        if lines is not None:
+            content += repr(lines.ranges())
+        if self.reads_stats():
+            # Entries for custom hooks keep all of the stats
+            content += "full-stats"
+        return ResultCache.make_key(content, self.cache_contexts[settings])
+
+    def hook_output(self):
+        """Context where custom hooks print to stderr if the json lines records go to stdout"""
+        to_stdout = records_to_stdout(self.output_format, self.output_path)
+        return stdout_to(sys.stderr if to_stdout else None)
+
+    def reads_stats(self):
+        """True if custom hooks are given the stats of a file"""
+        return bool(self.custom_rules or self.custom_score)
+
+    def read_cache(self, cache_key):
+        """Use cached results if found. Returns True on cache hit"""
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return False
+        self.log_pylint_output(entry["output"])
+        self.results = CachedRun(entry["stats"])
+        self.cached = True
+        return True
+
+    @staticmethod
+    def log_pylint_output(lines):
+        """Log pylint output lines"""
+        logger = logging.getLogger("pylint")
+        for line in lines:
+            logger.info(line)
 
     def run_pylint(self, fname):
         """Run pylint for specified file"""
-        if '.py' not in fname:
+        if not is_python_file(fname):
+            self.reasons.append("skipped")
             return False
-        if not op.isfile(fname):
+        if not self.exists(fname):
+            self.reasons.append("missing")
             self.logging.info('------------------------------------------------------------------')
             self.logging.info("FILE {} DOES NOT EXIST.".format(fname))
             self.logging.info('------------------------------------------------------------------')
@@ -181,26 +861,57 @@ class PylintRunner(object):
             return False
         self.logging.info("{}\n".format(fname))
         self.fname = fname
+        self.lint_profile = self.profile_rules.profile(fname) if self.profile_rules else "full"
+        options = PROFILES[self.lint_profile]
+        if options is None:
+            self.reasons.append("skipped")
+            self.logging.info("FILE {} IS SKIPPED BY ITS LINT PROFILE.".format(fname))
+            return False
+        cache_key = self.cache_key(fname)
+        if cache_key and self.read_cache(cache_key):
+            return True
         if self.rcfile and op.isfile(self.rcfile):
             command_arg = [fname, '--rcfile', self.rcfile, '--score', 'no']
         else:
             command_arg = [fname, '--score', 'no']
+        command_arg.extend(options)
+        lines = self.file_lines(fname)
+        blob = self.staged_blob(fname)
+        source = self.blob_reader.read(blob) if blob else None
+        if source is not None:
+            command_arg.append('--from-stdin')
+        reporter_class = load_pylint()[1]
         try:
-            with redirect_stdout(PrintLogger(name="pylint", log_level="INFO")):
-                if int(pylint.__version__[0]) < 2:
-                    self.results = Run(command_arg, exit=False) # pylint: disable=unexpected-keyword-arg
+            reporter = reporter_class()
+            with stdin_from(source):
+                if self.warm_linter:
+                    self.results = self.warm_linter.lint(command_arg, reporter)
                 else:
-                    # Use the default one
-                    self.results = Run(command_arg, do_exit=False)   # pylint: disable=unexpected-keyword-arg
-                return True
+                    self.results = self.new_run(command_arg, reporter)
+            if lines is not None:
+                linter = self.results.linter
+                linter.stats = filter_stats(linter.stats, reporter.messages, lines,
+                                            linter.config.evaluation)
+            # Messages are formatted only if they are logged or cached
+            output = None
+            if cache_key:
+                output = list(reporter.lines())
+                self.cache.put(cache_key, self.results.linter.stats, output,
+                               full=self.reads_stats())
+            if logging.getLogger("pylint").isEnabledFor(logging.INFO):
+                self.log_pylint_output(output if output is not None else reporter.lines())
+            return True
         except Exception as error:  # pylint: disable=broad-except
             # We want to crash if ANYTHING goes wrong
+            if self.warm_linter:
+                self.warm_linter.reset()
             self.logging.warning('------------------------------------------------------------------')
             self.logging.warning("PYLINT CRASHED WHILE HANDLING {}".format(fname))
             self.logging.warning("{}: {}".format(type(error), error.args))
             self.logging.warning('------------------------------------------------------------------')
             self.logging.info('\n')
             self.failed_files.append(fname)
+            self.reasons.append("crashed")
             return False
 
     def check_no_silent_crash(self, override=False):
@@ -216,7 +927,9 @@ class PylintRunner(object):
                     self.logging.warning('------------------------------------------------------------------')
                     self.logging.warning('\n')
                     self.failed_files.append(self.fname)
+                    self.reasons.append("syntax-error")
                     return False
+                self.reasons.append("ignored")
                 self.logging.info('\n------------------------------------------------------------------')
                 self.logging.info('FILE WAS IGNORED.')
                 self.logging.info('------------------------------------------------------------------')
@@ -226,29 +939,35 @@ class PylintRunner(object):
     def check_custom_rules(self):
         """Check if custom rules passed"""
         if self.custom_rules:
-            with redirect_stdout(PrintLogger(name="pylint", log_level="INFO")):
-                passed_custom, override = self.custom_rules(self.results.linter.stats, self.fname)
+            passed_custom, override = self.custom_rules(self.results.linter.stats, self.fname)
+            self.custom_outcome = (passed_custom, override)
             if not passed_custom:
                 self.logging.warning("{} FAILED CUSTOM CHECKS".format(self.fname))
                 self.custom_failed.append(self.fname)
+                self.reasons.append("custom-rules")
             return passed_custom, override
         return False, False
 
     def check_score(self):
         """Return standard score or customised score"""
         if self.custom_score:
-            with redirect_stdout(PrintLogger(name="pylint", log_level="INFO")):
-                return self.custom_score(self.results.linter.stats)
+            return self.custom_score(self.results.linter.stats)
         return self.results.linter.stats.get('global_note', False)
 
     def check_threshold(self, score):
         """Check if custom / standard threshold limit is accepted"""
         if self.custom_thresholding:
-            with redirect_stdout(PrintLogger(name="pylint", log_level="WARNING")):
-                return self.custom_thresholding(score, self.thresh, self.fname)
-        elif score < self.thresh:
-            self.logging.warning("SCORE {} IS BELOW THE THRESHOLD {} for {}".format(score, self.thresh,
-                                                                                    self.fname))
+            return self.custom_thresholding(score, self.thresh, self.fname)
+        previous = self.score_history.last_score(self.fname, self.content_hash) if self.ratchet else None
+        if previous is not None:
+            if score < previous - EPSILON:
+                self.logging.warning("SCORE {} IS BELOW THE PREVIOUS SCORE {} for {}".format(
+                    score, previous, self.fname))
+                return False
+            return True
+        if score < self.thresh:
+            self.logging.warning("SCORE {} IS BELOW THE THRESHOLD {} for {}".format(
+                score, self.thresh, self.fname))
             return False
         return True
 
@@ -257,6 +976,7 @@ class PylintRunner(object):
         errors = self.results.linter.stats.get('error', False)
         fatal = self.results.linter.stats.get('fatal', False)
         score = self.check_score()
+        self.score = score
         file_passed = True
         self.logging.info('\n------------------------------------------------------------------\n')
         self.logging.info('Your code has been rated at {0:.2f}/10\n'.format(score))
@@ -265,17 +985,26 @@ class PylintRunner(object):
         if fatal:
             self.logging.warning("FATAL ERROR(S) DETECTED IN {}.".format(self.fname))
             file_passed = False
+            self.reasons.append("fatal")
         if errors and not self.allow_errors:
             self.logging.warning("ERROR(S) DETECTED IN {}.".format(self.fname))
             file_passed = False
-        if score:
-            file_passed = file_passed and self.check_threshold(score)
+            self.reasons.append("error")
+        duplicate_lines = self.results.linter.stats.get('duplicate_lines', 0)
+        if 0 <= self.max_duplicate_lines < duplicate_lines:
+            self.logging.warning("{} LINES OF {} ARE DUPLICATED IN OTHER FILES.".format(duplicate_lines, self.fname))
+            file_passed = False
+            self.reasons.append("duplicate-code")
+        if score and file_passed and not self.check_threshold(score):
+            file_passed = False
+            self.reasons.append("threshold")
         if self.custom_rules and passed_custom != file_passed and override:
             self.logging.info("OVERRIDING STANDARD RESULT WITH CUSTOM FROM {} TO {}.".format(file_passed,
                                                                                              passed_custom))
             file_passed = passed_custom
-        if not file_passed and self.ignore_tests and ("test_" in self.fname.split("/")[-1] or \
-                                                      "tests.py" in self.fname):
+            self.reasons.append("custom-override")
+        if not file_passed and self.ignore_tests and is_test_file(self.fname):
+            self.reasons.append("test-file-allowed")
             self.logging.info("ASSUMING {} IS TEST FILE. ALLOWING.".format(self.fname))
             self.logging.info('------------------------------------------------------------------\n')
         elif file_passed:
@@ -284,6 +1013,31 @@ class PylintRunner(object):
             self.failed_files.append(self.fname)
         self.logging.warning('------------------------------------------------------------------')
 
+    def check_batch_rules(self, records):
+        """Apply custom_rules_batch to the records of the linted files. Records are updated in place"""
+        linted = [record for record in records if not set(record["reasons"]) & set(NOT_LINTED)]
+        if not linted:
+            return
+        stats = columns(linted)
+        verdicts = list(self.custom_rules_batch(stats, list(stats["path"])))
+        if len(verdicts) != len(linted):
+            raise ValueError("custom_rules_batch returned {} verdicts for {} files".format(len(verdicts),
+                                                                                          len(linted)))
+        for record, (passed_custom, override) in zip(linted, verdicts):
+            fname = record["path"]
+            if not passed_custom:
+                self.logging.warning("{} FAILED BATCH CUSTOM CHECKS".format(fname))
+                self.custom_failed.append(fname)
+                reason = "custom-rules-batch"
+            elif override and not record["passed"] and fname in self.failed_files:
+                self.logging.info("OVERRIDING STANDARD RESULT OF {} WITH BATCH CUSTOM CHECKS".format(fname))
+                self.failed_files.remove(fname)
+                reason = "custom-override"
+            else:
+                continue
+            record["passed"] = fname not in self.failed_files and fname not in self.custom_failed
+            record["reasons"] = [item for item in record["reasons"] if item != "passed"] + [reason]
+
     def report_results(self):
         """Final summary report"""
         if not self.failed_files and not self.custom_failed:
@@ -305,34 +1059,340 @@ class PylintRunner(object):
             self.logging.info('------------------------------------------------------------------')
         return 1
 # pylint: enable=line-too-long
-    def run(self, fnames):
-        """Run for specified files. Lint each file indepedently
-        Input
-        -----
-        fnames : list
-            List of filenames to lint.
+    def lint_file(self, fname):
+        """Lint a single file and evaluate the results
+
+        Output
+        ------
+        dict
+            Result record of the file with keys
+            path, passed, reasons, score, threshold, statement, the count of each message
+            category (convention, refactor, warning, error, fatal, info), by_msg,
+            custom_passed, custom_override, duration (seconds), cached (True if
+            the result was read from the cache) and lint_profile. With duplicates,
+            also duplicate_lines and duplicates, see add_duplicate_stats.
+            reasons lists why the file failed or was allowed, e.g. "error",
+            "threshold", "duplicate-code", "crashed", "timed-out" or "test-file-allowed".
         """
-        logging.info("Starting")
-        for fname in fnames:
-            linted = self.run_pylint(fname=fname)
-            if linted:
+        start = time.time()
+        self.reasons = []
+        self.score = None
+        self.custom_outcome = None
+        failed = len(self.failed_files)
+        custom_failed = len(self.custom_failed)
+        self.content_hash = None
+        self.cached = False
+        self.lint_profile = "full"
+        if self.score_history and is_python_file(fname) and self.exists(fname):
+            self.content_hash = self.file_digest(fname)
+        if self.profiler:
+            self.profiler.start(fname)
+        linted = self.run_pylint(fname=fname)
+        if self.profiler:
+            self.profiler.lint_done()
+        if linted:
+            if self.check_duplicates:
+                self.add_duplicate_stats()
+            with self.hook_output():
                 custom_ok, override_standard = self.check_custom_rules()
                 override = custom_ok and override_standard
                 success = self.check_no_silent_crash(override=override)
                 if success:
                     self.eval_results(custom_ok, override)
+        stats = self.results.linter.stats if linted else {}
+        passed = len(self.failed_files) == failed and len(self.custom_failed) == custom_failed
+        if passed and not self.reasons:
+            self.reasons.append("passed")
+        record = self.make_record(fname, passed, stats, time.time() - start)
+        if self.profiler:
+            record["profile"] = self.profiler.stop()
+        self.release()
+        return record
+
+    def make_record(self, fname, passed, stats, duration):
+        """Result record of the current file, see lint_file"""
+        record = {
+            "path": fname,
+            "passed": passed,
+            "reasons": list(self.reasons),
+            "score": self.score,
+            "threshold": self.thresh,
+            "by_msg": dict(stats.get("by_msg") or {}),
+            "statement": stats.get("statement", 0),
+            "custom_passed": self.custom_outcome[0] if self.custom_outcome else None,
+            "custom_override": self.custom_outcome[1] if self.custom_outcome else None,
+            "duration": round(duration, 4),
+            "cached": self.cached,
+            "lint_profile": self.lint_profile,
+        }
+        for category in CATEGORIES:
+            record[category] = stats.get(category, 0)
+        if self.score_history:
+            record["content_hash"] = self.content_hash
+        if self.check_duplicates:
+            record["duplicate_lines"] = stats.get("duplicate_lines", 0)
+            record["duplicates"] = list(stats.get("duplicates") or [])
+        return record
+
+    def worker_failed(self, fname, reason, seconds):
+        """Result of a file whose worker was killed after the file timeout or died, see
+        lint_isolated"""
+        self.reasons = [reason]
+        self.score = None
+        self.custom_outcome = None
+        self.cached = False
+        self.content_hash = None
+        self.lint_profile = self.profile_rules.profile(fname) if self.profile_rules else "full"
+        self.logging.warning('------------------------------------------------------------------')
+        if reason == "timed-out":
+            self.logging.warning("PYLINT TIMED OUT AFTER {} SECONDS WHILE HANDLING {}".format(
+                seconds, fname))
+        else:
+            self.logging.warning("PYLINT CRASHED WHILE HANDLING {}".format(fname))
+            self.logging.warning("THE WORKER PROCESS DIED")
+        self.logging.warning('------------------------------------------------------------------')
+        self.logging.info('\n')
+        return self.make_record(fname, False, {}, seconds), [fname], []
+
+    def file_digest(self, fname):
+        """sha256 of the content of the file that is linted, i.e. the staged content if it is
+        linted"""
+        blob = self.staged_blob(fname)
+        if blob:
+            data = self.blob_reader.read(blob)
+            return hashlib.sha256(data).hexdigest() if data is not None else None
+        return content_hash(fname)
+
+    def release(self):
+        """Drop the state of the finished file and evict caches if the memory policy says so.
+        Only the result record of the file is kept unless keep_results is set"""
+        if not self.keep_results:
+            self.results = None
+        if self.memory and self.memory.file_done() and self.warm_linter:
+            # The linter and everything reachable from it goes with the evicted caches
+            self.warm_linter.reset()
+
+    def add_record(self, record, output=None):
+        """Keep the result record of a file and write it to output"""
+        self.records.append(record)
+        self.store.add_record(record)
+        if self.history:
+            self.history.add(record["path"], record["passed"])
+        if self.durations and not record["cached"] and not set(record["reasons"]) & set(NOT_LINTED):
+            self.durations.add(record["path"], record["duration"])
+        if self.profiler and "profile" in record:
+            with self.hook_output():
+                self.profiler.add(record["profile"])
+        if output:
+            output.write(record)
+
+    def lint_files(self, fnames):
+        """Lint each file indepedently and report the results
+        Input
+        -----
+        fnames : list
+            List of filenames to lint.
+
+        Output
+        ------
+        int
+            Exit code, 0 if all files passed.
+        """
+        self.logging.info("Starting")
+        if self.started is not None:
+            # astroid would otherwise reuse modules parsed in the previous run
+            evict_changed_modules(self.started)
+        self.started = time.time()
+        # Records of this run only, results of earlier runs are in the store
+        self.records = []
+        try:
+            fnames = self.select_files(fnames)
+        except GitError as error:
+            self.logging.error("CANNOT FIND CHANGED FILES: {}".format(error))
+            return 1
+        if self.check_duplicates:
+            # Every shard searches all files, duplicates between shards are found too
+            fnames = list(fnames)
+            self.search_duplicates(fnames)
+        shard = None
+        if self.shard_spec or self.artifact:
+            shard = Shard(list(fnames), *(self.shard_spec or (1, 1)))
+            fnames = shard.fnames
+            self.logging.info("Shard {}/{}: {} of {} files".format(
+                shard.index, shard.count, len(fnames), shard.total))
+        if self.failed_first and self.history:
+            fnames = self.history.order(fnames)
+        fnames = iter(fnames)
+        if self.import_index:
+            self.import_index.refresh()
+        output = open_output(self.output_format, self.output_path)
+        records = self.lint_records(fnames)
+        # Verdicts of batch rules are known only when all files are done
+        pending = []
+        for record in records:
+            if self.custom_rules_batch:
+                pending.append(record)
+            else:
+                self.add_record(record, output)
+            if self.fail_fast and not record["passed"]:
+                self.logging.warning("STOPPING AT THE FIRST FAILED FILE {}".format(record["path"]))
+                break
+        records.close()
+        if self.custom_rules_batch:
+            with self.hook_output():
+                self.check_batch_rules(pending)
+            for record in pending:
+                self.add_record(record, output)
+        if output:
+            output.close()
+        self.blob_reader.close()
+        if self.cache:
+            self.import_index.save()
+            self.history.save()
+            self.durations.save()
+            self.cache.prune()
+        if shard and self.artifact:
+            shard.write(self.artifact, self.records, self.failed_files, self.custom_failed)
+        if self.score_history:
+            self.score_history.add(self.records)
+            self.score_history.prune(record["path"] for record in self.records)
+            self.score_history.close()
+        if self.profiler:
+            self.profiler.report()
+            if self.profile_output:
+                self.profiler.dump(self.profile_output)
         exit_code = self.report_results()
         if not self.keep_results:
             self.clean_up()
-        sys.exit(exit_code)
+        return exit_code
+
+    def lint_records(self, fnames):
+        """Lint the files and yield their result records. Closing the generator cancels the files
+        being linted in parallel"""
+        # Files are linted as they are found. Two are enough to know whether workers are needed
+        first = list(itertools.islice(fnames, 2))
+        fnames = itertools.chain(first, fnames)
+        if not self.file_timeout and (self.jobs == 1 or len(first) < 2):
+            for fname in fnames:
+                yield self.lint_file(fname)
+            return
+        if self.import_index:
+            # Workers keep their own index, the one saved for the next run is updated here
+            fnames = self.indexed(fnames)
+        # Longest files first, unless the files most likely to fail go first
+        cost = None
+        if self.durations and not self.failed_first and self.jobs != 1:
+            cost = self.durations.estimate
+        # Workers do not search for duplicates, they get the ones found here
+        shared = {"duplicates": self.duplicates} if self.check_duplicates else None
+        # Without fail fast results are reported in input order, with it as soon as they are done.
+        # Pool workers cannot be replaced when they go over the memory limit, isolated ones can
+        if self.file_timeout or self.memory.max_rss_kb:
+            results = lint_isolated(type(self), self.args, fnames, self.jobs, self.file_timeout,
+                                    self.worker_failed, ordered=not self.fail_fast, cost=cost,
+                                    shared=shared)
+        else:
+            results = lint_parallel(type(self), self.args, fnames, self.jobs,
+                                    ordered=not self.fail_fast, cost=cost, shared=shared)
+        try:
+            for record, failed, custom_failed in results:
+                self.failed_files.extend(failed)
+                self.custom_failed.extend(custom_failed)
+                yield record
+        finally:
+            results.close()
+
+    def lint(self, fnames):
+        """Lint the files and return the results instead of exiting, see RunResult.
+        Results are kept in the runner only if keep_results is set"""
+        keep_results = self.keep_results
+        # The records of the run are needed after it
+        self.keep_results = True
+        try:
+            exit_code = self.lint_files(fnames)
+            result = RunResult(exit_code, self.records, self.failed_files, self.custom_failed)
+        finally:
+            self.keep_results = keep_results
+        if not keep_results:
+            self.clean_up()
+        return result
+
+    def run(self, fnames):
+        """Run for specified files and exit. Lint each file indepedently
+        Input
+        -----
+        fnames : list
+            List of filenames to lint.
+        """
+        sys.exit(self.lint_files(fnames))
+
+
+def merge_results(argv):
+    """Report the merged results of shard artifacts. Returns the exit code of the whole run"""
+    parser = argparse.ArgumentParser(prog='vainupylinter merge')
+    parser.description = 'Combine the artifacts of all shards of a run.'
+    parser.add_argument('artifacts', nargs='+', help='Artifacts written with --shard i/N --artifact FILE.')
+    parser.add_argument('-v', '--verbosity', type=int, dest='verbosity', default=20,
+                        help="Logger verbosity. Defaults to 20 (INFO)")
+    parser.add_argument('-f', '--format', type=str, dest='format', default='text', choices=FORMATS,
+                        help="'jsonl' writes the merged result records as json lines. Defaults to text")
+    parser.add_argument('-o', '--output', type=str, dest='output', default='-',
+                        help="File for the jsonl records. Defaults to stdout")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.verbosity, format='%(message)s')
+    try:
+        records, failed_files, custom_failed = merge(args.artifacts)
+    except (IOError, OSError, ValueError, KeyError) as error:
+        logging.error("CANNOT MERGE SHARDS: {}".format(error))
+        return 1
+    output = open_output(args.format, args.output)
+    if output:
+        for record in records:
+            output.write(record)
+        output.close()
+    runner = PylintRunner(parse_args(['--no-cache', '-v', str(args.verbosity)]))
+    runner.failed_files = failed_files
+    runner.custom_failed = custom_failed
+    return runner.report_results()
+
+
+def lint_files(paths, config=None, **options):
+    """Lint files in this process and return the results, for use as a library
+
+    No logging handler is configured and the process is not exited. Logs go to
+    the "vainupylinter" and "pylint" loggers, whose level is set by verbosity. See service.LintService to lint
+    many requests concurrently with warm linters.
+
+    Input
+    -----
+    paths : list
+        Files, directories and globs to lint.
+    config, options
+        Options of the run, see make_args and PylintRunner.
+
+    Output
+    ------
+    RunResult
+    """
+    return PylintRunner(make_args(config, **options)).lint(paths)
 
 
 def run():
     """Start the custom pylint run"""
+    if sys.argv[1:2] == ['merge']:
+        sys.exit(merge_results(sys.argv[2:]))
     args = parse_args(sys.argv[1:])
-    fnames = args.fnames
-    runner = PylintRunner(args)
-    runner.run(fnames)
+    logging.basicConfig(level=args.verbosity, format='%(message)s')
+    if args.serve:
+        LintServer(PylintRunner, args, args.socket).serve_forever()
+        return
+    if args.daemon:
+        exit_code = run_client(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+    if args.watch:
+        sys.exit(Watch(PylintRunner(args), args.fnames, debounce=args.debounce).run())
+    sys.exit(lint_files(args.fnames, args).exit_code)
 
 
 if __name__ == '__main__':
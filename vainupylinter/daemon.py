@@ -0,0 +1,250 @@
+"""Long-lived lint daemon and its client
+
+The daemon keeps a warm linter behind a unix domain socket, so the cost of
+importing pylint, reading the rcfile and inferring the standard library and
+third-party packages is paid only once. Requests are handled one at a time, each
+with a runner built from the options of the client. The linter is rebuilt when
+the rcfile or the custom module changes.
+
+Protocol: the client sends one json object and closes its side of the
+connection, the daemon answers with one json object.
+    request: {"cwd": str, "fnames": list, "settings": dict of the runner options}
+    response: {"exit_code": int, "results": list, "log": list} or {"error": str}
+results contains the result records of the files, see PylintRunner.lint_file.
+"""
+from __future__ import absolute_import
+import copy
+import json
+import logging
+import os
+import os.path as op
+import socket
+import sys
+
+try:
+    from vainupylinter.parallel import LogCollector, replay
+    from vainupylinter.cache import default_cache_dir, find_pylintrc
+    from vainupylinter.engine import WarmLinter
+    from vainupylinter.output import open_output
+except ImportError:
+    from parallel import LogCollector, replay
+    from cache import default_cache_dir, find_pylintrc
+    from engine import WarmLinter
+    from output import open_output
+
+# Options of the client that are not sent. Records are written by the client
+CLIENT_ONLY = ("fnames", "daemon", "socket", "serve", "watch", "debounce", "format", "output")
+# Settings that must match the daemon's own, the others apply to the request only
+FIXED_SETTINGS = ("rcfile", "custom_path")
+
+
+def default_socket_path():
+    """Socket location in the cache directory"""
+    return op.join(default_cache_dir(), "daemon.sock")
+
+
+def _recv_all(conn):
+    """Read until the other end closes its side"""
+    chunks = []
+    while True:
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def request_settings(args):
+    """Settings sent along with a lint request: every runner option of the client"""
+    settings = {key: value for key, value in vars(args).items() if key not in CLIENT_ONLY}
+    for key in FIXED_SETTINGS:
+        settings.setdefault(key, None)
+    return settings
+
+
+def _mtime(fname):
+    """Modification time of the file or None"""
+    try:
+        return os.stat(fname).st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+class LintServer(object):
+    """Serve lint requests over a unix domain socket
+
+    Input
+    -----
+    runner_class : type
+        Runner class to instantiate.
+    args : argparse.Namespace
+        Arguments of the runner. Requests override them with the options of
+        the client, except FIXED_SETTINGS. The warm engine is always used.
+    socket_path : str
+        Location of the socket.
+    """
+    def __init__(self, runner_class, args, socket_path):
+        self.runner_class = runner_class
+        self.args = copy.copy(args)
+        self.socket_path = socket_path
+        self.warm_linter = None
+        self.custom_file = None
+        self.signature = None
+        # Start of the previous request, modules changed since are parsed again
+        self.started = None
+        self.running = False
+
+    def config_signature(self):
+        """Modification times of the files the configuration is read from"""
+        rcfile = self.args.rcfile if self.args.rcfile and op.isfile(self.args.rcfile) else None
+        if rcfile is None:
+            rcfile = find_pylintrc()
+        return _mtime(rcfile), _mtime(self.custom_file)
+
+    def request_args(self, settings):
+        """Arguments of the runner of a request"""
+        args = copy.copy(self.args)
+        for key, value in settings.items():
+            if key not in CLIENT_ONLY:
+                setattr(args, key, value)
+        args.engine = "warm"
+        args.keep_results = True
+        # Records are sent to the client instead
+        args.format = "text"
+        return args
+
+    def get_runner(self, settings):
+        """Runner of a request with the warm linter of the daemon. The linter is rebuilt if the
+        configuration changed"""
+        if self.warm_linter is not None and self.config_signature() != self.signature:
+            logging.getLogger(__name__).warning("Configuration changed, reloading")
+            self.warm_linter = None
+            if self.args.custom_path:
+                # Import the custom module again
+                sys.modules.pop(self.args.custom_path, None)
+        runner = self.runner_class(self.request_args(settings))
+        if self.warm_linter is None:
+            self.warm_linter = WarmLinter(runner.new_run)
+        # Linters for new options are built with the settings of this request
+        self.warm_linter.new_run = runner.new_run
+        runner.warm_linter = self.warm_linter
+        runner.started = self.started
+        self.custom_file = runner.custom_file
+        self.signature = self.config_signature()
+        return runner
+
+    def handle(self, payload):
+        """Lint the requested files and return the response"""
+        message = json.loads(payload.decode("utf-8"))
+        settings = message.get("settings", {})
+        for key in FIXED_SETTINGS:
+            if (settings.get(key) or None) != (getattr(self.args, key, None) or None):
+                return {"error": "daemon was started with different {}".format(key)}
+        collector = LogCollector()
+        root = logging.getLogger()
+        handlers = root.handlers
+        cwd = os.getcwd()
+        root.handlers = [collector]
+        try:
+            os.chdir(message.get("cwd", cwd))
+            runner = self.get_runner(settings)
+            exit_code = runner.lint_files(message.get("fnames", []))
+            results = runner.records
+            self.started = runner.started
+        finally:
+            os.chdir(cwd)
+            root.handlers = handlers
+        return {"exit_code": exit_code, "results": results, "log": collector.records}
+
+    def serve_forever(self):
+        """Accept requests until interrupted"""
+        if op.exists(self.socket_path):
+            if request(self.socket_path, None) is not None:
+                raise ValueError("Daemon already running at {}".format(self.socket_path))
+            os.remove(self.socket_path)
+        directory = op.dirname(self.socket_path)
+        if directory and not op.isdir(directory):
+            os.makedirs(directory)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+        server.bind(self.socket_path)
+        server.listen(16)
+        logging.getLogger(__name__).info("Serving at {}".format(self.socket_path))
+        self.running = True
+        try:
+            while self.running:
+                conn, _ = server.accept()
+                try:
+                    payload = _recv_all(conn)
+                    if not payload:
+                        # Ping, used to check whether daemon is alive
+                        continue
+                    try:
+                        response = self.handle(payload)
+                    except Exception as error:  # pylint: disable=broad-except
+                        response = {"error": "{}: {}".format(type(error).__name__, error)}
+                    conn.sendall(json.dumps(response).encode("utf-8"))
+                finally:
+                    conn.close()
+        finally:
+            server.close()
+            os.remove(self.socket_path)
+
+    def shutdown(self):
+        """Stop serving after the current request"""
+        self.running = False
+        # Wake up the accept call
+        request(self.socket_path, None)
+
+
+def request(socket_path, fnames, settings=None):
+    """Send a lint request to the daemon
+
+    Input
+    -----
+    socket_path : str
+        Location of the daemon socket.
+    fnames : list | None
+        Files to lint. None only checks that the daemon is alive.
+    settings : dict | None
+        Runner settings, see request_settings.
+
+    Output
+    ------
+    dict | None
+        Response of the daemon or None if no daemon is listening.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+    try:
+        client.connect(socket_path)
+        if fnames is not None:
+            payload = {"cwd": os.getcwd(), "fnames": list(fnames), "settings": settings or {}}
+            client.sendall(json.dumps(payload).encode("utf-8"))
+        client.shutdown(socket.SHUT_WR)
+        response = _recv_all(client)
+    except socket.error:
+        return None
+    finally:
+        client.close()
+    return json.loads(response.decode("utf-8")) if response else {}
+
+
+def run_client(args):
+    """Lint files with the daemon. Returns the exit code or None if daemon could not be used"""
+    if getattr(args, "watch", False):
+        # Watch mode keeps its own runner
+        return None
+    response = request(args.socket, args.fnames, request_settings(args))
+    if response is None:
+        return None
+    if "error" in response:
+        logging.getLogger(__name__).warning("Daemon could not lint: {}".format(response["error"]))
+        return None
+    replay(response["log"])
+    output = open_output(getattr(args, "format", "text"), getattr(args, "output", "-"))
+    if output:
+        for record in response["results"]:
+            output.write(record)
+        output.close()
+    return response["exit_code"]
@@ -0,0 +1,264 @@
+"""Import dependency index of the linted files
+
+Pylint infers through imported modules, so the result of a file depends on the
+local modules it imports. The index stores, for every file seen, the digest of its
+contents and the local files it imports. The digest of all transitively imported
+files is part of the cache key, so a change in a module invalidates the results of
+the module and of everything that imports it, directly or indirectly.
+
+Imports are read with the ast module of the standard library and only for files
+whose size or modification time changed since the index was saved. Imported names
+that were not found are kept too, and a file is read again when one of them can be
+found, e.g. after the missing module was created.
+
+When the staged content is linted, files with a staged blob are indexed from the
+blob instead of the working tree. Those entries are kept for the round only.
+"""
+from __future__ import absolute_import
+import ast
+import hashlib
+import json
+import os
+import os.path as op
+
+try:
+    from vainupylinter.cache import write_json
+except ImportError:
+    from cache import write_json
+
+INDEX_VERSION = 2
+
+
+def package_root(fname):
+    """Directory that contains the top level package of the file"""
+    root = op.dirname(op.abspath(fname))
+    while op.isfile(op.join(root, "__init__.py")):
+        root = op.dirname(root)
+    return root
+
+
+def module_parts(fname, root):
+    """Module name parts of the file relative to root"""
+    relative = op.splitext(op.relpath(op.abspath(fname), root))[0]
+    parts = relative.split(os.sep)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return parts
+
+
+def imported_names(source, fname):
+    """Names of modules imported by source. Relative imports are made absolute"""
+    try:
+        tree = ast.parse(source, fname)
+    except (SyntaxError, ValueError, TypeError):
+        return set()
+    parts = module_parts(fname, package_root(fname))
+    package = parts if op.basename(fname) == "__init__.py" else parts[:-1]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[:len(package) - node.level + 1]
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module or ""
+            if prefix:
+                names.add(prefix)
+            for alias in node.names:
+                if alias.name != "*":
+                    names.add("{}.{}".format(prefix, alias.name) if prefix else alias.name)
+    # Parent packages are imported too
+    for name in list(names):
+        parts = name.split(".")
+        for idx in range(1, len(parts)):
+            names.add(".".join(parts[:idx]))
+    return names
+
+
+def resolve_name(name, roots, exists=op.isfile):
+    """Local file of the module name, None if it is not found under roots"""
+    parts = name.split(".")
+    for root in roots:
+        base = op.join(root, *parts)
+        for candidate in (base + ".py", op.join(base, "__init__.py")):
+            if exists(candidate):
+                return op.abspath(candidate)
+    return None
+
+
+def import_roots(fname):
+    """Directories imports of the file are looked up from"""
+    return [package_root(fname), op.abspath(".")]
+
+
+class ImportIndex(object):
+    """Persistent index of file digests and local imports
+
+    Input
+    -----
+    path : str | None
+        Json file used to persist the index. Kept in memory only if None.
+    staged : function | None
+        Blob sha of the staged content of a file, None if the working tree is
+        linted. Files with a blob are indexed from it.
+        Input: fname (str)
+        Output: str | None
+    read_blob : function | None
+        Contents of a blob, required with staged.
+        Input: sha (str)
+        Output: bytes | None
+    """
+    def __init__(self, path=None, staged=None, read_blob=None):
+        self.path = path
+        self.staged = staged
+        self.read_blob = read_blob
+        # Entries of staged blobs, for the current round
+        self.blob_entries = {}
+        self.files = {}
+        self.checked = set()
+        self.closures = {}
+        # Module name and roots to file, for the current round
+        self.resolved = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        """Read the index from disk"""
+        if not self.path or not op.isfile(self.path):
+            return
+        try:
+            with open(self.path) as handle:
+                data = json.load(handle)
+        except (IOError, OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def save(self):
+        """Write the index atomically if it changed. Returns False if writing failed"""
+        if not self.path or not self.changed:
+            return True
+        if not write_json(self.path, {"version": INDEX_VERSION, "files": self.files}):
+            return False
+        self.changed = False
+        return True
+
+    def refresh(self, fnames=()):
+        """Start a new round: files are checked for changes again on next access"""
+        self.checked = set()
+        self.closures = {}
+        self.resolved = {}
+        self.blob_entries = {}
+        for fname in fnames:
+            if fname.endswith(".py") and op.isfile(fname):
+                self.dependency_digest(fname)
+
+    def entry(self, fname):
+        """Index entry of the file, updated if the file changed. None if file does not exist"""
+        fname = op.abspath(fname)
+        if fname in self.checked:
+            return self.blob_entries.get(fname) or self.files.get(fname)
+        self.checked.add(fname)
+        blob = self.staged(fname) if self.staged else None
+        if blob:
+            return self.blob_entry(fname, blob)
+        try:
+            stat = os.stat(fname)
+        except OSError:
+            if self.files.pop(fname, None) is not None:
+                self.changed = True
+            return None
+        entry = self.files.get(fname)
+        roots = import_roots(fname)
+        if (entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size
+                and not any(self.resolve(name, roots) for name in entry["unresolved"])):
+            return entry
+        with open(fname, "rb") as handle:
+            source = handle.read()
+        imports, unresolved = self.read_imports(fname, source)
+        entry = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "digest": hashlib.sha256(source).hexdigest(),
+            "imports": imports,
+            "unresolved": unresolved,
+        }
+        self.files[fname] = entry
+        self.changed = True
+        return entry
+
+    def blob_entry(self, fname, blob):
+        """Index entry of the staged content of the file. The blob sha is its digest"""
+        imports, unresolved = self.read_imports(fname, self.read_blob(blob) or b"")
+        entry = {"digest": "blob:" + blob, "imports": imports, "unresolved": unresolved}
+        self.blob_entries[fname] = entry
+        return entry
+
+    def read_imports(self, fname, source):
+        """Local files imported by source of the file and the imported names that were not found"""
+        imports = set()
+        unresolved = []
+        for name in sorted(imported_names(source, fname)):
+            path = self.resolve(name, import_roots(fname))
+            if path is None:
+                unresolved.append(name)
+            elif path != fname:
+                imports.add(path)
+        return sorted(imports), unresolved
+
+    def exists(self, fname):
+        """True if the file exists in the working tree or, with staged, is staged"""
+        return op.isfile(fname) or bool(self.staged and self.staged(fname))
+
+    def resolve(self, name, roots):
+        """Local file of the module name or None, looked up once per round"""
+        key = (name, tuple(roots))
+        if key not in self.resolved:
+            self.resolved[key] = resolve_name(name, roots, self.exists)
+        return self.resolved[key]
+
+    def dependencies(self, fname):
+        """Files transitively imported by the file"""
+        fname = op.abspath(fname)
+        if fname in self.closures:
+            return self.closures[fname]
+        seen = set()
+        stack = [fname]
+        while stack:
+            entry = self.entry(stack.pop())
+            if entry is None:
+                continue
+            for dep in entry["imports"]:
+                if dep not in seen and dep != fname:
+                    seen.add(dep)
+                    stack.append(dep)
+        self.closures[fname] = seen
+        return seen
+
+    def dependency_digest(self, fname):
+        """Digest of the contents of all files the file transitively imports"""
+        digest = hashlib.sha256()
+        for dep in sorted(self.dependencies(fname)):
+            entry = self.entry(dep)
+            if entry is not None:
+                digest.update("{}\0{}\0".format(dep, entry["digest"]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def dependents(self, fname):
+        """Indexed files that transitively import the file"""
+        fname = op.abspath(fname)
+        importers = {}
+        for path, entry in self.files.items():
+            for dep in entry["imports"]:
+                importers.setdefault(dep, set()).add(path)
+        found = set()
+        stack = [fname]
+        while stack:
+            for path in importers.get(stack.pop(), ()):
+                if path not in found and path != fname:
+                    found.add(path)
+                    stack.append(path)
+        return found
@@ -0,0 +1,277 @@
+"""Find the python files to lint in directories and globs
+
+Directories are walked with os.scandir. Ignored directories are pruned before
+their contents are read: .git, directories ignored by .gitignore files and the
+ignore, ignore-patterns and ignore-paths options of the pylint rcfile. Files are
+yielded as soon as they are found, so linting can start before the walk is done.
+Explicitly given files are yielded as they are.
+"""
+from __future__ import absolute_import
+import glob
+import os
+import os.path as op
+import re
+
+try:
+    from vainupylinter.cache import find_pylintrc
+except ImportError:
+    from cache import find_pylintrc
+
+try:
+    from ConfigParser import RawConfigParser
+except ImportError:
+    from configparser import RawConfigParser
+
+GLOB_CHARS = re.compile(r"[*?[]")
+RC_SECTIONS = ("MASTER", "MAIN")
+DEFAULT_IGNORE = ("CVS",)
+ALWAYS_IGNORED = (".git",)
+
+
+def is_python_file(fname):
+    """True if the file is a python source file by its name"""
+    return fname.endswith(".py")
+
+
+def _split_csv(value):
+    """Values of a comma separated option"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def ignore_options(rcfile=None):
+    """ignore, ignore-patterns and ignore-paths of the pylint configuration
+
+    The rcfile pylint would find is used if rcfile is not given.
+
+    Output
+    ------
+    tuple(set, list, list)
+        Ignored base names, compiled base name patterns and compiled path patterns.
+    """
+    if not (rcfile and op.isfile(rcfile)):
+        rcfile = find_pylintrc()
+    names, patterns, paths = set(DEFAULT_IGNORE), [], []
+    if not rcfile or not rcfile.endswith(("rc", ".cfg", ".ini")):
+        return names, patterns, paths
+    parser = RawConfigParser()
+    try:
+        parser.read(rcfile)
+    except Exception:  # pylint: disable=broad-except
+        return names, patterns, paths
+    for section in RC_SECTIONS:
+        if not parser.has_section(section):
+            continue
+        if parser.has_option(section, "ignore"):
+            names = set(_split_csv(parser.get(section, "ignore")))
+        if parser.has_option(section, "ignore-patterns"):
+            patterns = [re.compile(pattern)
+                        for pattern in _split_csv(parser.get(section, "ignore-patterns"))]
+        if parser.has_option(section, "ignore-paths"):
+            paths = [re.compile(pattern)
+                     for pattern in _split_csv(parser.get(section, "ignore-paths"))]
+    return names, patterns, paths
+
+
+def translate(pattern):
+    """Regular expression of a gitignore glob"""
+    idx, parts = 0, []
+    while idx < len(pattern):
+        char = pattern[idx]
+        if pattern.startswith("**/", idx):
+            parts.append("(?:.*/)?")
+            idx += 3
+            continue
+        if pattern.startswith("**", idx):
+            parts.append(".*")
+            idx += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[" and pattern.find("]", idx + 1) > idx:
+            end = pattern.find("]", idx + 1)
+            chars = pattern[idx + 1:end]
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            parts.append("[" + chars.replace("\\", "\\\\") + "]")
+            idx = end + 1
+            continue
+        elif char == "\\" and idx + 1 < len(pattern):
+            parts.append(re.escape(pattern[idx + 1]))
+            idx += 2
+            continue
+        else:
+            parts.append(re.escape(char))
+        idx += 1
+    return "".join(parts)
+
+
+class GitIgnore(object):
+    """Compiled rules of one .gitignore file
+
+    Input
+    -----
+    base : str
+        Directory of the .gitignore file. Paths are matched relative to it.
+    lines : iterable
+        Lines of the file.
+    """
+    __slots__ = ("base", "rules")
+
+    def __init__(self, base, lines):
+        self.base = base
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            regex = re.compile("^" + translate(line.lstrip("/")) + "$")
+            self.rules.append((regex, negate, dir_only, anchored))
+
+    @classmethod
+    def read(cls, directory):
+        """Rules of the .gitignore in the directory or None if it has none"""
+        path = op.join(directory, ".gitignore")
+        if not op.isfile(path):
+            return None
+        with open(path) as handle:
+            return cls(directory, handle.readlines())
+
+    def match(self, path, is_dir):
+        """True if ignored, False if explicitly not ignored, None if no rule matches"""
+        relpath = op.relpath(path, self.base).replace(os.sep, "/")
+        name = relpath.rsplit("/", 1)[-1]
+        result = None
+        for regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath if anchored else name):
+                result = not negate
+        return result
+
+
+def repository_root(directory):
+    """Closest directory containing .git or None"""
+    directory = op.abspath(directory)
+    while True:
+        if op.exists(op.join(directory, ".git")):
+            return directory
+        parent = op.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _entries(directory):
+    """Sorted (name, is_dir, is_file) of the directory entries. Symbolic links to directories
+    are not followed"""
+    if hasattr(os, "scandir"):
+        found = [(entry.name, entry.is_dir(follow_symlinks=False), entry.is_file())
+                 for entry in os.scandir(directory)]
+    else:
+        found = []
+        for name in os.listdir(directory):
+            path = op.join(directory, name)
+            found.append((name, op.isdir(path) and not op.islink(path), op.isfile(path)))
+    return sorted(found)
+
+
+class FileFinder(object):
+    """Expand files, directories and globs to python files
+
+    Input
+    -----
+    rcfile : str | None
+        pylint configuration with the ignore options. Found like pylint does if None.
+    gitignore : bool | True
+        Respect .gitignore files of the walked directories and their parents in the repository.
+    """
+    def __init__(self, rcfile=None, gitignore=True):
+        self.ignored_names, self.ignored_patterns, self.ignored_paths = ignore_options(rcfile)
+        self.gitignore = gitignore
+
+    def ignored(self, path, name, is_dir, gitignores):
+        """True if the path is ignored by pylint options or .gitignore files"""
+        if name in ALWAYS_IGNORED or name in self.ignored_names:
+            return True
+        if any(pattern.match(name) for pattern in self.ignored_patterns):
+            return True
+        if self.ignored_paths:
+            normalized = path.replace(os.sep, "/")
+            if any(pattern.match(normalized) for pattern in self.ignored_paths):
+                return True
+        ignored = None
+        for rules in gitignores:
+            matched = rules.match(path, is_dir)
+            if matched is not None:
+                ignored = matched
+        return bool(ignored)
+
+    def parent_gitignores(self, directory):
+        """Rules of the .gitignore files from the repository root down to the directory, excluded"""
+        if not self.gitignore:
+            return ()
+        root = repository_root(directory)
+        if root is None:
+            return ()
+        directory = op.abspath(directory)
+        parents = []
+        while directory != root:
+            directory = op.dirname(directory)
+            parents.append(directory)
+        found = (GitIgnore.read(parent) for parent in reversed(parents))
+        return tuple(rules for rules in found if rules is not None)
+
+    def walk(self, top):
+        """Python files under the directory. Paths start with top"""
+        stack = [(top, self.parent_gitignores(top))]
+        while stack:
+            directory, gitignores = stack.pop()
+            rules = GitIgnore.read(directory) if self.gitignore else None
+            if rules is not None:
+                gitignores = gitignores + (rules,)
+            try:
+                entries = _entries(directory)
+            except OSError:
+                continue
+            subdirectories = []
+            for name, is_dir, is_file in entries:
+                path = op.join(directory, name)
+                if not (is_dir or is_file and is_python_file(name)):
+                    continue
+                if self.ignored(path, name, is_dir, gitignores):
+                    continue
+                if is_dir:
+                    subdirectories.append((path, gitignores))
+                else:
+                    yield path
+            stack.extend(reversed(subdirectories))
+
+    def expand(self, paths):
+        """Python files of the given files, directories and globs in the given order, without
+        duplicates"""
+        seen = set()
+        for path in paths:
+            if GLOB_CHARS.search(path) and not op.exists(path):
+                found = sorted(glob.glob(path, **({"recursive": True} if "**" in path else {})))
+            else:
+                found = [path]
+            for match in found:
+                if op.isdir(match):
+                    files = self.walk(match)
+                elif match is path or (is_python_file(match)
+                                       and not self.ignored(match, op.basename(match), False, ())):
+                    files = [match]
+                else:
+                    continue
+                for fname in files:
+                    if fname not in seen:
+                        seen.add(fname)
+                        yield fname
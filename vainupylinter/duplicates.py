@@ -0,0 +1,209 @@
+"""Duplicate code across the linted files
+
+pylint's duplicate-code checker compares the files of one pylint run, and the
+runner lints every file in a run of its own, so copies between files are never
+found. DuplicateIndex reads every file once before linting starts. The lines of
+each file are normalised, every window of min_lines consecutive lines gets a
+rolling hash, and windows that hash alike in two files are joined into duplicate
+blocks. Time and memory grow linearly with the number of lines.
+
+The blocks found for a file are added to its linter.stats as duplicate_lines and
+duplicates, where eval_results and custom rules can use them.
+"""
+from __future__ import absolute_import
+import io
+import re
+import tokenize
+from array import array
+
+# Same default as pylint's min-similarity-lines
+MIN_LINES = 4
+# Rolling hash modulus, a Mersenne prime, and base
+MODULUS = (1 << 61) - 1
+BASE = 1000003
+# Lines without any of these, e.g. closing brackets, are not counted
+CODE = re.compile(r"\w")
+SKIPPED_TOKENS = (tokenize.COMMENT, tokenize.NL, tokenize.INDENT, tokenize.DEDENT,
+                  tokenize.ENDMARKER, getattr(tokenize, "ENCODING", -1))
+
+
+def _tokenized_lines(source):
+    """(line number, text) of the statements that count, tokens joined by single spaces.
+    Raises tokenize.TokenError or SyntaxError if the source does not tokenize"""
+    lines = {}
+    statement = []
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        kind, text, start = token[0], token[1], token[2]
+        if kind in SKIPPED_TOKENS:
+            continue
+        if kind != tokenize.NEWLINE:
+            statement.append((start[0], text, kind))
+            continue
+        # Docstrings and other bare strings, and imports are not counted
+        if statement and not (all(item[2] == tokenize.STRING for item in statement)
+                              or statement[0][1] in ("import", "from")):
+            for row, text, _ in statement:
+                lines.setdefault(row, []).append(text)
+        statement = []
+    return [(row, " ".join(lines[row])) for row in sorted(lines)]
+
+
+def normalized_lines(source):
+    """(line number, normalised text) of the lines of the source that are compared
+
+    Comments, docstrings, imports, blank lines and lines without code, e.g.
+    closing brackets, are dropped and whitespace is normalised. Source that does
+    not tokenize is compared line by line without comments.
+    """
+    if isinstance(source, bytes):
+        source = source.decode("utf-8", "replace")
+    try:
+        lines = _tokenized_lines(source)
+    except (tokenize.TokenError, SyntaxError):
+        lines = [(row, " ".join(line.split())) for row, line in enumerate(source.splitlines(), 1)
+                 if not line.lstrip().startswith("#")]
+    return [(row, text) for row, text in lines if CODE.search(text)]
+
+
+class DuplicateIndex(object):
+    """Blocks of at least min_lines normalised lines that appear in more than one file
+
+    Input
+    -----
+    min_lines : int | 4
+        Shortest duplicate block, in normalised lines.
+    """
+    def __init__(self, min_lines=MIN_LINES):
+        self.min_lines = max(int(min_lines), 1)
+        self.fnames = []
+        # Line numbers and window hashes of each file
+        self.rows = []
+        self.windows = []
+        # Window hash to the first (file, window) with it, and the first one in another file
+        self.first = {}
+        self.second = {}
+
+    def add(self, fname, source):
+        """Index the windows of a file. Source is str or bytes"""
+        lines = normalized_lines(source)
+        file_id = len(self.fnames)
+        self.fnames.append(fname)
+        self.rows.append(array("l", [row for row, _ in lines]))
+        windows = array("q")
+        size = self.min_lines
+        # Weight of the line leaving the window
+        leaving = pow(BASE, size - 1, MODULUS)
+        hashes = [hash(text) % MODULUS for _, text in lines]
+        value = 0
+        for position, line_hash in enumerate(hashes):
+            if position >= size:
+                value = (value - hashes[position - size] * leaving) % MODULUS
+            value = (value * BASE + line_hash) % MODULUS
+            if position >= size - 1:
+                windows.append(value)
+                start = position - size + 1
+                first = self.first.setdefault(value, (file_id, start))
+                if first[0] != file_id and value not in self.second:
+                    self.second[value] = (file_id, start)
+        self.windows.append(windows)
+
+    def other(self, file_id, position):
+        """(file, window) with the same hash in another file, None if there is none"""
+        value = self.windows[file_id][position]
+        first = self.first[value]
+        if first[0] != file_id:
+            return first
+        return self.second.get(value)
+
+    def blocks(self, file_id):
+        """Duplicate blocks of the file as lists
+        [start window, end window, other file, other start window]"""
+        blocks = []
+        for position, window in enumerate(self.windows[file_id]):
+            if blocks and blocks[-1][1] == position - 1:
+                # Continue the current block while the other file keeps matching
+                block = blocks[-1]
+                other_windows = self.windows[block[2]]
+                next_other = block[3] + position - block[0]
+                if (next_other < len(other_windows)
+                        and other_windows[next_other] == window):
+                    block[1] = position
+                    continue
+            match = self.other(file_id, position)
+            if match is not None:
+                blocks.append([position, position, match[0], match[1]])
+        return blocks
+
+    def find(self):
+        """Duplicates of each indexed file
+
+        Output
+        ------
+        dict
+            File name as added to a dict with keys lines (line numbers of the
+            duplicated lines) and blocks (list of dicts with keys start, end,
+            other, other_start and other_end, lines of the file and of the other
+            file, ends included).
+        """
+        found = {}
+        size = self.min_lines
+        for file_id, fname in enumerate(self.fnames):
+            rows = self.rows[file_id]
+            covered = set()
+            blocks = []
+            for start, end, other, other_start in self.blocks(file_id):
+                covered.update(rows[start:end + size])
+                other_rows = self.rows[other]
+                blocks.append({
+                    "start": rows[start],
+                    "end": rows[end + size - 1],
+                    "other": self.fnames[other],
+                    "other_start": other_rows[other_start],
+                    "other_end": other_rows[other_start + end - start + size - 1],
+                })
+            if blocks:
+                found[fname] = {"lines": sorted(covered), "blocks": blocks}
+        return found
+
+
+def find_duplicates(fnames, read, min_lines=MIN_LINES):
+    """Duplicates of the files, see DuplicateIndex.find. Each file is read once
+
+    Input
+    -----
+    fnames : iterable
+        Files to index.
+    read : function
+        Content of a file, None leaves the file out.
+        Input: fname (str)
+        Output: bytes | None
+    min_lines : int | 4
+        Shortest duplicate block.
+    """
+    index = DuplicateIndex(min_lines)
+    for fname in fnames:
+        source = read(fname)
+        if source is not None:
+            index.add(fname, source)
+    return index.find()
+
+
+def duplicate_stats(found, lines=None):
+    """duplicate_lines and duplicates stats of a file from its entry in find_duplicates
+
+    Input
+    -----
+    found : dict | None
+        Entry of the file, None if it has no duplicates.
+    lines : gitdiff.LineIndex | None
+        Count only the duplicated lines among these, and the blocks touching them.
+    """
+    if not found:
+        return {"duplicate_lines": 0, "duplicates": []}
+    duplicated = found["lines"]
+    blocks = found["blocks"]
+    if lines is not None:
+        duplicated = [row for row in duplicated if row in lines]
+        blocks = [block for block in blocks
+                  if any(row in lines for row in range(block["start"], block["end"] + 1))]
+    return {"duplicate_lines": len(duplicated), "duplicates": [dict(block) for block in blocks]}
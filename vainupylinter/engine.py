@@ -0,0 +1,51 @@
+"""Reuse one configured pylint linter for several files
+
+Constructing pylint's Run re-reads the rcfile and re-registers all checkers and
+plugins. WarmLinter pays that cost only for the first file and lints the rest
+against the same linter, keeping astroid's module cache warm. The linter resets
+its stats when a check starts, so the stats are still per file. Files linted with
+different options, e.g. with lint profiles, get a linter for each set of options.
+"""
+from __future__ import absolute_import
+
+ENGINES = ("run", "warm")
+
+
+class WarmLinter(object):
+    """Lint files with a single PyLinter
+
+    Input
+    -----
+    new_run : function
+        Input: pylint command line arguments (list), reporter
+        Output: pylint.lint.Run object
+        Used to build the linter of the first file with each set of options.
+    """
+    def __init__(self, new_run):
+        self.new_run = new_run
+        self.results = None
+        self.runs = {}
+
+    def reset(self):
+        """Throw away the linters, e.g. after a crash left one in an unknown state"""
+        self.results = None
+        self.runs = {}
+
+    def lint(self, command_arg, reporter=None):
+        """Lint the file given as the first command line argument
+
+        Returns the Run object that owns the linter. Its linter.stats
+        contains the stats of the linted file only. If reporter is given,
+        it is used for this file.
+        """
+        fname, options = command_arg[0], tuple(command_arg[1:])
+        if options not in self.runs:
+            self.results = self.runs[options] = self.new_run(command_arg, reporter)
+            return self.results
+        self.results = self.runs[options]
+        linter = self.results.linter
+        if reporter is not None:
+            linter.set_reporter(reporter)
+        linter.check([fname])
+        linter.generate_reports()
+        return self.results
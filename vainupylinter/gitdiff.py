@@ -0,0 +1,242 @@
+"""Files and lines changed in git
+
+Changed files are taken from `git diff`, against the merge base of a reference
+(--since) or the index (--staged). Changed lines of each file are kept in a
+LineIndex, so checking whether a message is on a changed line is a binary search
+even for large diffs.
+
+The staged content of files is read from a single `git cat-file --batch` process.
+"""
+from __future__ import absolute_import
+import bisect
+import io
+import os.path as op
+import re
+import subprocess
+import sys
+from contextlib import contextmanager
+
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+# Messages in these categories are counted even if they are outside changed lines
+ALWAYS_COUNTED = ("fatal",)
+CATEGORIES = ("convention", "refactor", "warning", "error", "fatal", "info")
+
+
+class GitError(Exception):
+    """git failed, e.g. outside a repository or with an unknown reference"""
+
+
+def git(args, cwd=None):
+    """Run git command and return its output. Raises GitError with the first line of
+    the git error message if the command fails"""
+    try:
+        output = subprocess.check_output(["git"] + list(args), cwd=cwd, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as error:
+        stderr = getattr(error, "stderr", None) or b""
+        lines = stderr.decode("utf-8", "replace").strip().splitlines()
+        raise GitError(lines[0] if lines else str(error))
+    except OSError as error:
+        raise GitError("cannot run git: {}".format(error))
+    return output.decode("utf-8", "replace")
+
+
+class LineIndex(object):
+    """Sorted, non-overlapping line ranges of a file"""
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, ranges=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, line):
+        idx = bisect.bisect_right(self.starts, line) - 1
+        return idx >= 0 and line <= self.ends[idx]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def ranges(self):
+        """List of (start, end) ranges, end included"""
+        return list(zip(self.starts, self.ends))
+
+
+def parse_diff(diff, root):
+    """Changed lines per file from unified diff output with zero context
+
+    Input
+    -----
+    diff : str
+        Output of git diff -U0.
+    root : str
+        Repository root. Paths in the output are relative to it.
+
+    Output
+    ------
+    dict
+        Absolute path: LineIndex
+    """
+    ranges = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            path = line[4:]
+            current = None
+            if path != "/dev/null":
+                current = op.normpath(op.join(root, path[2:] if path.startswith("b/") else path))
+                ranges.setdefault(current, [])
+        elif current and line.startswith("@@"):
+            match = HUNK_RE.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                if count:
+                    ranges[current].append((start, start + count - 1))
+    return {path: LineIndex(found) for path, found in ranges.items()}
+
+
+def changed_lines(since=None, staged=False, cwd=None):
+    """Changed python files and their changed lines
+
+    Input
+    -----
+    since : str | None
+        Compare the working tree to the merge base of this reference and HEAD.
+    staged : bool
+        Compare the index to HEAD.
+
+    Output
+    ------
+    dict
+        Absolute path: LineIndex. Deleted files are not included.
+    """
+    root = git(["rev-parse", "--show-toplevel"], cwd=cwd).strip()
+    args = ["diff", "-U0", "--no-color", "--no-ext-diff", "--diff-filter=d"]
+    if staged:
+        args.append("--cached")
+    elif since:
+        args.append(git(["merge-base", since, "HEAD"], cwd=cwd).strip())
+    args.extend(["--", "*.py"])
+    return parse_diff(git(args, cwd=cwd), root)
+
+
+def staged_blobs(cwd=None):
+    """Blob shas of staged python files
+
+    Output
+    ------
+    dict
+        Absolute path: blob sha of the staged content. Deleted files are not included.
+    """
+    root = git(["rev-parse", "--show-toplevel"], cwd=cwd).strip()
+    output = git(["diff", "--cached", "--raw", "-z", "--no-abbrev", "--diff-filter=d", "--",
+                  "*.py"], cwd=cwd)
+    blobs = {}
+    tokens = output.split("\0")
+    idx = 0
+    while idx < len(tokens) and tokens[idx].startswith(":"):
+        meta = tokens[idx][1:].split()
+        # Renames and copies are followed by the old and the new path
+        idx += 3 if meta[4][0] in "RC" else 2
+        blobs[op.normpath(op.join(root, tokens[idx - 1]))] = meta[3]
+    return blobs
+
+
+class BlobReader(object):
+    """Read blobs from one `git cat-file --batch` process
+
+    The process is started on first read and kept running until close.
+    """
+    def __init__(self, cwd=None):
+        self.cwd = cwd
+        self.process = None
+
+    def read(self, sha):
+        """Contents of the blob as bytes or None if it does not exist"""
+        if self.process is None:
+            # Kept running across reads until close, not a with block
+            self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+                ["git", "cat-file", "--batch"], cwd=self.cwd,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.process.stdin.write(sha.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        data = self.process.stdout.read(int(header[2]))
+        # Contents are followed by a newline
+        self.process.stdout.read(1)
+        return data
+
+    def close(self):
+        """Stop the git process"""
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+
+@contextmanager
+def stdin_from(data):
+    """Replace sys.stdin with the given bytes, e.g. for pylint --from-stdin.
+    No-op if data is None"""
+    if data is None:
+        yield
+        return
+    original = sys.stdin
+    sys.stdin = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+    try:
+        yield
+    finally:
+        sys.stdin = original
+
+
+def changed_files(changed, fnames=None):
+    """Changed files as paths relative to the working directory
+
+    If fnames is given, only the changed files among them are returned.
+    """
+    found = sorted(op.relpath(path) for path in changed)
+    if fnames is not None:
+        wanted = set(op.abspath(fname) for fname in fnames)
+        found = [fname for fname in found if op.abspath(fname) in wanted]
+    return found
+
+
+def filter_stats(stats, messages, lines, evaluation=None):
+    """Stats counting only messages on changed lines
+
+    Input
+    -----
+    stats : dict
+        linter.stats of the file.
+    messages : list
+        pylint messages of the file.
+    lines : LineIndex
+        Changed lines of the file.
+    evaluation : str | None
+        pylint evaluation expression used to calculate the score.
+
+    Output
+    ------
+    dict
+        Copy of stats with counts, by_msg and global_note recalculated.
+    """
+    filtered = dict(stats)
+    by_msg = {}
+    for category in CATEGORIES:
+        filtered[category] = 0
+    for msg in messages:
+        if msg.category in ALWAYS_COUNTED or msg.line in lines:
+            filtered[msg.category] = filtered.get(msg.category, 0) + 1
+            by_msg[msg.symbol] = by_msg.get(msg.symbol, 0) + 1
+    filtered["by_msg"] = by_msg
+    if evaluation and "global_note" in stats and stats.get("statement"):
+        filtered["global_note"] = eval(evaluation, {}, filtered)  # pylint: disable=eval-used
+    return filtered
@@ -0,0 +1,152 @@
+"""Score history of linted files in SQLite
+
+Every run adds a row per file with its score, message counts and lint time. Rows
+are indexed by path and by content hash, so the last passing score of a file is
+an indexed lookup, also after the file has been moved. Rows are written by the
+main process at the end of the run in one transaction; parallel workers only
+read. The database uses write-ahead logging so that several runners can share it.
+"""
+from __future__ import absolute_import
+import hashlib
+import logging
+import os
+import os.path as op
+import time
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None  # pylint: disable=invalid-name
+
+# Columns of the result record stored in the history
+COUNTS = ("convention", "refactor", "warning", "error", "fatal", "info", "statement")
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS scores ("
+    " id INTEGER PRIMARY KEY,"
+    " path TEXT NOT NULL,"
+    " content_hash TEXT,"
+    " score REAL,"
+    " passed INTEGER NOT NULL,"
+    " {},"
+    " duration REAL,"
+    " created REAL NOT NULL)".format(", ".join("{} INTEGER".format(column) for column in COUNTS)),
+    "CREATE INDEX IF NOT EXISTS scores_path ON scores (path, id)",
+    "CREATE INDEX IF NOT EXISTS scores_hash ON scores (content_hash, id)",
+)
+DEFAULT_KEEP = 20
+DEFAULT_MAX_AGE_DAYS = 180
+# Scores are compared with this tolerance
+EPSILON = 1e-6
+
+
+def content_hash(fname):
+    """sha256 of the file contents or None if it cannot be read"""
+    try:
+        with open(fname, "rb") as handle:
+            return hashlib.sha256(handle.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+
+
+class ScoreHistory(object):
+    """Scores of linted files over runs
+
+    Input
+    -----
+    path : str
+        Location of the database. Created if needed.
+    keep : int | DEFAULT_KEEP
+        Rows kept per file by prune.
+    max_age_days : float | DEFAULT_MAX_AGE_DAYS
+        Rows older than this are removed by prune.
+    """
+    def __init__(self, path, keep=DEFAULT_KEEP, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        if sqlite3 is None:
+            raise ImportError("sqlite3 is needed for the score history")
+        self.path = path
+        self.keep = keep
+        self.max_age_days = max_age_days
+        self.connection = None
+
+    def connect(self):
+        """Open the database, creating the schema if needed"""
+        if self.connection is None:
+            directory = op.dirname(op.abspath(self.path))
+            if not op.isdir(directory):
+                os.makedirs(directory)
+            self.connection = sqlite3.connect(self.path, timeout=30)
+            try:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                logging.getLogger(__name__).debug(
+                    "Write-ahead logging is not available for {}".format(self.path))
+            with self.connection:
+                for statement in SCHEMA:
+                    self.connection.execute(statement)
+        return self.connection
+
+    def close(self):
+        """Close the database"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def last_score(self, fname, digest=None):
+        """Last score of the file from a run where it passed, or None
+
+        If the path has no history, the last passing score of the same content
+        under another path is used, e.g. when the file was moved.
+        """
+        connection = self.connect()
+        row = connection.execute(
+            "SELECT score FROM scores WHERE path = ? AND passed = 1 AND score IS NOT NULL "
+            "ORDER BY id DESC LIMIT 1", (op.abspath(fname),)).fetchone()
+        if row is None and digest:
+            row = connection.execute(
+                "SELECT score FROM scores WHERE content_hash = ? AND passed = 1 "
+                "AND score IS NOT NULL ORDER BY id DESC LIMIT 1", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def scores(self, fname):
+        """All recorded (created, score, passed) of the file, oldest first"""
+        return self.connect().execute(
+            "SELECT created, score, passed FROM scores WHERE path = ? ORDER BY id",
+            (op.abspath(fname),)).fetchall()
+
+    def add(self, records):
+        """Store result records of PylintRunner.lint_file in one transaction"""
+        now = time.time()
+        rows = []
+        for record in records:
+            score = record.get("score")
+            rows.append((op.abspath(record["path"]), record.get("content_hash"),
+                         score if isinstance(score, (int, float)) and score is not False else None,
+                         1 if record["passed"] else 0)
+                        + tuple(record.get(column) or 0 for column in COUNTS)
+                        + (record.get("duration"), now))
+        if not rows:
+            return
+        connection = self.connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO scores (path, content_hash, score, passed, {}, duration, created) "
+                "VALUES ({})".format(", ".join(COUNTS), ", ".join("?" * (len(COUNTS) + 6))), rows)
+
+    def prune(self, fnames=None):
+        """Remove rows older than max_age_days and all but the latest keep rows of the files.
+        Returns the number of removed rows"""
+        connection = self.connect()
+        removed = 0
+        with connection:
+            if self.max_age_days:
+                cursor = connection.execute("DELETE FROM scores WHERE created < ?",
+                                            (time.time() - self.max_age_days * 86400,))
+                removed += cursor.rowcount
+            if self.keep and fnames:
+                for fname in set(op.abspath(fname) for fname in fnames):
+                    cursor = connection.execute(
+                        "DELETE FROM scores WHERE path = ? AND id NOT IN "
+                        "(SELECT id FROM scores WHERE path = ? ORDER BY id DESC LIMIT ?)",
+                        (fname, fname, self.keep))
+                    removed += cursor.rowcount
+        return removed
@@ -0,0 +1,178 @@
+"""Keep the memory of long runs bounded
+
+astroid keeps every module it has parsed in a global cache, and the inference
+caches grow with every linted file. MemoryPolicy evicts those caches after every
+batch of files and when the resident set size of the process goes over a limit.
+CPython seldom returns freed memory to the operating system, so the resident set
+size often stays over the limit after an eviction. The policy then waits twice
+as many files before it evicts again, instead of evicting after every file.
+Parallel workers are restarted instead, after a batch and when they go over the
+limit, see parallel.lint_parallel and parallel.lint_isolated.
+"""
+from __future__ import absolute_import
+import gc
+import logging
+import os
+import sys
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = None
+# Most files linted between evictions while the resident set size stays over the limit
+MAX_BACKOFF = 256
+
+
+def current_rss_kb():
+    """Current resident set size of the process in kilobytes or None if not available"""
+    if PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * PAGE_SIZE // 1024
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+
+def reset_peak_rss():
+    """Reset the peak resident set size of the process to the current size. Linux only
+
+    False if it could not be reset.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+        return True
+    except (IOError, OSError):
+        return False
+
+
+def peak_rss_since_reset_kb():
+    """Peak resident set size of the process since the last reset_peak_rss in kilobytes or None
+    if not available"""
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (IOError, OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def rss_over(max_rss_kb):
+    """True if the resident set size is over max_rss_kb. Never if max_rss_kb is 0"""
+    return bool(max_rss_kb) and (current_rss_kb() or 0) > max_rss_kb
+
+
+def evict_caches():
+    """Drop astroid's module and inference caches and collect garbage"""
+    # pylint: disable=import-outside-toplevel
+    from astroid import MANAGER
+    MANAGER.clear_cache()
+    try:
+        from astroid.context import _INFERENCE_CACHE
+        _INFERENCE_CACHE.clear()
+    except ImportError:
+        pass
+    gc.collect()
+
+
+def _evict_modules(drop):
+    """Drop modules from astroid's cache whose file drop(fname) is True. Returns the number of
+    dropped modules"""
+    if "astroid" not in sys.modules:
+        # Nothing has been parsed yet, avoid importing astroid
+        return 0
+    from astroid import MANAGER  # pylint: disable=import-outside-toplevel
+    cache = MANAGER.astroid_cache
+    dropped = 0
+    for name, module in list(cache.items()):
+        fname = getattr(module, "file", None)
+        if fname and drop(fname):
+            cache.pop(name, None)
+            dropped += 1
+    return dropped
+
+
+def _evict_failed_imports():
+    """Forget imports astroid could not resolve, the modules may exist now"""
+    from astroid import MANAGER  # pylint: disable=import-outside-toplevel
+    cache = getattr(MANAGER, "_mod_file_cache", None)
+    if cache is None:
+        return
+    for key, value in list(cache.items()):
+        if isinstance(value, Exception):
+            cache.pop(key, None)
+
+
+def evict_changed_modules(since):
+    """Drop modules from astroid's cache whose file was modified after the given time, and the
+    imports that could not be resolved. Returns the number of dropped modules"""
+    def changed(fname):
+        """True if modified after since or gone"""
+        try:
+            return os.stat(fname).st_mtime >= since
+        except OSError:
+            return True
+    if "astroid" in sys.modules:
+        _evict_failed_imports()
+    return _evict_modules(changed)
+
+
+def evict_modules(fnames):
+    """Drop the modules of the given files from astroid's cache, e.g. to infer them again against
+    changed modules they import. Returns the number of dropped modules"""
+    fnames = set(os.path.abspath(fname) for fname in fnames)
+    return _evict_modules(lambda fname: os.path.abspath(fname) in fnames)
+
+
+class MemoryPolicy(object):
+    """Decide when the caches of the process are evicted
+
+    Input
+    -----
+    max_files : int | 0
+        Evict after every max_files linted files. 0 never evicts by file count.
+    max_rss_mb : int | 0
+        Evict after a file if the resident set size is over this many megabytes.
+        If it is still over after evicting, the next eviction waits 2, 4, 8, ...
+        files, up to MAX_BACKOFF. 0 has no limit. Ignored where the resident set
+        size is not available.
+    """
+    def __init__(self, max_files=0, max_rss_mb=0):
+        self.max_files = max_files
+        self.max_rss_kb = max_rss_mb * 1024
+        self.files = 0
+        # Files to lint before the memory limit is checked again
+        self.wait = 0
+        self.backoff = 1
+        if self.max_rss_kb and current_rss_kb() is None:
+            logging.getLogger(__name__).warning(
+                "Resident set size is not available, --max-rss is ignored")
+            self.max_rss_kb = 0
+
+    def __bool__(self):
+        return bool(self.max_files or self.max_rss_kb)
+
+    __nonzero__ = __bool__
+
+    def over_limit(self):
+        """True if the process uses more memory than allowed"""
+        return rss_over(self.max_rss_kb)
+
+    def file_done(self):
+        """Count a linted file and evict the caches if needed. Returns True if evicted"""
+        self.files += 1
+        self.wait = max(self.wait - 1, 0)
+        batch_done = self.max_files and self.files >= self.max_files
+        over_limit = not batch_done and not self.wait and self.over_limit()
+        if not batch_done and not over_limit:
+            return False
+        self.files = 0
+        evict_caches()
+        if over_limit:
+            # Memory freed by the eviction is often kept by the process
+            self.backoff = min(self.backoff * 2, MAX_BACKOFF) if self.over_limit() else 1
+            self.wait = self.backoff
+        return True
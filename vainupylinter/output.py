@@ -0,0 +1,61 @@
+"""Machine readable output of the results"""
+from __future__ import absolute_import
+import json
+import sys
+from contextlib import contextmanager
+
+FORMATS = ("text", "jsonl")
+
+
+class JsonLinesWriter(object):
+    """Write each record as one json line and flush right away
+
+    Input
+    -----
+    stream : file
+        Stream to write to.
+    close_stream : bool | False
+        If True, stream is closed by close.
+    """
+    def __init__(self, stream, close_stream=False):
+        self.stream = stream
+        self.close_stream = close_stream
+
+    def write(self, record):
+        """Write a single record"""
+        self.stream.write(json.dumps(record, sort_keys=True) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        """Close the stream if it was opened for the writer"""
+        if self.close_stream:
+            self.stream.close()
+
+
+def records_to_stdout(output_format, path="-"):
+    """True if json lines records are written to stdout"""
+    return output_format == "jsonl" and path == "-"
+
+
+@contextmanager
+def stdout_to(stream):
+    """Replace sys.stdout with the stream, e.g. to keep prints of custom hooks out of json lines
+    records on stdout. No-op if stream is None"""
+    if stream is None:
+        yield
+        return
+    original = sys.stdout
+    sys.stdout = stream
+    try:
+        yield
+    finally:
+        sys.stdout = original
+
+
+def open_output(output_format, path="-"):
+    """Writer for the format or None if records are not written"""
+    if output_format != "jsonl":
+        return None
+    if path == "-":
+        return JsonLinesWriter(sys.stdout)
+    return JsonLinesWriter(open(path, "w"), close_stream=True)
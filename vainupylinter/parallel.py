@@ -0,0 +1,291 @@
+"""Lint files in worker processes
+
+Each worker builds its own runner and lints one file at a time. Log output is
+collected in the worker and replayed in the main process in input order, so the
+output and the exit code are identical to a serial run.
+
+lint_isolated manages its own workers instead of a pool, so that a worker stuck
+on a file can be killed when the file runs out of time. The remaining files
+continue on a fresh worker. A worker that goes over the memory limit after a
+file exits and is replaced the same way, as evicting caches seldom returns the
+memory to the operating system.
+"""
+from __future__ import absolute_import
+import logging
+import multiprocessing
+import time
+
+try:
+    from vainupylinter.memory import rss_over
+except ImportError:
+    from memory import rss_over
+
+_WORKER = {}
+
+
+class LogCollector(logging.Handler):
+    """Store log records so that they can be sent back to the main process"""
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        """Keep only what is needed to replay the record"""
+        self.records.append((record.name, record.levelno, record.getMessage()))
+
+
+def _init_worker(runner_class, args, shared=None):
+    """Create the worker specific runner. Called once per worker process"""
+    collector = LogCollector()
+    root = logging.getLogger()
+    # Handlers inherited from the main process are replaced, records are replayed there
+    root.handlers = [collector]
+    root.setLevel(args.verbosity)
+    runner = runner_class(args)
+    # Workers are restarted after a batch or over the memory limit instead of evicting caches
+    runner.memory.max_files = 0
+    _WORKER["max_rss_kb"], runner.memory.max_rss_kb = runner.memory.max_rss_kb, 0
+    for name, value in (shared or {}).items():
+        setattr(runner, name, value)
+    _WORKER["runner"] = runner
+    _WORKER["collector"] = collector
+
+
+def _lint_in_worker(task):
+    """Lint a single file using the worker runner. Task is the input position and the file"""
+    idx, fname = task
+    runner = _WORKER["runner"]
+    collector = _WORKER["collector"]
+    runner.clean_up()
+    collector.records = []
+    record = runner.lint_file(fname)
+    return idx, (record, list(runner.failed_files), list(runner.custom_failed), collector.records)
+
+
+def replay(records):
+    """Log records collected by a worker"""
+    for name, level, msg in records:
+        logging.getLogger(name).log(level, msg)
+
+
+def resolve_jobs(jobs):
+    """Number of worker processes to use. 0 means all available cores"""
+    if jobs <= 0:
+        return multiprocessing.cpu_count()
+    return jobs
+
+
+def lint_parallel(runner_class, args, fnames, jobs, ordered=True, cost=None, shared=None):
+    """Lint files in worker processes
+
+    Input
+    -----
+    runner_class : type
+        Runner class to instantiate in each worker.
+    args : argparse.Namespace
+        Arguments passed to the runner.
+    fnames : iterable
+        Files to lint. Workers start linting while the files are still being found.
+    jobs : int
+        Number of worker processes. 0 uses all available cores.
+        Workers are restarted after args.max_files_per_worker files if it is set.
+    ordered : bool | True
+        Yield the results in input order. If False, results are yielded as soon
+        as they are done. Closing the generator terminates the workers.
+    cost : function | None
+        Estimated lint time of a file. If given, the longest files are linted
+        first so that no worker is left with a long file at the end. The files
+        are then collected before linting starts.
+        Input: fname (str)
+        Output: float
+    shared : dict | None
+        Attributes set on the runner of each worker, e.g. results of a pass over
+        all files done before linting.
+
+    Output
+    ------
+    generator of tuple(dict, list, list)
+        result record of the file, failed files and files that failed custom
+        checks.
+    """
+    tasks = enumerate(fnames)
+    if cost is not None:
+        tasks = sorted(tasks, key=lambda task: -cost(task[1]))
+    processes = resolve_jobs(jobs)
+    if hasattr(tasks, "__len__"):
+        processes = min(processes, len(tasks))
+    # Terminated in finally, also when the caller stops iterating; the with block of Pool only
+    # exists on python3
+    pool = multiprocessing.Pool(processes,  # pylint: disable=consider-using-with
+                                initializer=_init_worker,
+                                initargs=(runner_class, args, shared),
+                                maxtasksperchild=getattr(args, 'max_files_per_worker', 0) or None)
+    try:
+        # Results done out of order wait until the ones before them are done
+        pending = {}
+        position = 0
+        for idx, result in pool.imap_unordered(_lint_in_worker, tasks):
+            pending[idx if ordered else position] = result
+            while position in pending:
+                record, failed, custom_failed, records = pending.pop(position)
+                position += 1
+                replay(records)
+                yield record, failed, custom_failed
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _isolated_worker(conn, runner_class, args, shared=None):
+    """Lint the files received from the connection until None is received"""
+    _init_worker(runner_class, args, shared)
+    # Imports are not counted in the time of the first file
+    if hasattr(_WORKER["runner"], "preload"):
+        _WORKER["runner"].preload()
+    conn.send(None)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        idx, result = _lint_in_worker(task)
+        # The worker exits over the memory limit and is replaced
+        retire = rss_over(_WORKER["max_rss_kb"])
+        conn.send((idx, result, retire))
+        if retire:
+            break
+
+
+class IsolatedWorker(object):
+    """Worker process that lints one file at a time and can be killed"""
+    def __init__(self, runner_class, args, shared=None):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_isolated_worker,
+                                               args=(child, runner_class, args, shared))
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        self.task = None
+        self.started = None
+        self.ready = False
+        self.done = 0
+
+    def start(self, task):
+        """Send a task (input position, file) to the worker, once it is ready"""
+        if not self.ready:
+            self.conn.recv()
+            self.ready = True
+        self.task = task
+        self.started = time.time()
+        self.conn.send(task)
+
+    def elapsed(self):
+        """Seconds spent on the current task"""
+        return time.time() - self.started
+
+    def kill(self):
+        """Stop the worker immediately"""
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        """Let the worker exit after its current task"""
+        try:
+            self.conn.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+def lint_isolated(runner_class, args, fnames, jobs, timeout, on_failure, ordered=True, cost=None,
+                  shared=None):
+    """Lint files in worker processes that are killed when a file takes longer than timeout
+
+    A worker that is over args.max_rss megabytes after a file exits and is replaced.
+    Input and output are as in lint_parallel, with
+    timeout : float
+        Seconds a file may take. 0 or None never times out, but a worker that
+        dies is still replaced.
+    on_failure : function
+        Builds the result of a file whose worker timed out or died.
+        Input: fname (str), reason ("timed-out" or "crashed"), seconds (float)
+        Output: tuple(dict, list, list) as yielded
+    """
+    tasks = enumerate(fnames)
+    if cost is not None:
+        tasks = sorted(tasks, key=lambda task: -cost(task[1]))
+    processes = resolve_jobs(jobs)
+    # Python 3.3+ only, imported here so that the other modes work on python 2.7
+    from multiprocessing.connection import wait  # pylint: disable=import-outside-toplevel
+    if hasattr(tasks, "__len__"):
+        processes = max(min(processes, len(tasks)), 1)
+    tasks = iter(tasks)
+    max_files = getattr(args, 'max_files_per_worker', 0)
+    idle = []
+    running = {}
+    # Results done out of order wait until the ones before them are done. Failures are
+    # kept as (fname, reason, seconds) and built only when their turn comes, to keep the log
+    # in order
+    pending = {}
+    position = 0
+    exhausted = False
+    try:
+        while True:
+            # New workers start up side by side before their first file is sent
+            starting = []
+            while not exhausted and len(running) + len(starting) < processes:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+                worker = idle.pop() if idle else IsolatedWorker(runner_class, args, shared)
+                starting.append((worker, task))
+            for worker, task in starting:
+                running[worker.conn] = worker
+                worker.start(task)
+            if not running:
+                break
+            wait_for = None
+            if timeout:
+                wait_for = max(timeout - max(worker.elapsed() for worker in running.values()), 0)
+            finished = []
+            for conn in wait(list(running), wait_for):
+                worker = running.pop(conn)
+                try:
+                    idx, result, retire = conn.recv()
+                except (EOFError, IOError, OSError):
+                    # The worker died, e.g. it ran out of memory or the stack
+                    failure = (worker.task[1], "crashed", worker.elapsed())
+                    finished.append((worker.task[0], None, failure))
+                    worker.kill()
+                    continue
+                finished.append((idx, result, None))
+                worker.done += 1
+                if retire or (max_files and worker.done >= max_files):
+                    worker.close()
+                else:
+                    idle.append(worker)
+            for conn, worker in list(running.items()):
+                if timeout and worker.elapsed() >= timeout:
+                    del running[conn]
+                    worker.kill()
+                    finished.append((worker.task[0], None, (worker.task[1], "timed-out", timeout)))
+            for idx, result, failure in finished:
+                pending[idx if ordered else position + len(pending)] = (result, failure)
+            while position in pending:
+                result, failure = pending.pop(position)
+                position += 1
+                if failure:
+                    yield on_failure(*failure)
+                    continue
+                record, failed, custom_failed, records = result
+                replay(records)
+                yield record, failed, custom_failed
+    finally:
+        for worker in idle + list(running.values()):
+            worker.kill()
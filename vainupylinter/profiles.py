@@ -0,0 +1,79 @@
+"""Lint profiles chosen by the path of the file
+
+A profile adds pylint options to the run of a file, or skips the file without
+running pylint. Test files, for example, can be checked for errors only instead
+of linting them fully and then ignoring the verdict. The patterns of the rules
+are compiled into one regular expression per rule when the runner starts.
+"""
+from __future__ import absolute_import
+import argparse
+import fnmatch
+import os
+import re
+
+# pylint options of each profile, None skips the file. Disabling single checkers saves
+# little: the time goes to inference, which the remaining checkers need as well
+PROFILES = {
+    "full": (),
+    "errors": ("--disable=all", "--enable=E,F"),
+    "skip": None,
+}
+# Files that ignore_tests allows to fail
+TEST_PATTERNS = ("*test_*", "*tests.py")
+
+
+def parse_path_profile(value):
+    """PATTERN=PROFILE as (patterns, profile). Patterns are separated by commas. For argparse"""
+    patterns, _, profile = value.rpartition("=")
+    if not patterns or profile not in PROFILES:
+        raise argparse.ArgumentTypeError(
+            "expected PATTERN=PROFILE with PROFILE one of {}, got {!r}".format(
+                ", ".join(sorted(PROFILES)), value))
+    return tuple(pattern.strip() for pattern in patterns.split(",") if pattern.strip()), profile
+
+
+def compile_patterns(patterns):
+    """One regular expression of glob patterns. Patterns with a slash match the end of the path,
+    others the file name"""
+    parts = []
+    for pattern in patterns:
+        regex = fnmatch.translate(pattern.replace(os.sep, "/"))
+        parts.append("(?:.*/)?" + regex if "/" in pattern else "(?:.*/)?(?!.*/)" + regex)
+    return re.compile("|".join("(?:{})".format(part) for part in parts))
+
+
+TEST_FILE = compile_patterns(TEST_PATTERNS)
+
+
+def is_test_file(fname):
+    """True if the file is a test file by its name"""
+    return TEST_FILE.match(fname.replace(os.sep, "/")) is not None
+
+
+class ProfileRules(object):
+    """Choose the profile of a file. The first matching rule wins, files without one use full
+
+    Input
+    -----
+    rules : list
+        Tuples (patterns, profile), see parse_path_profile.
+    test_profile : str | "full"
+        Profile of test files, applied after rules.
+    """
+    def __init__(self, rules=(), test_profile="full"):
+        self.rules = [(compile_patterns(patterns), profile)
+                      for patterns, profile in rules if patterns]
+        if test_profile != "full":
+            self.rules.append((TEST_FILE, test_profile))
+
+    def __bool__(self):
+        return bool(self.rules)
+    __nonzero__ = __bool__
+
+    def profile(self, fname):
+        """Name of the profile of the file"""
+        path = fname.replace(os.sep, "/")
+        for regex, profile in self.rules:
+            if regex.match(path):
+                return profile
+        return "full"
@@ -0,0 +1,196 @@
+"""Timing instrumentation of the runner
+
+Profiler records for each file the wall time of linting, the peak resident set
+size of the process while linting the file, the time spent in each pylint checker
+and the time spent in the custom hooks. Checkers are timed by wrapping their visit,
+leave and process methods when the linter prepares them, using a linter subclass.
+
+The peak resident set size of getrusage covers the whole life of the process, so
+after the largest file it is the same for every file. On linux the peak is reset
+before each file instead, see memory.reset_peak_rss. Elsewhere the resident set
+size after the file and its growth during the file are recorded: memory that the
+file allocated and freed again, e.g. a short-lived inference blow-up, is not
+counted, and memory freed by an earlier file may be reused without showing up.
+"""
+from __future__ import absolute_import
+import functools
+import json
+import logging
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None  # pylint: disable=invalid-name
+
+try:
+    from vainupylinter.memory import current_rss_kb, peak_rss_since_reset_kb, reset_peak_rss
+except ImportError:
+    from memory import current_rss_kb, peak_rss_since_reset_kb, reset_peak_rss
+
+TIMER = getattr(time, "perf_counter", time.time)
+# Checker methods that are timed
+TIMED_PREFIXES = ("visit_", "leave_")
+TIMED_METHODS = ("process_tokens", "process_module", "open", "close")
+
+
+def peak_rss_kb(children=False):
+    """Peak resident set size of the process, or its largest finished child, in kilobytes
+
+    None if not available.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # macOS reports bytes, linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class Profiler(object):
+    """Collect timings of linted files
+
+    Input
+    -----
+    top : int | 10
+        Number of files and checkers shown in the report.
+    hook : function | None
+        Called with the profile of each file, e.g. to send the numbers to metrics.
+        Input: profile (dict)
+    """
+    def __init__(self, top=10, hook=None):
+        self.top = top
+        self.hook = hook
+        self.profiles = []
+        self.current = None
+        self.started = None
+        self.rss_before = None
+        self.peak_reset = False
+        self.run_classes = {}
+
+    def start(self, fname):
+        """Start profiling a file"""
+        self.current = {"path": fname, "wall": None, "peak_rss_kb": None, "rss_kb": None,
+                        "rss_delta_kb": None, "checkers": {}, "hooks": {}}
+        self.peak_reset = reset_peak_rss()
+        self.rss_before = None if self.peak_reset else current_rss_kb()
+        self.started = TIMER()
+
+    def lint_done(self):
+        """Linting of the current file is done. Hooks may still follow"""
+        if self.current is not None:
+            self.current["wall"] = round(TIMER() - self.started, 6)
+            peak = peak_rss_since_reset_kb() if self.peak_reset else None
+            if peak is not None:
+                self.current["peak_rss_kb"] = peak
+                return
+            rss = current_rss_kb()
+            self.current["rss_kb"] = rss
+            if rss is not None and self.rss_before is not None:
+                self.current["rss_delta_kb"] = rss - self.rss_before
+
+    def stop(self):
+        """Stop profiling the current file and return its profile"""
+        profile = self.current
+        self.current = None
+        for section in ("checkers", "hooks"):
+            profile[section] = {name: round(spent, 6) for name, spent in profile[section].items()}
+        return profile
+
+    def add(self, profile):
+        """Keep profile of a file, possibly coming from a worker process"""
+        self.profiles.append(profile)
+        if self.hook:
+            self.hook(profile)
+
+    def record(self, section, name, spent):
+        """Add time spent in a checker or hook to the current file"""
+        if self.current is not None:
+            times = self.current[section]
+            times[name] = times.get(name, 0.0) + spent
+
+    def timed(self, section, name, func):
+        """Wrap func to record the time spent in it"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Timed call"""
+            start = TIMER()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(section, name, TIMER() - start)
+        wrapper.profiled = True
+        return wrapper
+
+    def instrument(self, checker):
+        """Time the methods of a pylint checker. Methods are wrapped only once"""
+        for member in dir(checker):
+            if not (member.startswith(TIMED_PREFIXES) or member in TIMED_METHODS):
+                continue
+            method = getattr(checker, member)
+            if not callable(method) or getattr(method, "profiled", False):
+                continue
+            setattr(checker, member, self.timed("checkers", checker.name, method))
+
+    def run_class(self, run_class):
+        """Subclass of pylint's Run whose linter times its checkers"""
+        if run_class not in self.run_classes:
+            linter_class = run_class.LinterClass
+            profiler = self
+
+            class ProfiledLinter(linter_class):  # pylint: disable=too-many-ancestors
+                """Linter that times its checkers"""
+                def prepare_checkers(self):
+                    """Return needed checkers with timed methods"""
+                    checkers = linter_class.prepare_checkers(self)
+                    for checker in checkers:
+                        profiler.instrument(checker)
+                    return checkers
+
+            self.run_classes[run_class] = type("ProfiledRun", (run_class,),
+                                               {"LinterClass": ProfiledLinter})
+        return self.run_classes[run_class]
+
+    def summary(self):
+        """Slowest files and total time of each checker and hook"""
+        totals = {"checkers": {}, "hooks": {}}
+        for profile in self.profiles:
+            for section, total in totals.items():
+                for name, spent in profile[section].items():
+                    total[name] = total.get(name, 0.0) + spent
+        slowest = sorted(self.profiles, key=lambda profile: profile["wall"] or 0.0, reverse=True)
+        return {
+            "files": slowest[:self.top],
+            "checkers": sorted(totals["checkers"].items(), key=lambda item: item[1], reverse=True),
+            "hooks": sorted(totals["hooks"].items(), key=lambda item: item[1], reverse=True),
+        }
+
+    def report(self):
+        """Log the slowest files, checkers and hooks"""
+        summary = self.summary()
+        logger = logging.getLogger(__name__)
+        logger.info('------------------------------------------------------------------')
+        logger.info("PROFILE: {} SLOWEST FILES".format(len(summary["files"])))
+        row = "{:>10}  {:>10}  {:>10}  {:>12}  {}"
+        logger.info(row.format("wall (s)", "peak (kB)", "rss (kB)", "growth (kB)", "file"))
+        for profile in summary["files"]:
+            memory = ["-" if profile[key] is None else profile[key]
+                      for key in ("peak_rss_kb", "rss_kb", "rss_delta_kb")]
+            wall = "{:.3f}".format(profile["wall"] or 0.0)
+            logger.info(row.format(wall, *(memory + [profile["path"]])))
+        for section in ("checkers", "hooks"):
+            if summary[section]:
+                logger.info('------------------------------------------------------------------')
+                logger.info("TIME SPENT IN {}".format(section.upper()))
+                for name, spent in summary[section][:self.top]:
+                    logger.info("{:>10.3f}  {}".format(spent, name))
+        logger.info('------------------------------------------------------------------')
+
+    def dump(self, path):
+        """Write all profiles and totals as json"""
+        summary = self.summary()
+        with open(path, "w") as handle:
+            json.dump({"files": self.profiles,
+                       "checkers": dict(summary["checkers"]),
+                       "hooks": dict(summary["hooks"])}, handle, indent=2, sort_keys=True)
@@ -0,0 +1,53 @@
+"""Pylint reporter used by the runner
+
+Messages and report layouts of the linted file are kept in memory as they are,
+and formatted to text only when the text is needed, e.g. for logging.
+"""
+from __future__ import absolute_import
+from pylint.reporters import BaseReporter
+from pylint.reporters.text import TextReporter
+from pylint.reporters.ureports.text_writer import TextWriter
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class CollectingReporter(BaseReporter):
+    """Keep the messages of one linted file without writing anything"""
+    name = "vainupylinter"
+    line_format = TextReporter.line_format
+
+    def __init__(self):
+        BaseReporter.__init__(self)
+        self.messages = []
+        self.layouts = []
+        self.template = self.line_format
+
+    def on_set_current_module(self, module, filepath):
+        """Use the message template of the configuration"""
+        template = getattr(self.linter.config, "msg_template", None) if self.linter else None
+        self.template = str(template or self.line_format)
+
+    def handle_message(self, msg):
+        """Keep the message"""
+        self.messages.append(msg)
+
+    def _display(self, layout):
+        """Keep the report layout"""
+        self.layouts.append(layout)
+
+    def lines(self):
+        """Messages and reports as text lines, formatted like the text reporter"""
+        modules = set()
+        for msg in self.messages:
+            if msg.module not in modules:
+                modules.add(msg.module)
+                yield ("************* Module {}".format(msg.module) if msg.module
+                       else "************* ")
+            yield msg.format(self.template)
+        for layout in self.layouts:
+            stream = StringIO()
+            TextWriter().format(layout, stream)
+            yield stream.getvalue()
@@ -0,0 +1,171 @@
+"""Compact results of linted files
+
+ResultStore keeps the verdict, score, message category counts and message
+histogram of each linted file in array columns, so that results of hundreds of
+thousands of files can be kept across runs and summarised without linting again.
+Message symbols are interned and the histograms of all files share three arrays.
+"""
+from __future__ import absolute_import
+import math
+from array import array
+
+CATEGORIES = ("convention", "refactor", "warning", "error", "fatal", "info")
+# Columns given to batch hooks, see columns. duplicate_lines is None unless duplicates are searched
+COLUMNS = ("path", "passed", "score", "statement", "by_msg") + CATEGORIES + ("duplicate_lines",)
+
+
+def columns(records):
+    """Result records of PylintRunner.lint_file as a dict of equally long lists, one per field
+    in COLUMNS"""
+    return {column: [record.get(column) for record in records] for column in COLUMNS}
+
+
+class FileResult(object):
+    """Result of one linted file, created when queried"""
+    __slots__ = ("path", "score", "passed", "counts", "by_msg")
+
+    def __init__(self, path, score, passed, counts, by_msg):
+        self.path = path
+        self.score = score
+        self.passed = passed
+        self.counts = counts
+        self.by_msg = by_msg
+
+    def __repr__(self):
+        return "FileResult({!r}, score={!r}, passed={!r})".format(self.path, self.score,
+                                                                 self.passed)
+
+
+class ResultStore(object):
+    """Append-only columns of file results
+
+    The same path may be added several times, e.g. on repeated runs. Queries use
+    the latest result of each path unless latest is False.
+    """
+    def __init__(self):
+        self.paths = []
+        self.latest = {}
+        self.scores = array("d")
+        self.passed = array("b")
+        self.counts = {category: array("l") for category in CATEGORIES}
+        self.symbols = []
+        self.symbol_ids = {}
+        self.msg_offsets = array("l", [0])
+        self.msg_ids = array("l")
+        self.msg_counts = array("l")
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        for row in range(len(self.paths)):
+            yield self.result(row)
+
+    def add(self, path, score, passed, stats):
+        """Add the result of a file
+
+        Input
+        -----
+        path : str
+        score : float | None
+            None if the file was not scored, e.g. it crashed.
+        passed : bool
+        stats : dict
+            Category counts and by_msg histogram, e.g. linter stats or a result record.
+        """
+        self.latest[path] = len(self.paths)
+        self.paths.append(path)
+        self.scores.append(float("nan") if score is None or score is False else float(score))
+        self.passed.append(1 if passed else 0)
+        for category, column in self.counts.items():
+            column.append(stats.get(category, 0) or 0)
+        for symbol, count in sorted((stats.get("by_msg") or {}).items()):
+            if symbol not in self.symbol_ids:
+                self.symbol_ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            self.msg_ids.append(self.symbol_ids[symbol])
+            self.msg_counts.append(count)
+        self.msg_offsets.append(len(self.msg_ids))
+
+    def add_record(self, record):
+        """Add a result record of PylintRunner.lint_file"""
+        self.add(record["path"], record["score"], record["passed"], record)
+
+    def score(self, row):
+        """Score of the row or None"""
+        score = self.scores[row]
+        return None if math.isnan(score) else score
+
+    def by_msg(self, row):
+        """Message histogram of the row"""
+        start, end = self.msg_offsets[row], self.msg_offsets[row + 1]
+        return {self.symbols[self.msg_ids[idx]]: self.msg_counts[idx] for idx in range(start, end)}
+
+    def result(self, row):
+        """FileResult of the row"""
+        return FileResult(self.paths[row], self.score(row), bool(self.passed[row]),
+                          {category: column[row] for category, column in self.counts.items()},
+                          self.by_msg(row))
+
+    def get(self, path):
+        """Latest FileResult of the path or None"""
+        row = self.latest.get(path)
+        return None if row is None else self.result(row)
+
+    def rows(self, latest=True):
+        """Row numbers, only the latest of each path by default"""
+        if latest:
+            return sorted(self.latest.values())
+        return range(len(self.paths))
+
+    def failed(self, latest=True):
+        """Paths of the files that did not pass"""
+        return [self.paths[row] for row in self.rows(latest) if not self.passed[row]]
+
+    def worst(self, count=10, latest=True):
+        """Paths and scores of the lowest scored files"""
+        scored = [(self.scores[row], self.paths[row]) for row in self.rows(latest)
+                  if not math.isnan(self.scores[row])]
+        return [(path, score) for score, path in sorted(scored)[:count]]
+
+    def with_message(self, symbol, latest=True):
+        """Paths of the files with the message and the number of occurrences"""
+        symbol_id = self.symbol_ids.get(symbol)
+        found = []
+        if symbol_id is None:
+            return found
+        for row in self.rows(latest):
+            for idx in range(self.msg_offsets[row], self.msg_offsets[row + 1]):
+                if self.msg_ids[idx] == symbol_id:
+                    found.append((self.paths[row], self.msg_counts[idx]))
+        return found
+
+    def message_totals(self, latest=True):
+        """Number of each message over all files"""
+        totals = [0] * len(self.symbols)
+        for row in self.rows(latest):
+            for idx in range(self.msg_offsets[row], self.msg_offsets[row + 1]):
+                totals[self.msg_ids[idx]] += self.msg_counts[idx]
+        return {symbol: total for symbol, total in zip(self.symbols, totals) if total}
+
+    def summary(self, latest=True):
+        """Aggregate numbers of the files
+
+        Output
+        ------
+        dict
+            files, passed, failed, mean_score, min_score and the total of each
+            message category in counts. Scores are None if no file was scored.
+        """
+        rows = self.rows(latest)
+        scores = [self.scores[row] for row in rows if not math.isnan(self.scores[row])]
+        passed = sum(self.passed[row] for row in rows)
+        return {
+            "files": len(rows),
+            "passed": passed,
+            "failed": len(rows) - passed,
+            "mean_score": sum(scores) / len(scores) if scores else None,
+            "min_score": min(scores) if scores else None,
+            "counts": {category: sum(column[row] for row in rows)
+                       for category, column in self.counts.items()},
+        }
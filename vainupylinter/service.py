@@ -0,0 +1,111 @@
+"""Lint requests of a long-lived process, e.g. a code review bot
+
+LintService runs each request on a bounded pool of worker processes. A worker
+keeps one warm linter across the requests it handles, so pylint is imported,
+the rcfile read and the standard library inferred once per worker instead of
+once per request. pylint is not thread safe, so requests run side by side only
+in separate processes. Log output of a request is collected in the worker and
+returned with its result.
+
+    service = LintService({"thresh": 8.0}, max_workers=4)
+    result = await service.lint_files_async(["src/models.py"])
+"""
+from __future__ import absolute_import
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from vainupylinter.custom_runner import PylintRunner, make_args
+    from vainupylinter.engine import WarmLinter
+    from vainupylinter.parallel import LogCollector
+except ImportError:
+    from custom_runner import PylintRunner, make_args
+    from engine import WarmLinter
+    from parallel import LogCollector
+
+_SERVICE = {}
+
+
+def _init_service_worker(verbosity):
+    """Collect the log of the worker and keep a place for its warm linter. Called once per
+    worker process"""
+    collector = LogCollector()
+    root = logging.getLogger()
+    # Handlers inherited from the main process are replaced, records are returned with the results
+    root.handlers = [collector]
+    root.setLevel(verbosity)
+    _SERVICE["collector"] = collector
+    _SERVICE["warm_linter"] = None
+    _SERVICE["started"] = None
+
+
+def _lint_in_service(runner_class, paths, args):
+    """Lint one request in the worker with its warm linter"""
+    collector = _SERVICE["collector"]
+    collector.records = []
+    runner = runner_class(args)
+    if _SERVICE["warm_linter"] is None:
+        _SERVICE["warm_linter"] = WarmLinter(runner.new_run)
+    runner.warm_linter = _SERVICE["warm_linter"]
+    # Linters for new options are built with the settings of this request
+    runner.warm_linter.new_run = runner.new_run
+    # Modules changed since the previous request are parsed again
+    runner.started = _SERVICE["started"]
+    result = runner.lint(paths)
+    _SERVICE["started"] = runner.started
+    result.log = list(collector.records)
+    return result
+
+
+class LintService(object):
+    """Lint requests concurrently in worker processes that keep warm linters
+
+    Input
+    -----
+    config : dict, argparse.Namespace | None
+        Default options of every request, see custom_runner.make_args.
+    max_workers : int | 1
+        Number of worker processes, i.e. requests linted at the same time.
+        Other requests wait for a free worker.
+    runner_class : type | PylintRunner
+        Runner class to instantiate for each request.
+    options
+        More default options, as keyword arguments.
+    """
+    def __init__(self, config=None, max_workers=1, runner_class=PylintRunner, **options):
+        self.args = make_args(config, **options)
+        self.runner_class = runner_class
+        self.executor = ProcessPoolExecutor(max_workers, initializer=_init_service_worker,
+                                            initargs=(self.args.verbosity,))
+
+    def request_args(self, config=None, **options):
+        """Arguments of a request: the defaults of the service updated with config and options"""
+        values = dict(vars(self.args))
+        values.update(vars(config) if isinstance(config, argparse.Namespace) else config or {})
+        return make_args(values, **options)
+
+    def submit(self, paths, config=None, **options):
+        """Start linting a request. Returns a concurrent.futures.Future of RunResult"""
+        return self.executor.submit(_lint_in_service, self.runner_class, list(paths),
+                                    self.request_args(config, **options))
+
+    def lint_files(self, paths, config=None, **options):
+        """Lint a request and wait for its RunResult"""
+        return self.submit(paths, config, **options).result()
+
+    def lint_files_async(self, paths, config=None, **options):
+        """Lint a request, returns an asyncio future of RunResult for the running event loop"""
+        import asyncio  # pylint: disable=import-outside-toplevel
+        return asyncio.wrap_future(self.submit(paths, config, **options))
+
+    def close(self, wait=True):
+        """Stop the workers once the submitted requests are done. Returns at once if wait is
+        False"""
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
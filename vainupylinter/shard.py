@@ -0,0 +1,133 @@
+"""Split the files of a run to shards and merge the results of the shards
+
+Shards are balanced by estimated lint cost. The cost has to be the same on every
+machine running a shard, so it is the size of the file, not its recorded lint
+duration that depends on the local cache. Files are assigned longest first to
+the least loaded shard, ties broken by path, so every shard computes the same
+partition of the same file list.
+
+Each shard writes an artifact with its result records and failed files. merge
+combines the artifacts of all shards into the results of the whole run, in the
+order an unsharded run would report them.
+"""
+from __future__ import absolute_import
+import argparse
+import hashlib
+import json
+import os.path as op
+
+ARTIFACT_VERSION = 1
+
+
+def parse_shard(spec):
+    """Parse "i/N" to (i, N). Shards are numbered from 1"""
+    try:
+        index, count = [int(part) for part in spec.split("/")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("shard must be i/N, e.g. 1/4, not {!r}".format(spec))
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("shard {!r} is not between 1/{} and {}/{}".format(
+            spec, count, count, count))
+    return index, count
+
+
+def file_cost(fname):
+    """Estimated lint cost of a file: its size in bytes"""
+    try:
+        return op.getsize(fname)
+    except OSError:
+        return 0
+
+
+def partition(fnames, count, cost=file_cost):
+    """Assign files to count shards with balanced total cost
+
+    Output
+    ------
+    list
+        Input positions of the files of each shard, in input order.
+    """
+    loads = [0] * count
+    shards = [[] for _ in range(count)]
+    costs = [cost(fname) for fname in fnames]
+    for position in sorted(range(len(fnames)), key=lambda idx: (-costs[idx], fnames[idx])):
+        shard = loads.index(min(loads))
+        loads[shard] += costs[position]
+        shards[shard].append(position)
+    return [sorted(positions) for positions in shards]
+
+
+def file_list_digest(fnames):
+    """Digest of the complete file list, shards of different file lists cannot be merged"""
+    return hashlib.sha256("\n".join(fnames).encode("utf-8")).hexdigest()
+
+
+class Shard(object):
+    """Files of one shard
+
+    Input
+    -----
+    fnames : list
+        Files of the whole run.
+    index, count : int
+        Shard number, from 1, and number of shards.
+    """
+    def __init__(self, fnames, index, count):
+        self.index = index
+        self.count = count
+        self.total = len(fnames)
+        self.digest = file_list_digest(fnames)
+        positions = partition(fnames, count)[index - 1]
+        self.fnames = [fnames[position] for position in positions]
+        self.positions = dict(zip(self.fnames, positions))
+
+    def write(self, path, records, failed_files, custom_failed):
+        """Write the artifact of the shard"""
+        artifact = {
+            "version": ARTIFACT_VERSION,
+            "shard": [self.index, self.count],
+            "files": self.total,
+            "digest": self.digest,
+            "records": [dict(record, position=self.positions.get(record["path"]))
+                        for record in records],
+            "failed_files": failed_files,
+            "custom_failed": custom_failed,
+        }
+        with open(path, "w") as handle:
+            json.dump(artifact, handle, sort_keys=True)
+
+
+def merge(paths):
+    """Combine the artifacts of all shards of a run
+
+    Output
+    ------
+    tuple(list, list, list)
+        Result records, failed files and files that failed custom checks, in input order.
+        Raises ValueError if the artifacts do not cover exactly all shards of one run.
+    """
+    artifacts = []
+    for path in paths:
+        with open(path) as handle:
+            artifacts.append(json.load(handle))
+    if not artifacts:
+        raise ValueError("No shard artifacts given")
+    first = artifacts[0]
+    for artifact in artifacts:
+        if artifact.get("version") != ARTIFACT_VERSION:
+            raise ValueError("Unsupported artifact version {}".format(artifact.get("version")))
+        if (artifact["digest"], artifact["shard"][1]) != (first["digest"], first["shard"][1]):
+            raise ValueError("Artifacts are from different runs or shard counts")
+    found = sorted(artifact["shard"][0] for artifact in artifacts)
+    if found != list(range(1, first["shard"][1] + 1)):
+        raise ValueError("Expected shards 1-{}, got {}".format(first["shard"][1], found))
+    records = sorted((record for artifact in artifacts for record in artifact["records"]),
+                     key=lambda record: record["position"])
+    positions = {record["path"]: record["position"] for record in records}
+
+    def ordered(key):
+        """Files of all artifacts under key in input order"""
+        fnames = [fname for artifact in artifacts for fname in artifact[key]]
+        return sorted(fnames, key=lambda fname: positions.get(fname, len(positions)))
+
+    return records, ordered("failed_files"), ordered("custom_failed")
@@ -0,0 +1,16 @@
+"""Example of batch custom rules"""
+
+
+def custom_rules_batch(stats, fnames):
+    """Fail the file with the most messages and let the others pass
+    INPUTS:
+        stats: (dict)
+            columns of the results, one value per file
+        fnames: (list)
+            paths to the checked files
+    OUTPUT:
+        list[tuple[accepted, override]]: bool
+    """
+    totals = [sum(counts.values()) for counts in stats["by_msg"]]
+    worst = totals.index(max(totals))
+    return [(idx != worst, True) for idx in range(len(fnames))]
@@ -11,6 +11,8 @@ def custom_rules(stats, fname=None):
             accepted : whether the file passed or not
             override : over standard check result
     """
+    # Hooks may print, e.g. while debugging them
+    print("CUSTOM RULES", fname)
     if "test_input_crash.py" in fname:
         return True, False
     if "test_input_fail.py" in fname:
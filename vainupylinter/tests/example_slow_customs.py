@@ -0,0 +1,20 @@
+"""Example of custom rules that hang or kill the process on some files, to test file timeouts"""
+import os
+import time
+
+
+def custom_rules(stats, fname):
+    """Hang on test_input_fail.py, exit the process on test_input_crash.py and pass other files
+    INPUTS:
+        stats: (dict)
+            stats of the linted file
+        fname: (str)
+            path to the checked file
+    OUTPUT:
+        tuple[accepted, override]: bool
+    """
+    if fname.endswith("test_input_fail.py"):
+        time.sleep(60)
+    if fname.endswith("test_input_crash.py"):
+        os._exit(1)  # pylint: disable=protected-access
+    return True, False
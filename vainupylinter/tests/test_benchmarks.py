@@ -0,0 +1,66 @@
+"""Test the benchmark corpus and result comparison"""
+
+from __future__ import absolute_import
+import os.path as op
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from benchmarks.__main__ import compare, scenarios, startup_scenarios
+from benchmarks.corpus import generate_corpus
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+def read(root, fnames):
+    contents = []
+    for fname in fnames:
+        with open(op.join(root, fname)) as handle:
+            contents.append(handle.read())
+    return contents
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_corpus_is_reproducible(self):
+        options = dict(n_files=5, n_lines=40, import_depth=2, seed=3)
+        first = generate_corpus(op.join(self.tmp, "a"), **options)
+        second = generate_corpus(op.join(self.tmp, "b"), **options)
+        self.assertEqual(len(first), 5)
+        contents = read(op.join(self.tmp, "a"), first)
+        self.assertEqual(contents, read(op.join(self.tmp, "b"), second))
+        self.assertNotIn("import", contents[0])
+        self.assertIn("from bench_pkg import mod_00000", contents[1])
+        for content in contents:
+            # Stops within one function of n_lines
+            self.assertTrue(40 <= len(content.splitlines()) < 47)
+        for content in contents:
+            compile(content, "corpus", "exec")
+
+    def test_scenarios(self):
+        names = [name for name, _ in scenarios(["run", "warm"], [1, 4], "yes")]
+        self.assertEqual(len(names), 4)
+        self.assertIn("engine=warm jobs=4 custom=yes", names)
+        names = [name for name, _, _, _ in startup_scenarios(["a.py"], "cache")]
+        self.assertEqual(names, ["startup files=0", "startup cached"])
+
+    def test_compare(self):
+        baseline = {"results": {"a": {"files_per_s": 10.0, "peak_rss_kb": 1000}}}
+        current = {"results": {"a": {"files_per_s": 8.0, "peak_rss_kb": 1050},
+                               "b": {"files_per_s": 1.0}}}
+        self.assertEqual(compare(baseline, current, 0.1), [("a", "files_per_s", 10.0, 8.0, -0.2)])
+        self.assertEqual(compare(baseline, current, 0.3), [])
+        baseline["results"]["a"]["pylint_imported"] = False
+        current["results"]["a"]["pylint_imported"] = True
+        self.assertIn(("a", "pylint_imported", False, True, None), compare(baseline, current, 0.3))
+
+
+if __name__ == '__main__':
+    unittest.main()
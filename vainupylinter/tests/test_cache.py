@@ -0,0 +1,173 @@
+"""Test the result cache"""
+
+from __future__ import absolute_import
+import os
+import os.path as op
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from cache import DurationHistory, FailureHistory, ResultCache
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.runner = PylintRunner(make_args(thresh=9.0, verbosity=30, cache_dir=self.cache_dir,
+                                             cache_size=100))
+
+    def test_cache_hit(self):
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py")]
+        with self.assertRaises(SystemExit) as sys_exit:
+            self.runner.run(fnames)
+        self.assertEqual(sys_exit.exception.code, 1)
+        self.runner.keep_results = True
+        with patch("custom_runner.Run") as mock_lint:
+            mock_lint.side_effect = ValueError("Should not lint")
+            with self.assertRaises(SystemExit) as cached_exit:
+                self.runner.run(fnames)
+        self.assertEqual(cached_exit.exception.code, 1)
+        self.assertEqual(self.runner.failed_files, fnames[:1])
+        self.assertIn("global_note", self.runner.results.linter.stats)
+
+    def test_custom_hooks_on_cache_hit(self):
+        fname = op.join(TEST_DIR, "inputs/test_input_pass.py")
+        seen = []
+
+        def custom_rules(stats, _):
+            # Not among the stats the runner itself needs
+            seen.append(stats["percent_duplicated_lines"])
+            return True, False
+
+        self.runner.custom_rules = custom_rules
+        self.runner.keep_results = True
+        self.assertEqual(self.runner.lint_files([fname]), 0)
+        self.runner.clean_up()
+        self.assertEqual(self.runner.lint_files([fname]), 0)
+        self.assertTrue(self.runner.records[0]["cached"])
+        self.assertEqual(seen, [0.0, 0.0])
+
+    def test_settings_change_key(self):
+        fname = op.join(TEST_DIR, "inputs/test_input_pass.py")
+        key = self.runner.cache_key(fname)
+        self.assertEqual(key, self.runner.cache_key(fname))
+        self.runner.thresh = 5.0
+        self.assertNotEqual(key, self.runner.cache_key(fname))
+
+    def test_dependency_invalidation(self):
+        src_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, src_dir)
+        os.mkdir(op.join(src_dir, "pkg"))
+        sources = {
+            "pkg/__init__.py": "",
+            "pkg/base.py": "VALUE = 1\n",
+            "pkg/middle.py": "from .base import VALUE\n",
+            "pkg/top.py": "from pkg import middle\n",
+            "pkg/other.py": "import os\n",
+        }
+        for name, source in sources.items():
+            with open(op.join(src_dir, name), "w") as handle:
+                handle.write(source)
+        fnames = [op.join(src_dir, "pkg", name)
+                  for name in ("base.py", "middle.py", "top.py", "other.py")]
+        self.runner.import_index.refresh(fnames)
+        keys = [self.runner.cache_key(fname) for fname in fnames]
+        self.assertEqual(self.runner.import_index.dependents(fnames[0]), set(fnames[1:3]))
+        with open(fnames[0], "w") as handle:
+            handle.write("VALUE = 2\n")
+        self.runner.import_index.refresh(fnames)
+        new_keys = [self.runner.cache_key(fname) for fname in fnames]
+        self.assertNotEqual(keys[0], new_keys[0])
+        self.assertNotEqual(keys[1], new_keys[1])
+        self.assertNotEqual(keys[2], new_keys[2])
+        self.assertEqual(keys[3], new_keys[3])
+
+    def test_missing_import_created(self):
+        """A file importing a missing module is linted again once the module exists"""
+        src_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, src_dir)
+        fname = op.join(src_dir, "uses_missing.py")
+        with open(fname, "w") as handle:
+            handle.write('"""Module"""\nimport created_later\n\nVALUE = created_later.VALUE\n')
+        self.assertEqual(self.runner.lint_files([fname]), 1)
+        with open(op.join(src_dir, "created_later.py"), "w") as handle:
+            handle.write('"""Module"""\nVALUE = 1\n')
+        self.assertEqual(self.runner.lint_files([fname]), 0)
+
+    def test_prune(self):
+        cache = ResultCache(self.cache_dir, max_entries=2)
+        now = time.time()
+        for idx, key in enumerate(["aa1", "bb2", "cc3"]):
+            self.assertTrue(cache.put(key, {"global_note": 10.0, "by_msg": {}}))
+            os.utime(cache.path(key), (now - 100 + idx, now - 100 + idx))
+        # Reading marks the entry as recently used
+        self.assertEqual(cache.get("aa1")["stats"]["global_note"], 10.0)
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNone(cache.get("bb2"))
+        self.assertIsNotNone(cache.get("aa1"))
+        self.assertIsNotNone(cache.get("cc3"))
+
+    def test_failed_first(self):
+        fail = op.join(TEST_DIR, "inputs/test_input_fail.py")
+        passing = op.join(TEST_DIR, "inputs/test_input_pass.py")
+        crash = op.join(TEST_DIR, "inputs/test_input_crash.py")
+        self.assertEqual(self.runner.lint_files([passing, crash, fail]), 1)
+        history = FailureHistory(op.join(self.cache_dir, "failures.json"))
+        self.assertEqual(sorted(history.files), sorted([crash, fail]))
+        history.add(fail, True)
+        self.assertEqual(history.order([passing, fail, crash]), [crash, fail, passing])
+        self.assertTrue(history.save())
+        self.runner.history = FailureHistory(op.join(self.cache_dir, "failures.json"))
+        # First failure stops the run
+        self.runner.keep_results = True
+        self.runner.failed_first = True
+        self.runner.fail_fast = True
+        self.assertEqual(self.runner.lint_files([passing, fail, crash]), 1)
+        self.assertEqual(self.runner.store.failed(), [crash])
+        self.assertEqual(len(self.runner.store), 1)
+        # Without a cache there is no failure history, the files are linted in order
+        args = make_args(self.runner.args, no_cache=True, failed_first=True)
+        with self.assertLogs("vainupylinter", "WARNING"):
+            self.assertFalse(PylintRunner(args).failed_first)
+
+    def test_durations(self):
+        fail = op.join(TEST_DIR, "inputs/test_input_fail.py")
+        passing = op.join(TEST_DIR, "inputs/test_input_pass.py")
+        self.assertEqual(self.runner.lint_files([fail]), 1)
+        durations = DurationHistory(op.join(self.cache_dir, "durations.json"))
+        self.assertIn(fail, durations.files)
+        durations.files[fail] = [2.0, op.getsize(fail)]
+        durations.rate = None
+        self.assertEqual(durations.estimate(fail), 2.0)
+        # Unseen files are estimated by their size
+        self.assertAlmostEqual(durations.estimate(passing),
+                               2.0 * op.getsize(passing) / op.getsize(fail))
+        durations.add(fail, 1.0)
+        self.assertEqual(durations.estimate(fail), 1.5)
+        self.assertEqual(durations.estimate("not_existing.py"), 0.0)
+        # Cache hits do not count as durations
+        self.assertTrue(durations.save())
+        self.assertEqual(self.runner.lint_files([fail]), 1)
+        saved = DurationHistory(op.join(self.cache_dir, "durations.json"))
+        self.assertEqual(saved.files[fail][0], 1.5)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        self.runner = None
+
+
+if __name__ == "__main__":
+    unittest.main()
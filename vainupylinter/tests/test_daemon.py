@@ -0,0 +1,86 @@
+"""Test the lint daemon and its client"""
+
+from __future__ import absolute_import
+import os
+import os.path as op
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from daemon import LintServer, request, request_settings
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+@unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "unix sockets not available")
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.args = make_args(thresh=9.0, verbosity=30, cache_dir="")
+        self.socket_path = op.join(self.tmp_dir, "daemon.sock")
+        self.server = LintServer(PylintRunner, self.args, self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        for _ in range(100):
+            if request(self.socket_path, None) is not None:
+                break
+            time.sleep(0.05)
+
+    def test_lint_request(self):
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py")]
+        response = request(self.socket_path, fnames, request_settings(self.args))
+        self.assertEqual(response["exit_code"], 1)
+        self.assertEqual([result["passed"] for result in response["results"]], [False, True])
+        self.assertEqual(response["results"][0]["reasons"], ["error"])
+        self.assertTrue(response["log"])
+        # Settings of the request are used
+        self.args.allow_errors = True
+        self.args.thresh = -5
+        response = request(self.socket_path, fnames, request_settings(self.args))
+        self.assertEqual(response["exit_code"], 0)
+
+    def test_staged_request(self):
+        """Options besides the thresholds are used too, here only the staged file is linted"""
+        repo = op.join(self.tmp_dir, "repo")
+        os.mkdir(repo)
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(repo)
+        with open("bad.py", "w") as handle:
+            handle.write("def broken(:\n    pass\n")
+        with open("unstaged.py", "w") as handle:
+            handle.write('"""Module"""\n')
+        subprocess.check_output(["git", "init", "-q"])
+        subprocess.check_output(["git", "add", "bad.py"])
+        self.args.staged = True
+        response = request(self.socket_path, [], request_settings(self.args))
+        self.assertEqual(response["exit_code"], 1)
+        self.assertEqual([op.basename(result["path"]) for result in response["results"]],
+                         ["bad.py"])
+        self.assertEqual(response["results"][0]["reasons"], ["syntax-error"])
+
+    def test_different_rcfile(self):
+        self.args.rcfile = op.join(TEST_DIR, "..", ".pylintrc")
+        response = request(self.socket_path, [], request_settings(self.args))
+        self.assertIn("error", response)
+
+    def test_no_daemon(self):
+        self.assertIsNone(request(op.join(self.tmp_dir, "missing.sock"), []))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join(5)
+        shutil.rmtree(self.tmp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
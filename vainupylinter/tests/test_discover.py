@@ -0,0 +1,99 @@
+"""Test finding the files to lint"""
+
+from __future__ import absolute_import
+import os
+import os.path as op
+import shutil
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from discover import FileFinder, GitIgnore, is_python_file
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+FILES = (
+    "a.py",
+    "b.py.bak",
+    "b.pyc",
+    "pkg/__init__.py",
+    "pkg/mod.py",
+    "pkg/gen.gen.py",
+    "pkg/keep.gen.py",
+    "pkg/migrations/0001.py",
+    "pkg/skip_me.py",
+    "build/out.py",
+    "node_modules/lib/x.py",
+    "sub/deep/local.py",
+    "sub/deep/ignored_here.py",
+    ".git/hooks/hook.py",
+)
+
+
+class DiscoverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        for fname in FILES:
+            path = op.join(self.tmp, fname)
+            if not op.isdir(op.dirname(path)):
+                os.makedirs(op.dirname(path))
+            with open(path, "w") as handle:
+                handle.write("VALUE = 1\n")
+        self.write(".gitignore", "build/\nnode_modules\n*.gen.py\n!keep.gen.py\n")
+        self.write("sub/deep/.gitignore", "ignored_here.py\n")
+        self.rcfile = self.write(".pylintrc",
+                                 "[MASTER]\nignore=CVS,migrations\nignore-patterns=^skip_\n")
+
+    def write(self, fname, content):
+        path = op.join(self.tmp, fname)
+        with open(path, "w") as handle:
+            handle.write(content)
+        return path
+
+    def relative(self, fnames):
+        return [op.relpath(fname, self.tmp) for fname in fnames]
+
+    def test_is_python_file(self):
+        self.assertTrue(is_python_file("a/b.py"))
+        self.assertFalse(is_python_file("b.py.bak"))
+        self.assertFalse(is_python_file("b.pyc"))
+
+    def test_walk(self):
+        found = self.relative(FileFinder(self.rcfile).expand([self.tmp]))
+        self.assertEqual(found, ["a.py", "pkg/__init__.py", "pkg/keep.gen.py", "pkg/mod.py",
+                                 "sub/deep/local.py"])
+
+    def test_parent_gitignore(self):
+        found = self.relative(FileFinder(self.rcfile).expand([op.join(self.tmp, "pkg")]))
+        self.assertNotIn("pkg/gen.gen.py", found)
+        finder = FileFinder(self.rcfile, gitignore=False)
+        found = self.relative(finder.expand([op.join(self.tmp, "pkg")]))
+        self.assertIn("pkg/gen.gen.py", found)
+        self.assertNotIn("pkg/skip_me.py", found)
+
+    def test_explicit_and_globs(self):
+        finder = FileFinder(self.rcfile)
+        explicit = op.join(self.tmp, "b.py.bak")
+        found = list(finder.expand([explicit, op.join(self.tmp, "pkg", "*.py"),
+                                    op.join(self.tmp, "a.py"), op.join(self.tmp, "a.py")]))
+        self.assertEqual(self.relative(found), ["b.py.bak", "pkg/__init__.py", "pkg/gen.gen.py",
+                                                "pkg/keep.gen.py", "pkg/mod.py", "a.py"])
+
+    def test_gitignore_rules(self):
+        rules = GitIgnore("/repo",
+                          ["/top.py", "docs/**/*.py", "cache/", "# comment", "", "[ab].py"])
+        self.assertTrue(rules.match("/repo/top.py", False))
+        self.assertIsNone(rules.match("/repo/pkg/top.py", False))
+        self.assertTrue(rules.match("/repo/docs/a/b/c.py", False))
+        self.assertTrue(rules.match("/repo/docs/c.py", False))
+        self.assertTrue(rules.match("/repo/x/cache", True))
+        self.assertIsNone(rules.match("/repo/x/cache", False))
+        self.assertTrue(rules.match("/repo/x/b.py", False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Test duplicate code detection across files"""
+
+from __future__ import absolute_import
+import os.path as op
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from duplicates import DuplicateIndex, duplicate_stats, find_duplicates, normalized_lines
+from gitdiff import LineIndex
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+BLOCK = ('    result = 0\n'
+         '    for value in values:\n'
+         '        if value > 0:\n'
+         '            result += value * value\n'
+         '    return result\n')
+FIRST = '"""Module"""\nimport os\n\n\ndef total(values):\n    """Total"""\n' + BLOCK
+SECOND = ('"""Other module"""\n\n\ndef other(values):\n    """Other"""\n    # Copied\n'
+          + BLOCK.replace("+=", "+=  "))
+
+
+class DuplicatesTestCase(unittest.TestCase):
+    def test_normalized_lines(self):
+        source = ('"""Docstring"""\nimport os\nfrom sys import path\n\n# Comment\n'
+                  'VALUE = [  1,\n    2,\n]  # Trailing\n')
+        self.assertEqual(normalized_lines(source), [(6, "VALUE = [ 1 ,"), (7, "2 ,")])
+        # Source that does not tokenize is compared line by line
+        self.assertEqual(normalized_lines(b"def broken(:\n    # Comment\n  pass   it\n"),
+                         [(1, "def broken(:"), (3, "pass it")])
+
+    def test_index(self):
+        index = DuplicateIndex(min_lines=4)
+        index.add("first.py", FIRST)
+        index.add("second.py", SECOND)
+        index.add("third.py", "VALUE = 1\n")
+        found = index.find()
+        self.assertEqual(sorted(found), ["first.py", "second.py"])
+        self.assertEqual(found["first.py"]["lines"], [7, 8, 9, 10, 11])
+        self.assertEqual(found["second.py"]["blocks"],
+                         [{"start": 7, "end": 11, "other": "first.py", "other_start": 7,
+                           "other_end": 11}])
+        # Blocks shorter than min_lines are not reported
+        index = DuplicateIndex(min_lines=6)
+        index.add("first.py", FIRST)
+        index.add("second.py", SECOND)
+        self.assertEqual(index.find(), {})
+
+    def test_duplicates_within_file_are_ignored(self):
+        source = "def first(values):\n" + BLOCK + "\n\ndef second(values):\n" + BLOCK
+        self.assertEqual(find_duplicates(["same.py"], lambda fname: source), {})
+
+    def test_duplicate_stats(self):
+        found = {"lines": [7, 8, 9, 10, 11],
+                 "blocks": [{"start": 7, "end": 11, "other": "a.py", "other_start": 1,
+                             "other_end": 5}]}
+        self.assertEqual(duplicate_stats(found)["duplicate_lines"], 5)
+        self.assertEqual(duplicate_stats(found, LineIndex([(10, 20)]))["duplicate_lines"], 2)
+        self.assertEqual(duplicate_stats(found, LineIndex([(1, 3)])),
+                         {"duplicate_lines": 0, "duplicates": []})
+        self.assertEqual(duplicate_stats(None), {"duplicate_lines": 0, "duplicates": []})
+
+
+class RunnerDuplicatesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, content):
+        path = op.join(self.tmp, name)
+        with open(path, "w") as handle:
+            handle.write(content)
+        return path
+
+    def test_runner(self):
+        first = self.write("first.py", FIRST.replace("import os\n", ""))
+        second = self.write("second.py", SECOND)
+        seen = []
+
+        def custom_rules(stats, fname):
+            seen.append((op.basename(fname), stats["duplicate_lines"]))
+            return True, False
+
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="",
+                         max_duplicate_lines=4)
+        runner = PylintRunner(args)
+        runner.custom_rules = custom_rules
+        self.assertEqual(runner.lint_files([first, second]), 1)
+        self.assertEqual(seen, [("first.py", 5), ("second.py", 5)])
+        self.assertEqual([record["reasons"] for record in runner.records],
+                         [["duplicate-code"], ["duplicate-code"]])
+        self.assertEqual(runner.records[1]["duplicates"][0]["other"], first)
+        # Without a limit the stats are only reported
+        args.max_duplicate_lines = -1
+        args.duplicates = True
+        runner = PylintRunner(args)
+        self.assertEqual(runner.lint_files([first, second]), 0)
+        self.assertEqual([record["duplicate_lines"] for record in runner.records], [5, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,40 +1,41 @@
 """Test basic funtionality of custom_runner"""
 
 from __future__ import absolute_import
+import json
+import shutil
+import subprocess
 import sys
+import tempfile
 import unittest
 
 try:
     from unittest.mock import patch
 except ImportError:
     from mock import patch
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 import os.path as op
 
-from argparse import Namespace
-
 TEST_DIR = op.dirname(op.abspath(__file__))
 sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
 # pylint:disable=wrong-import-position, import-error
 from custom_runner import (
     PylintRunner,
+    make_args,
     parse_args,
 )
+from engine import WarmLinter
+from memory import MemoryPolicy
+from parallel import lint_parallel
+from profiling import Profiler
 
 # pylint:enable=wrong-import-position, import-error
 # pylint: disable=missing-docstring
 class VainuTestCase(unittest.TestCase):
     def setUp(self):
-        args = Namespace(
-            rcfile=None,
-            thresh=9.0,
-            allow_errors=False,
-            ignore_tests=False,
-            keep_results=False,
-            reduce_logging=False,
-            verbosity=30,
-            custom_path="",
-        )
-        self.runner = PylintRunner(args)
+        self.runner = PylintRunner(make_args(thresh=9.0, verbosity=30, cache_dir=""))
 
     def test_wrong_fileinputs(self):
         self.assertFalse(self.runner.run_pylint("test.txt"))
@@ -109,6 +110,167 @@ class VainuTestCase(unittest.TestCase):
         self.runner.results.linter.stats = {"global_note": False, "by_msg": {"syntax-error": 1}}
         self.assertFalse(self.runner.check_no_silent_crash())
 
+    def test_parallel_run(self):
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py")]
+        self.runner.keep_results = True
+        with self.assertRaises(SystemExit) as sys_exit:
+            self.runner.run(fnames)
+        serial_failed = list(self.runner.failed_files)
+        self.runner.clean_up()
+        self.runner.jobs = 2
+        with self.assertRaises(SystemExit) as parallel_exit:
+            self.runner.run(fnames)
+        self.assertEqual(parallel_exit.exception.code, sys_exit.exception.code)
+        self.assertEqual(self.runner.failed_files, serial_failed)
+        # Scheduled longest first, reported in input order
+        self.runner.clean_up()
+        records = list(lint_parallel(PylintRunner, self.runner.args, fnames, 2,
+                                     cost=lambda fname: -len(fname)))
+        self.assertEqual([record["path"] for record, _, _ in records], fnames)
+
+    def test_fail_fast(self):
+        fnames = [op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py")]
+        self.runner.keep_results = True
+        self.runner.fail_fast = True
+        self.assertEqual(self.runner.lint_files(fnames), 1)
+        self.assertEqual([record["passed"] for record in self.runner.records], [True, False])
+        self.runner.clean_up()
+        self.runner.jobs = 2
+        self.assertEqual(self.runner.lint_files(fnames), 1)
+        self.assertFalse(self.runner.records[-1]["passed"])
+        self.assertEqual(len(self.runner.failed_files), 1)
+
+    def test_file_timeout(self):
+        """See ../example_slow_customs.py, one file hangs and one kills its worker"""
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="",
+                         custom_path="tests.example_slow_customs", file_timeout=3)
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py")]
+        for jobs in (1, 2):
+            args.jobs = jobs
+            runner = PylintRunner(args)
+            self.assertEqual(runner.lint_files(fnames), 1)
+            self.assertEqual([record["reasons"] for record in runner.records],
+                             [["timed-out"], ["crashed"], ["passed"]])
+            self.assertEqual(runner.failed_files, fnames[:2])
+            self.assertEqual(runner.records[0]["duration"], 3)
+
+    def test_warm_engine(self):
+        """Warm linter must give the same stats as a new run for each file"""
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py")]
+        keys = ("global_note", "by_msg", "error", "fatal", "warning", "statement")
+        expected = []
+        for fname in fnames:
+            self.assertTrue(self.runner.run_pylint(fname))
+            expected.append({key: self.runner.results.linter.stats.get(key) for key in keys})
+        self.runner.warm_linter = WarmLinter(self.runner.new_run)
+        for fname, stats in zip(fnames, expected):
+            self.assertTrue(self.runner.run_pylint(fname))
+            stats_now = self.runner.results.linter.stats
+            self.assertEqual({key: stats_now.get(key) for key in keys}, stats)
+        self.assertIs(self.runner.results.linter, self.runner.warm_linter.results.linter)
+
+    def test_bounded_memory(self):
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py")]
+        self.runner.warm_linter = WarmLinter(self.runner.new_run)
+        self.runner.memory = MemoryPolicy(max_files=2)
+        with patch("memory.evict_caches") as evict:
+            records = [self.runner.lint_file(fname) for fname in fnames]
+        # Nothing but the record is kept from a finished file
+        self.assertIsNone(self.runner.results)
+        self.assertEqual(evict.call_count, 1)
+        self.assertIsNotNone(self.runner.warm_linter.results)
+        self.assertEqual([record["passed"] for record in records], [False, True, False])
+        # Workers are restarted after every file
+        self.runner.clean_up()
+        self.runner.keep_results = True
+        self.runner.args.max_files_per_worker = 1
+        self.runner.jobs = 2
+        with self.assertRaises(SystemExit) as sys_exit:
+            self.runner.run(fnames)
+        self.assertEqual(sys_exit.exception.code, 1)
+        self.assertEqual(self.runner.failed_files, [fnames[0], fnames[2]])
+
+    def test_memory_backoff(self):
+        policy = MemoryPolicy(max_rss_mb=1)
+        # The resident set size stays over the limit after every eviction
+        over = patch("memory.current_rss_kb", return_value=4096)
+        with over, patch("memory.evict_caches") as evict:
+            evicted = [files for files in range(1, 101) if policy.file_done()]
+        self.assertEqual(evicted, [1, 3, 7, 15, 31, 63])
+        self.assertEqual(evict.call_count, 6)
+        # An eviction that gets under the limit resets the wait
+        policy = MemoryPolicy(max_rss_mb=1)
+        under = patch("memory.current_rss_kb", side_effect=[4096, 512, 4096, 4096])
+        with under, patch("memory.evict_caches"):
+            self.assertTrue(policy.file_done())
+            self.assertTrue(policy.file_done())
+        self.assertEqual(policy.backoff, 2)
+        # Parallel workers over the limit exit after every file and are replaced
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py")]
+        self.runner.keep_results = True
+        self.runner.args.max_rss = 1
+        self.runner.memory = MemoryPolicy(max_rss_mb=1)
+        self.runner.jobs = 2
+        with self.assertRaises(SystemExit) as sys_exit:
+            self.runner.run(fnames)
+        self.assertEqual(sys_exit.exception.code, 1)
+        self.assertEqual(self.runner.failed_files, [fnames[0], fnames[2]])
+
+    def test_collecting_reporter(self):
+        stdout = sys.stdout
+        self.assertTrue(self.runner.run_pylint(op.join(TEST_DIR, "inputs/test_input_fail.py")))
+        self.assertIs(sys.stdout, stdout)
+        reporter = self.runner.results.linter.reporter
+        symbols = set(msg.symbol for msg in reporter.messages)
+        self.assertIn("undefined-variable", symbols)
+        lines = list(reporter.lines())
+        self.assertTrue(lines[0].startswith("************* Module"))
+        self.assertEqual(len(lines), len(reporter.messages) + 1)
+
+    def test_jsonl_output(self):
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py")]
+        self.runner.output_format = "jsonl"
+        stream = StringIO()
+        with patch("sys.stdout", stream):
+            with self.assertRaises(SystemExit):
+                self.runner.run(fnames)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([record["path"] for record in records], fnames)
+        self.assertEqual([record["passed"] for record in records], [False, True, False])
+        self.assertEqual(records[0]["reasons"], ["error"])
+        self.assertEqual(records[2]["reasons"], ["syntax-error"])
+        self.assertGreater(records[0]["error"], 0)
+        self.assertGreater(records[1]["score"], 9.0)
+
+    def test_jsonl_with_printing_hooks(self):
+        """Prints of custom hooks do not go to the json lines records on stdout"""
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py")]
+        command = [sys.executable, "custom_runner.py", "--no-cache", "-j", "2",
+                   "-cp", "tests.example_customs", "-f", "jsonl"] + fnames
+        process = subprocess.Popen(command, cwd=op.dirname(TEST_DIR),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        records = [json.loads(line) for line in stdout.decode("utf-8").splitlines()]
+        self.assertEqual([record["path"] for record in records], fnames)
+        self.assertIn("CUSTOM RULES", stderr.decode("utf-8"))
+
     def test_parse_args(self):
         """Confirm that inputs are expected type"""
         parsed = parse_args(["-e", "-i", "-t", "9.0", "test1.py", "test2.py", "test3.py"])
@@ -116,19 +278,12 @@ class VainuTestCase(unittest.TestCase):
         self.assertTrue(parsed.ignore_tests)
         self.assertTrue(parsed.allow_errors)
         self.assertEqual(parsed.thresh, 9.0)
+        self.assertEqual(parsed.jobs, 1)
+        self.assertEqual(parse_args(["-j", "0"]).jobs, 0)
 
     def testCustomRulesSetup(self):
         """Test that setup works correctly"""
-        args = Namespace(
-            rcfile=None,
-            thresh=9.0,
-            allow_errors=False,
-            ignore_tests=False,
-            keep_results=False,
-            reduce_logging=False,
-            verbosity=30,
-            custom_path="not_existing",
-        )
+        args = make_args(thresh=9.0, verbosity=30, cache_dir="", custom_path="not_existing")
         with self.assertRaises(Exception):
             PylintRunner(args)
         module_with_slashes = "tests/__init__.py"
@@ -145,16 +300,8 @@ class VainuTestCase(unittest.TestCase):
 
     def test_custom_rules(self):
         """See ../example_customs.py for defined functions"""
-        args = Namespace(
-            rcfile=None,
-            thresh=9.0,
-            allow_errors=False,
-            ignore_tests=False,
-            keep_results=False,
-            reduce_logging=False,
-            verbosity=30,
-            custom_path="tests.example_customs",
-        )
+        args = make_args(thresh=9.0, verbosity=30, cache_dir="",
+                         custom_path="tests.example_customs")
         self.runner = PylintRunner(args)
         # Functions correctly set
         self.assertTrue(callable(self.runner.custom_rules))
@@ -172,6 +319,71 @@ class VainuTestCase(unittest.TestCase):
             self.runner.run([op.join(TEST_DIR, "inputs/test_input_pass.py")])
         self.assertEqual(sys_exit.exception.code, 1)
 
+    def test_custom_rules_batch(self):
+        """See ../example_batch_customs.py, the file with most messages fails"""
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="",
+                         custom_path="tests.example_batch_customs")
+        self.runner = PylintRunner(args)
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "inputs/test_input_crash.py")]
+        self.assertEqual(self.runner.lint_files(fnames), 1)
+        self.assertEqual([record["passed"] for record in self.runner.records], [False, True, True])
+        self.assertIn("custom-rules-batch", self.runner.records[0]["reasons"])
+        self.assertIn("custom-override", self.runner.records[2]["reasons"])
+        self.assertEqual(self.runner.custom_failed, [fnames[0]])
+        self.assertEqual(self.runner.failed_files, [fnames[0]])
+        self.assertEqual(self.runner.store.failed(), [fnames[0]])
+
+    def test_lazy_imports(self):
+        """Nothing to lint imports neither pylint.lint nor the custom module"""
+        script = ("import sys; sys.path.insert(0, '.'); "
+                  "from custom_runner import PylintRunner, parse_args; "
+                  "args = parse_args(['--no-cache', '-cp', 'tests.example_customs']); "
+                  "code = PylintRunner(args).lint_files([]); "
+                  "print(code, 'pylint.lint' in sys.modules, "
+                  "'tests.example_customs' in sys.modules)")
+        output = subprocess.check_output([sys.executable, "-c", script], cwd=op.dirname(TEST_DIR))
+        self.assertEqual(output.decode("utf-8").split(), ["0", "False", "False"])
+
+    def test_profile(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="",
+                         custom_path="tests.example_customs", profile=True,
+                         profile_output=op.join(profile_dir, "profile.json"))
+        self.runner = PylintRunner(args)
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py")]
+        with self.assertRaises(SystemExit):
+            self.runner.run(fnames)
+        profiles = self.runner.profiler.profiles
+        self.assertEqual([profile["path"] for profile in profiles], fnames)
+        self.assertIn("basic", profiles[0]["checkers"])
+        self.assertIn("custom_rules", profiles[0]["hooks"])
+        self.assertGreater(profiles[0]["wall"], 0)
+        with open(args.profile_output) as handle:
+            dumped = json.load(handle)
+        self.assertEqual(len(dumped["files"]), 2)
+        self.assertIn("basic", dumped["checkers"])
+        # Peak memory of each file, the peak of the process is reset before it
+        profiler = Profiler()
+        with patch("profiling.reset_peak_rss", return_value=True) as reset, \
+                patch("profiling.peak_rss_since_reset_kb", return_value=2000):
+            profiler.start("mod.py")
+            profiler.lint_done()
+        reset.assert_called_once_with()
+        current = profiler.current
+        self.assertEqual((current["peak_rss_kb"], current["rss_kb"]), (2000, None))
+        # Without a resettable peak, memory is measured before and after each file
+        with patch("profiling.reset_peak_rss", return_value=False), \
+                patch("profiling.current_rss_kb", side_effect=[1000, 1500]):
+            profiler.start("mod.py")
+            profiler.lint_done()
+        current = profiler.current
+        self.assertEqual((current["peak_rss_kb"], current["rss_kb"], current["rss_delta_kb"]),
+                         (None, 1500, 500))
+
     def tearDown(self):
         self.runner = None
 
@@ -0,0 +1,186 @@
+"""Test git aware linting"""
+
+from __future__ import absolute_import
+import os
+import os.path as op
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from gitdiff import BlobReader, LineIndex, parse_diff, staged_blobs
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+DIFF = """diff --git a/pkg/mod.py b/pkg/mod.py
+--- a/pkg/mod.py
++++ b/pkg/mod.py
+@@ -3,0 +4,2 @@ def func():
++    value = 1
++    return value
+@@ -10 +12 @@ def other():
+-    pass
++    return None
+@@ -20,2 +21,0 @@ def removed():
+-    a = 1
+-    b = 2
+diff --git a/new.py b/new.py
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1,3 @@
++import os
++import sys
++print(os, sys)
+"""
+
+SOURCE = '''"""Module"""
+
+
+def func(val):
+    """Function"""
+    return val
+'''
+
+
+class GitDiffTestCase(unittest.TestCase):
+    def test_line_index(self):
+        lines = LineIndex([(10, 12), (1, 3), (4, 5), (20, 20)])
+        self.assertEqual(lines.ranges(), [(1, 5), (10, 12), (20, 20)])
+        self.assertIn(1, lines)
+        self.assertIn(5, lines)
+        self.assertNotIn(6, lines)
+        self.assertIn(20, lines)
+        self.assertNotIn(21, lines)
+        self.assertNotIn(0, LineIndex())
+
+    def test_parse_diff(self):
+        changed = parse_diff(DIFF, "/repo")
+        self.assertEqual(changed["/repo/pkg/mod.py"].ranges(), [(4, 5), (12, 12)])
+        self.assertEqual(changed["/repo/new.py"].ranges(), [(1, 3)])
+
+    def test_changed_lines(self):
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(repo)
+
+        def git(*args):
+            subprocess.check_output(["git", "-c", "user.name=test", "-c", "user.email=test@test"]
+                                    + list(args))
+
+        git("init", "-q")
+        with open("mod.py", "w") as handle:
+            handle.write(SOURCE + "\n\ndef old(a, b):\n    return a\n")
+        with open("untouched.py", "w") as handle:
+            handle.write(SOURCE)
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+        with open("mod.py", "a") as handle:
+            handle.write("\n\ndef new():\n    \"\"\"New\"\"\"\n    return undefined_name\n")
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="", since="HEAD")
+        runner = PylintRunner(args)
+        self.assertEqual(runner.select_files([]), ["mod.py"])
+        self.assertEqual(runner.lint_files([]), 1)
+        by_msg = runner.results.linter.stats["by_msg"]
+        self.assertIn("missing-function-docstring", by_msg)
+        runner.clean_up()
+        runner.only_changed_lines = True
+        self.assertEqual(runner.lint_files(["mod.py", "untouched.py"]), 1)
+        by_msg = runner.results.linter.stats["by_msg"]
+        self.assertEqual(by_msg, {"undefined-variable": 1})
+        runner.staged = True
+        runner.since = None
+        git("add", "mod.py")
+        self.assertEqual(runner.select_files([]), ["mod.py"])
+        # Paths that expand to no files select none, not every changed file
+        os.mkdir("empty")
+        self.assertEqual(runner.select_files(["empty"]), [])
+
+    def test_git_errors(self):
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(repo)
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="", staged=True)
+        # Not a repository
+        with self.assertLogs("vainupylinter", "ERROR") as logs:
+            self.assertEqual(PylintRunner(args).lint_files([]), 1)
+        self.assertEqual(len(logs.output), 1)
+        subprocess.check_output(["git", "init", "-q"])
+        args.staged = False
+        args.since = "nonexistent-ref"
+        with self.assertLogs("vainupylinter", "ERROR"):
+            self.assertEqual(PylintRunner(args).lint_files([]), 1)
+
+    def test_staged_content(self):
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(repo)
+        subprocess.check_output(["git", "init", "-q"])
+        broken = SOURCE + "\n\ndef new():\n    \"\"\"New\"\"\"\n    return undefined_name\n"
+        with open("mod.py", "w") as handle:
+            handle.write(broken)
+        subprocess.check_output(["git", "add", "mod.py"])
+        # Working tree is fixed but the broken version is staged
+        with open("mod.py", "w") as handle:
+            handle.write(SOURCE)
+        blobs = staged_blobs()
+        self.assertEqual(list(blobs), [op.join(op.realpath(repo), "mod.py")])
+        reader = BlobReader()
+        self.assertEqual(reader.read(list(blobs.values())[0]).decode("utf-8"), broken)
+        self.assertIsNone(reader.read("0" * 40))
+        reader.close()
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="", staged=False)
+        runner = PylintRunner(args)
+        self.assertEqual(runner.lint_files(["mod.py"]), 0)
+        runner.clean_up()
+        runner.staged_content = runner.staged = True
+        self.assertEqual(runner.lint_files([]), 1)
+        self.assertEqual(runner.failed_files, ["mod.py"])
+
+    def test_staged_content_cache(self):
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(repo)
+        subprocess.check_output(["git", "init", "-q"])
+        with open("helper.py", "w") as handle:
+            handle.write(SOURCE)
+        with open("mod.py", "w") as handle:
+            handle.write('"""Module"""\nfrom helper import func\n\nVALUE = func(1)\n')
+        subprocess.check_output(["git", "add", "helper.py", "mod.py"])
+        # Both files are staged but gone from the working tree
+        os.remove("helper.py")
+        os.remove("mod.py")
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, staged_content=True,
+                         cache_dir=op.join(repo, ".cache"))
+        runner = PylintRunner(args)
+        self.assertEqual(runner.lint_files([]), 0)
+        self.assertEqual([record["reasons"] for record in runner.records], [["passed"], ["passed"]])
+        blobs = staged_blobs()
+        entry = runner.import_index.entry("mod.py")
+        self.assertEqual(entry["digest"], "blob:" + blobs[op.join(op.realpath(repo), "mod.py")])
+        self.assertEqual(entry["imports"], [op.join(op.realpath(repo), "helper.py")])
+        # A staged change of the imported module invalidates the result
+        key = runner.cache_key("mod.py")
+        with open("helper.py", "w") as handle:
+            handle.write(SOURCE + "\n\nOTHER = 1\n")
+        subprocess.check_output(["git", "add", "helper.py"])
+        # As at the start of a new run
+        runner.blobs = None
+        runner.import_index.refresh()
+        self.assertNotEqual(runner.cache_key("mod.py"), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Test the score history and the ratchet mode"""
+
+from __future__ import absolute_import
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import os.path as op
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from history import ScoreHistory
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+
+
+class HistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.history = ScoreHistory(op.join(self.tmp, "history.sqlite3"), keep=2)
+        self.addCleanup(self.history.close)
+
+    def test_last_score(self):
+        self.history.add([{"path": "a.py", "score": 8.0, "passed": True, "content_hash": "aaa",
+                           "error": 0},
+                          {"path": "b.py", "score": False, "passed": False, "content_hash": "bbb"}])
+        self.history.add([{"path": "a.py", "score": 6.0, "passed": False, "content_hash": "ccc"}])
+        self.assertEqual(self.history.last_score("a.py"), 8.0)
+        self.assertIsNone(self.history.last_score("b.py"))
+        # Moved file is found by its contents
+        self.assertEqual(self.history.last_score("moved.py", "aaa"), 8.0)
+        self.assertIsNone(self.history.last_score("moved.py", "ccc"))
+
+    def test_prune(self):
+        for score in (7.0, 8.0, 9.0):
+            self.history.add([{"path": "a.py", "score": score, "passed": True}])
+        self.assertEqual(self.history.prune(["a.py"]), 1)
+        self.assertEqual([row[1] for row in self.history.scores("a.py")], [8.0, 9.0])
+        self.history.max_age_days = 1
+        self.history.connect().execute("UPDATE scores SET created = ?", (time.time() - 2 * 86400,))
+        self.assertEqual(self.history.prune(), 2)
+
+    def test_ratchet(self):
+        fname = op.join(self.tmp, "module.py")
+        shutil.copy(op.join(TEST_DIR, "inputs/test_input_pass.py"), fname)
+        args = make_args(thresh=5.0, verbosity=30, cache_dir=self.tmp, no_cache=True, ratchet=True)
+        runner = PylintRunner(args)
+        self.assertEqual(runner.lint_files([fname]), 0)
+        with open(fname, "a") as handle:
+            handle.write("import os\n")
+        # Still above the threshold but below the previous score
+        self.assertEqual(runner.lint_files([fname]), 1)
+        scores = self.history.scores(fname)
+        self.assertEqual([row[2] for row in scores], [1, 0])
+        self.assertLess(scores[1][1], scores[0][1])
+        self.assertGreater(scores[1][1], args.thresh)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Test lint profiles"""
+
+from __future__ import absolute_import
+import argparse
+import os.path as op
+import sys
+import unittest
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from engine import WarmLinter
+from profiles import ProfileRules, is_test_file, parse_path_profile
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+
+
+class ProfilesTestCase(unittest.TestCase):
+    def test_is_test_file(self):
+        self.assertTrue(is_test_file("pkg/tests/test_models.py"))
+        self.assertTrue(is_test_file("pkg/tests.py"))
+        self.assertFalse(is_test_file("pkg/test_data/models.py"))
+        self.assertFalse(is_test_file("pkg/models.py"))
+
+    def test_parse_path_profile(self):
+        self.assertEqual(parse_path_profile("migrations/*, *_pb2.py=skip"),
+                         (("migrations/*", "*_pb2.py"), "skip"))
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_path_profile("*.py=slow")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_path_profile("errors")
+
+    def test_rules(self):
+        rules = ProfileRules([(("migrations/*",), "skip"), (("*_pb2.py",), "errors")],
+                             test_profile="skip")
+        self.assertEqual(rules.profile("app/migrations/0001_initial.py"), "skip")
+        self.assertEqual(rules.profile("app/api_pb2.py"), "errors")
+        self.assertEqual(rules.profile("app/tests/test_api.py"), "skip")
+        self.assertEqual(rules.profile("app/api.py"), "full")
+        # Patterns without a slash match the file name only
+        self.assertEqual(rules.profile("api_pb2.py/models.py"), "full")
+        self.assertFalse(ProfileRules())
+
+    def test_runner(self):
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="",
+                         test_profile="skip", path_profile=[(("test_input_fail.py",), "errors")])
+        runner = PylintRunner(args)
+        runner.warm_linter = WarmLinter(runner.new_run)
+        fnames = [op.join(TEST_DIR, "inputs/test_input_fail.py"),
+                  op.join(TEST_DIR, "inputs/test_input_pass.py"),
+                  op.join(TEST_DIR, "__init__.py")]
+        # test_input_fail.py has errors, which the errors profile still finds
+        self.assertEqual(runner.lint_files(fnames), 1)
+        profiles = [(record["lint_profile"], record["reasons"]) for record in runner.records]
+        self.assertEqual(profiles,
+                         [("errors", ["error"]), ("skip", ["skipped"]), ("full", ["ignored"])])
+        self.assertEqual(runner.records[0]["convention"], 0)
+        self.assertEqual(len(runner.warm_linter.runs), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
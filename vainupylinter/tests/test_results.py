@@ -0,0 +1,69 @@
+"""Test the compact result store"""
+
+from __future__ import absolute_import
+import sys
+import unittest
+import os.path as op
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from results import ResultStore
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultStore()
+        self.store.add("a.py", 9.5, True, {"convention": 1, "by_msg": {"invalid-name": 1}})
+        self.store.add("b.py", 4.0, False, {
+            "error": 2, "warning": 1, "by_msg": {"undefined-variable": 2, "unused-import": 1}})
+        self.store.add("c.py", None, False, {})
+
+    def test_get(self):
+        result = self.store.get("b.py")
+        self.assertEqual(result.score, 4.0)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.counts["error"], 2)
+        self.assertEqual(result.by_msg, {"undefined-variable": 2, "unused-import": 1})
+        self.assertIsNone(self.store.get("c.py").score)
+        self.assertIsNone(self.store.get("d.py"))
+
+    def test_queries(self):
+        self.assertEqual(self.store.failed(), ["b.py", "c.py"])
+        self.assertEqual(self.store.worst(1), [("b.py", 4.0)])
+        self.assertEqual(self.store.with_message("undefined-variable"), [("b.py", 2)])
+        self.assertEqual(self.store.message_totals(),
+                         {"invalid-name": 1, "undefined-variable": 2, "unused-import": 1})
+        summary = self.store.summary()
+        self.assertEqual((summary["files"], summary["passed"], summary["failed"]), (3, 1, 2))
+        self.assertEqual(summary["mean_score"], 6.75)
+        self.assertEqual(summary["counts"]["error"], 2)
+
+    def test_latest(self):
+        self.store.add("b.py", 9.0, True, {"by_msg": {"invalid-name": 3}})
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.store.failed(), ["c.py"])
+        self.assertEqual(self.store.failed(latest=False), ["b.py", "c.py"])
+        self.assertEqual(self.store.message_totals(), {"invalid-name": 4})
+        self.assertEqual(self.store.summary()["files"], 3)
+
+    def test_runner_keeps_results(self):
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="")
+        runner = PylintRunner(args)
+        fail = op.join(TEST_DIR, "inputs/test_input_fail.py")
+        passing = op.join(TEST_DIR, "inputs/test_input_pass.py")
+        runner.lint_files([fail])
+        runner.lint_files([passing])
+        self.assertEqual(len(runner.records), 1)
+        self.assertEqual(len(runner.store), 2)
+        self.assertEqual(runner.store.failed(), [fail])
+        self.assertEqual(runner.store.get(passing).by_msg, runner.records[0]["by_msg"])
+        self.assertTrue(runner.store.get(fail).counts["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
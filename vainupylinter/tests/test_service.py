@@ -0,0 +1,77 @@
+"""Test the library API"""
+
+from __future__ import absolute_import
+import logging
+import os.path as op
+import sys
+import unittest
+
+from argparse import Namespace
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import RunResult, lint_files, make_args
+from service import LintService
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+FAIL = op.join(TEST_DIR, "inputs/test_input_fail.py")
+PASS = op.join(TEST_DIR, "inputs/test_input_pass.py")
+
+
+class ApiTestCase(unittest.TestCase):
+    def test_make_args(self):
+        args = make_args({"thresh": 8.0}, jobs=2)
+        self.assertEqual((args.thresh, args.jobs, args.fnames), (8.0, 2, []))
+        self.assertEqual(make_args(Namespace(thresh=7.0)).thresh, 7.0)
+        with self.assertRaises(TypeError):
+            make_args({"treshold": 8.0})
+
+    def test_lint_files(self):
+        handlers = list(logging.getLogger().handlers)
+        result = lint_files([FAIL, PASS], {"no_cache": True}, thresh=9.0, verbosity=30)
+        self.assertIsInstance(result, RunResult)
+        self.assertEqual(result.exit_code, 1)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.failed_files, [FAIL])
+        self.assertEqual([record["path"] for record in result.records], [FAIL, PASS])
+        # The library leaves logging to the application, only verbosity sets the level
+        self.assertEqual(logging.getLogger().handlers, handlers)
+        self.assertEqual(logging.getLogger("vainupylinter").level, logging.WARNING)
+        self.assertEqual(logging.getLogger("vainupylinter").handlers, [])
+
+
+class ServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.service = LintService({"no_cache": True}, max_workers=2, thresh=9.0)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_lint_files(self):
+        result = self.service.lint_files([PASS])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(("vainupylinter", logging.INFO, "Starting"), result.log)
+        # Options of a request override the defaults of the service
+        self.assertEqual(self.service.lint_files([PASS], thresh=10.5).exit_code, 1)
+        with self.assertRaises(TypeError):
+            self.service.submit([PASS], treshold=8.0)
+
+    def test_lint_files_async(self):
+        try:
+            import asyncio  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            self.skipTest("asyncio is not available")
+
+        async def lint_both():
+            return await asyncio.gather(self.service.lint_files_async([FAIL]),
+                                        self.service.lint_files_async([PASS]))
+
+        results = asyncio.run(lint_both())
+        self.assertEqual([result.exit_code for result in results], [1, 0])
+        self.assertEqual(results[0].failed_files, [FAIL])
+
+
+if __name__ == '__main__':
+    unittest.main()
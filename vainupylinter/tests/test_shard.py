@@ -0,0 +1,69 @@
+"""Test sharding a run and merging the shards"""
+
+from __future__ import absolute_import
+import shutil
+import sys
+import tempfile
+import unittest
+import os.path as op
+
+from argparse import ArgumentTypeError
+
+TEST_DIR = op.dirname(op.abspath(__file__))
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args, merge_results
+from shard import Shard, merge, parse_shard, partition
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+FNAMES = [op.join(TEST_DIR, "inputs", fname) for fname in
+          ("test_input_fail.py", "test_input_pass.py", "test_input_crash.py", "notthere.py")]
+
+
+class ShardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def runner(self, **kwargs):
+        args = make_args(thresh=9.0, keep_results=True, verbosity=30, cache_dir="")
+        for key, value in kwargs.items():
+            setattr(args, key, value)
+        return PylintRunner(args)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/3"), (2, 3))
+        for spec in ("0/3", "4/3", "1", "a/b"):
+            with self.assertRaises(ArgumentTypeError):
+                parse_shard(spec)
+
+    def test_partition(self):
+        costs = {"a": 10, "b": 7, "c": 5, "d": 4, "e": 1}
+        shards = partition(sorted(costs), 2, cost=costs.get)
+        self.assertEqual(shards, [[0, 3], [1, 2, 4]])
+        self.assertEqual(sorted(sum(shards, [])), list(range(5)))
+        shard = Shard(FNAMES, 2, 2)
+        self.assertEqual(shard.fnames, [FNAMES[index] for index in partition(FNAMES, 2)[1]])
+
+    def test_merge(self):
+        expected = self.runner()
+        exit_code = expected.lint_files(FNAMES)
+        artifacts = []
+        for index in (2, 1):
+            artifact = op.join(self.tmp, "shard{}.json".format(index))
+            self.runner(shard=(index, 2), artifact=artifact).lint_files(FNAMES)
+            artifacts.append(artifact)
+        records, failed_files, custom_failed = merge(artifacts)
+        self.assertEqual([record["path"] for record in records], FNAMES)
+        self.assertEqual(failed_files, expected.failed_files)
+        self.assertEqual(custom_failed, expected.custom_failed)
+        self.assertEqual(merge_results(["-v", "40"] + artifacts), exit_code)
+        # Missing shard
+        self.assertEqual(merge_results(["-v", "50", artifacts[0]]), 1)
+        with self.assertRaises(ValueError):
+            merge(artifacts[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
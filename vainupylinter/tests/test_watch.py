@@ -0,0 +1,106 @@
+"""Test watch mode"""
+
+from __future__ import absolute_import
+import os.path as op
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, op.abspath(op.join(op.dirname(__file__), "..")))
+# pylint:disable=wrong-import-position, import-error
+from custom_runner import PylintRunner, make_args
+from watch import InotifyMonitor, PollingMonitor, Watch, collect, watched_directories
+
+# pylint:enable=wrong-import-position, import-error
+# pylint: disable=missing-docstring
+GOOD = '"""Module"""\n\n\ndef value():\n    """Value"""\n    return 1\n'
+BAD = ('"""Module"""\nimport os\n\nFIRST = 1\nSECOND = 2\n\n\n'
+       'def value():\n    return FIRST + SECOND\n')
+
+
+class FakeMonitor(object):
+    """Returns the given changes, one set per read"""
+    overflow = False
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.closed = False
+
+    def read(self, timeout=None):
+        if not self.changes:
+            if timeout is None:
+                raise KeyboardInterrupt
+            return set()
+        return self.changes.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+class WatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, content):
+        path = op.join(self.tmp, name)
+        with open(path, "w") as handle:
+            handle.write(content)
+        return path
+
+    def runner(self):
+        return PylintRunner(make_args(thresh=9.0, verbosity=30, cache_dir=""))
+
+    def test_watched_directories(self):
+        directories = watched_directories([self.tmp, op.join(self.tmp, "a.py"),
+                                           op.join(self.tmp, "src", "*.py")])
+        self.assertEqual(directories, {self.tmp: True, op.join(self.tmp, "src"): False})
+
+    def check_monitor(self, monitor):
+        try:
+            path = self.write("a.py", GOOD + "\n")
+            self.write("notes.txt", "text")
+            self.assertEqual(monitor.read(2.0), {path})
+            self.assertEqual(monitor.read(0.05), set())
+        finally:
+            monitor.close()
+
+    def test_polling_monitor(self):
+        self.write("a.py", GOOD)
+        self.check_monitor(PollingMonitor({self.tmp: True}, interval=0.01))
+
+    def test_inotify_monitor(self):
+        try:
+            monitor = InotifyMonitor({self.tmp: True})
+        except OSError:
+            self.skipTest("inotify is not available")
+        self.check_monitor(monitor)
+
+    def test_collect_debounces(self):
+        monitor = FakeMonitor([{"a.py"}, {"a.py", "b.py"}, {"c.py"}])
+        self.assertEqual(collect(monitor, debounce=0.01), {"a.py", "b.py", "c.py"})
+
+    def test_watch(self):
+        base = self.write("wbase.py", GOOD)
+        user = self.write("wuser.py", '"""Module"""\nfrom wbase import value\n\nVALUE = value()\n')
+        other = self.write("wother.py", GOOD)
+        monitor = FakeMonitor([{base}])
+        watch = Watch(self.runner(), [self.tmp], monitor=monitor, debounce=0.01)
+        self.assertEqual(watch.run(passes=1), 0)
+        self.assertEqual(sorted(watch.last_pass), [base, user])
+        self.assertTrue(monitor.closed)
+        self.assertIsNotNone(watch.runner.warm_linter)
+        # A failing change updates the summary, the other files are not linted again
+        self.write("wother.py", BAD)
+        self.assertEqual(watch.lint(watch.affected([other])), 1)
+        self.assertEqual(watch.last_pass, [other])
+        passed = dict((op.basename(path), record["passed"])
+                      for path, record in watch.status.items())
+        self.assertEqual(passed, {"wbase.py": True, "wuser.py": True, "wother.py": False})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,375 @@
+"""Re-lint files as they change
+
+Watch keeps the runner resident, lints the given files once and then waits for
+changes. Changes are read from inotify on linux, and found by polling the
+modification times of the files elsewhere. Changes arriving within the debounce
+interval of each other are handled in one pass, so saving several files, or one
+file several times in a row, lints them once. A pass lints the changed files and
+the files that import them, directly or indirectly, and updates the summary of
+all watched files.
+"""
+from __future__ import absolute_import
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import os.path as op
+import select
+import struct
+import sys
+import time
+
+try:
+    from vainupylinter.depgraph import ImportIndex
+    from vainupylinter.discover import ALWAYS_IGNORED, GLOB_CHARS, FileFinder, is_python_file
+    from vainupylinter.engine import WarmLinter
+    from vainupylinter.memory import evict_modules
+except ImportError:
+    from depgraph import ImportIndex
+    from discover import ALWAYS_IGNORED, GLOB_CHARS, FileFinder, is_python_file
+    from engine import WarmLinter
+    from memory import evict_modules
+
+DEBOUNCE = 0.2
+POLL_INTERVAL = 0.5
+# inotify constants, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+O_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+# struct inotify_event without the name
+EVENT = struct.Struct("iIII")
+_fsencode = getattr(os, "fsencode", lambda path: path)  # pylint: disable=invalid-name
+_fsdecode = getattr(os, "fsdecode", lambda path: path)  # pylint: disable=invalid-name
+
+
+def watched_directories(paths):
+    """Directories to watch for the given files, directories and globs
+
+    Output
+    ------
+    dict
+        Absolute directory path to True if its subdirectories are watched too.
+    """
+    directories = {}
+    for path in paths:
+        if op.isdir(path):
+            directory, recursive = path, True
+        elif GLOB_CHARS.search(path) and not op.exists(path):
+            base = GLOB_CHARS.split(path, 1)[0]
+            directory = op.dirname(base)
+            recursive = "**" in path or op.sep in path[len(base):] or "/" in path[len(base):]
+        else:
+            directory, recursive = op.dirname(path), False
+        directory = op.abspath(directory or ".")
+        directories[directory] = directories.get(directory, False) or recursive
+    return directories
+
+
+def _subdirectories(directory):
+    """Subdirectories of the directory that are walked, symbolic links are not followed"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [op.join(directory, name) for name in names
+            if name not in ALWAYS_IGNORED and op.isdir(op.join(directory, name))
+            and not op.islink(op.join(directory, name))]
+
+
+class PollingMonitor(object):
+    """Find changed python files by comparing their modification times and sizes
+
+    Input
+    -----
+    directories : dict
+        Directory to True if its subdirectories are watched too, see watched_directories.
+    interval : float
+        Seconds between scans.
+    """
+    overflow = False
+
+    def __init__(self, directories, interval=POLL_INTERVAL):
+        self.directories = dict(directories)
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        """Modification time and size of every watched python file"""
+        files = {}
+        stack = list(self.directories.items())
+        while stack:
+            directory, recursive = stack.pop()
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if not is_python_file(name):
+                    continue
+                path = op.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_mtime, stat.st_size)
+            if recursive:
+                stack.extend((subdirectory, True) for subdirectory in _subdirectories(directory))
+        return files
+
+    def read(self, timeout=None):
+        """Paths changed since the last call. Waits at most timeout seconds, forever if None,
+        for the first change"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            current = self.scan()
+            changed = set(path for path in set(current) | set(self.snapshot)
+                          if current.get(path) != self.snapshot.get(path))
+            self.snapshot = current
+            remaining = self.interval if deadline is None else deadline - time.time()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        """Nothing to release"""
+
+
+class InotifyMonitor(object):
+    """Find changed python files with linux inotify. Raises OSError if inotify is not available
+
+    Input
+    -----
+    directories : dict
+        Directory to True if its subdirectories are watched too, see watched_directories.
+    """
+    def __init__(self, directories):
+        libc = ctypes.util.find_library("c") if sys.platform.startswith("linux") else None
+        if not libc:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.libc = ctypes.CDLL(libc, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.inotify_fd = self.libc.inotify_init1(os.O_NONBLOCK | O_CLOEXEC)
+        if self.inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.overflow = False
+        for directory, recursive in directories.items():
+            self.add(directory, recursive)
+
+    def add(self, directory, recursive):
+        """Watch the directory, and its subdirectories if recursive. Returns python files found
+        in them"""
+        found = []
+        stack = [directory]
+        while stack:
+            path = stack.pop()
+            descriptor = self.libc.inotify_add_watch(self.inotify_fd, _fsencode(path), WATCH_MASK)
+            if descriptor < 0:
+                # Removed already or not readable
+                continue
+            was_recursive = self.watches.get(descriptor, (None, False))[1]
+            self.watches[descriptor] = (path, recursive or was_recursive)
+            if recursive:
+                stack.extend(_subdirectories(path))
+                try:
+                    found.extend(op.join(path, name) for name in os.listdir(path)
+                                 if is_python_file(name))
+                except OSError:
+                    pass
+        return found
+
+    def events(self):
+        """Read the pending events as (watch descriptor, mask, name)"""
+        while True:
+            try:
+                data = os.read(self.inotify_fd, 65536)
+            except OSError as error:
+                if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+            if not data:
+                return
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, length = EVENT.unpack_from(data, offset)
+                start = offset + EVENT.size
+                offset = start + length
+                yield descriptor, mask, _fsdecode(data[start:offset].rstrip(b"\0"))
+
+    def read(self, timeout=None):
+        """Paths changed since the last call. Waits at most timeout seconds, forever if None,
+        for the first change"""
+        ready = select.select([self.inotify_fd], [], [], timeout)[0]
+        changed = set()
+        if not ready:
+            return changed
+        for descriptor, mask, name in self.events():
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, the caller has to assume that everything changed
+                self.overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(descriptor, None)
+                continue
+            directory, recursive = self.watches.get(descriptor, (None, False))
+            if directory is None or not name:
+                continue
+            path = op.join(directory, name)
+            if mask & IN_ISDIR:
+                if recursive and mask & (IN_CREATE | IN_MOVED_TO) and name not in ALWAYS_IGNORED:
+                    changed.update(self.add(path, True))
+            elif is_python_file(name):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        """Stop watching"""
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+
+def open_monitor(directories, poll=False):
+    """inotify monitor if available and poll is False, polling monitor otherwise"""
+    if not poll:
+        try:
+            return InotifyMonitor(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingMonitor(directories)
+
+
+def collect(monitor, debounce=DEBOUNCE, timeout=None):
+    """Changed paths, read until no new change arrives within debounce seconds"""
+    changed = monitor.read(timeout)
+    while changed:
+        more = monitor.read(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+class Watch(object):
+    """Lint files and re-lint them when they or the local modules they import change
+
+    The runner is kept with a warm linter, unless it lints in parallel.
+
+    Input
+    -----
+    runner : PylintRunner
+        Runner used for every pass.
+    fnames : list
+        Files, directories and globs to watch, as given to the runner.
+    monitor : PollingMonitor, InotifyMonitor | None
+        Source of changes. An inotify monitor, or a polling one if inotify is not
+        available, on the directories of fnames if None.
+    debounce : float | 0.2
+        Seconds without changes before a pass starts.
+    """
+    def __init__(self, runner, fnames, monitor=None, debounce=DEBOUNCE):
+        self.runner = runner
+        self.fnames = list(fnames)
+        self.monitor = monitor
+        self.debounce = debounce
+        # Without a cache directory the index is kept in memory only
+        self.index = runner.import_index or ImportIndex()
+        self.finder = FileFinder(runner.rcfile)
+        self.watched = {}
+        self.status = {}
+        self.last_pass = []
+        if runner.warm_linter is None and runner.jobs == 1:
+            runner.warm_linter = WarmLinter(runner.new_run)
+
+    def expand(self):
+        """Find the watched files again, e.g. after new files appeared"""
+        self.watched = dict((op.abspath(path), path) for path in self.finder.expand(self.fnames))
+
+    def affected(self, changed):
+        """Watched files to lint after the given files changed, in the order they were found"""
+        changed = set(op.abspath(path) for path in changed)
+        if any(path not in self.watched and op.isfile(path) for path in changed):
+            self.expand()
+        removed = set(path for path in changed if not op.isfile(path))
+        for path in removed:
+            self.watched.pop(path, None)
+            self.status.pop(path, None)
+        self.index.refresh(changed - removed)
+        lint = changed - removed
+        for path in changed:
+            lint.update(self.index.dependents(path))
+        return [path for key, path in self.watched.items() if key in lint]
+
+    def lint(self, fnames):
+        """Lint the files, update the status of the watched files and report it. Returns the
+        exit code"""
+        runner = self.runner
+        # Modules that import a changed module are parsed again as well
+        evict_modules(fnames)
+        # Changed files are compared with all watched files for duplicate code
+        runner.project_files = list(self.watched.values())
+        keep_results = runner.keep_results
+        # The records of the pass are needed after the run
+        runner.keep_results = True
+        try:
+            runner.lint_files(fnames)
+        finally:
+            runner.keep_results = keep_results
+        for record in runner.records:
+            self.status[op.abspath(record["path"])] = record
+        if not keep_results:
+            runner.clean_up()
+        self.last_pass = list(fnames)
+        return self.report()
+
+    def report(self):
+        """Log the status of all watched files. Returns 1 if any failed"""
+        records = [self.status[key] for key in self.watched if key in self.status]
+        failed = [record["path"] for record in records if not record["passed"]]
+        logger = logging.getLogger(__name__)
+        logger.info('------------------------------------------------------------------')
+        logger.info("WATCHING {} FILES: {} PASSED, {} FAILED".format(
+            len(self.watched), len(records) - len(failed), len(failed)))
+        if failed:
+            logger.warning("FAILING FILES:")
+            logger.warning('\n'.join(failed))
+        logger.info('------------------------------------------------------------------')
+        return 1 if failed else 0
+
+    def run(self, passes=None):
+        """Lint all files, then re-lint changed ones until interrupted or passes passes are done.
+        Returns the exit code of the last status"""
+        monitor = self.monitor or open_monitor(watched_directories(self.fnames))
+        exit_code = 1
+        logger = logging.getLogger(__name__)
+        try:
+            self.expand()
+            self.index.refresh(list(self.watched))
+            exit_code = self.lint(list(self.watched.values()))
+            done = 0
+            while passes is None or done < passes:
+                logger.info("WAITING FOR CHANGES")
+                changed = collect(monitor, self.debounce)
+                if monitor.overflow:
+                    monitor.overflow = False
+                    self.expand()
+                    fnames = list(self.watched.values())
+                else:
+                    fnames = self.affected(changed)
+                if fnames:
+                    exit_code = self.lint(fnames)
+                    done += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            monitor.close()
+        return exit_code